@@ -22,6 +22,22 @@ class Settings(BaseSettings):
     GITHUB_CLIENT_ID: str = ""
     GITHUB_CLIENT_SECRET: str = ""
     GITHUB_REDIRECT_URI: str = "http://localhost:8000/api/auth/github/callback"
+    GITHUB_WEBHOOK_SECRET: str = ""  # enables POST /api/collector/webhooks/github
+    
+    # Collectors
+    GITHUB_SYNC_CONCURRENCY: int = 8  # repos fetched concurrently per user sync
+    GITHUB_COLLECTOR_BACKEND: str = "rest"  # 'rest' or 'graphql' (falls back to REST on failure)
+    ARCHIVE_RAW_COMMIT_PAYLOADS: bool = False  # keep compressed GitHub payloads in commit_payloads
+    GITHUB_STATS_BATCH_SIZE: int = 50  # commits per GraphQL stats query
+    GITHUB_STATS_MAX_PER_RUN: int = 2000  # commits enriched per task run before it re-queues itself
+    GITHUB_FANOUT_WINDOW_SECONDS: int = 2400  # periodic per-user tasks are spread over these windows
+    SOLVEDAC_FANOUT_WINDOW_SECONDS: int = 2400
+    VELOG_FANOUT_WINDOW_SECONDS: int = 2400
+    WEEKLY_FANOUT_WINDOW_SECONDS: int = 3600
+    CELERY_VISIBILITY_TIMEOUT_SECONDS: int = 10800  # Redis redelivers unacked (incl. countdown) tasks after this; fan-out windows are capped at half
+    WEEK_TIMEZONE: str = "UTC"  # IANA zone weekly summaries cut weeks in (e.g. 'Asia/Seoul')
+    WEEKLY_BACKFILL_MAX_WEEKS: int = 260  # weeks one backfill may build
+    WEEKLY_DELTA_DEBOUNCE_SECONDS: int = 120  # ingested data reaches weekly summaries after this delay
     
     # OpenAI (fallback – users should bring their own key)
     OPENAI_API_KEY: str = ""
@@ -5,13 +5,17 @@ from app.models.style_profile import StyleProfile
 from app.models.user_profile import UserProfile
 from app.models.repo import Repo
 from app.models.commit import Commit
+from app.models.commit_payload import CommitPayload
 from app.models.problem import Problem
+from app.models.problem_catalog import ProblemCatalog
 from app.models.blog_post import BlogPost
 from app.models.note import Note
 from app.models.weekly_summary import WeeklySummary
+from app.models.weekly_summary_delta import WeeklySummaryDelta
 from app.models.generated_content import GeneratedContent
 from app.models.llm_credential import LlmCredential
 from app.models.analytics_event import AnalyticsEvent
+from app.models.sync_state import SyncState
 
 __all__ = [
     "User",
@@ -20,11 +24,15 @@ __all__ = [
     "UserProfile",
     "Repo",
     "Commit",
+    "CommitPayload",
     "Problem",
+    "ProblemCatalog",
     "BlogPost",
     "Note",
     "WeeklySummary",
+    "WeeklySummaryDelta",
     "GeneratedContent",
     "LlmCredential",
     "AnalyticsEvent",
+    "SyncState",
 ]
@@ -1,6 +1,6 @@
 import uuid
 from datetime import datetime
-from sqlalchemy import Column, String, DateTime, ForeignKey, Text
+from sqlalchemy import Column, String, DateTime, ForeignKey, Text, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from app.database import Base
@@ -16,7 +16,12 @@ class BlogPost(Base):
     url = Column(String, nullable=False)
     title = Column(String, nullable=False)
     published_at = Column(DateTime(timezone=True), nullable=False)
+    body_excerpt = Column(Text)  # HTML-stripped post body, capped at ingest
     created_at = Column(DateTime(timezone=True), nullable=False, default=datetime.utcnow)
     
     # Relationships
     user = relationship("User", back_populates="blog_posts")
+    
+    __table_args__ = (
+        Index("ix_blog_posts_user_published_at", "user_id", "published_at"),
+    )
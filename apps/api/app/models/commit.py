@@ -1,7 +1,7 @@
 import uuid
 from datetime import datetime
-from sqlalchemy import Column, String, DateTime, ForeignKey, Integer, Text
-from sqlalchemy.dialects.postgresql import UUID, JSONB
+from sqlalchemy import Column, String, DateTime, ForeignKey, Integer, Text, UniqueConstraint, Index, text
+from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from app.database import Base
 
@@ -18,9 +18,23 @@ class Commit(Base):
     additions = Column(Integer)
     deletions = Column(Integer)
     files_changed = Column(Integer)
-    raw_data = Column(JSONB)
+    author_login = Column(String)
+    parents_count = Column(Integer)
+    stats_checked_at = Column(DateTime(timezone=True))  # stats looked up; NULL stats then mean unknown
     created_at = Column(DateTime(timezone=True), nullable=False, default=datetime.utcnow)
     
     # Relationships
     repo = relationship("Repo", back_populates="commits")
     user = relationship("User", back_populates="commits")
+    
+    __table_args__ = (
+        UniqueConstraint("repo_id", "sha", name="uq_commits_repo_sha"),
+        Index("ix_commits_user_committed_at", "user_id", "committed_at"),
+        # Commits still waiting for stats enrichment
+        Index(
+            "ix_commits_stats_pending",
+            "user_id",
+            "committed_at",
+            postgresql_where=text("stats_checked_at IS NULL"),
+        ),
+    )
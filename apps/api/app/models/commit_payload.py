@@ -0,0 +1,13 @@
+from datetime import datetime
+from sqlalchemy import Column, DateTime, ForeignKey, LargeBinary
+from sqlalchemy.dialects.postgresql import UUID
+from app.database import Base
+
+
+class CommitPayload(Base):
+    """Optional archive of the raw GitHub commit payload (zlib-compressed JSON)."""
+    __tablename__ = "commit_payloads"
+    
+    commit_id = Column(UUID(as_uuid=True), ForeignKey("commits.id", ondelete="CASCADE"), primary_key=True)
+    payload = Column(LargeBinary, nullable=False)
+    created_at = Column(DateTime(timezone=True), nullable=False, default=datetime.utcnow)
@@ -1,6 +1,6 @@
 import uuid
 from datetime import datetime
-from sqlalchemy import Column, String, DateTime, ForeignKey, Text, Float
+from sqlalchemy import Column, String, DateTime, ForeignKey, Text, Float, Index
 from sqlalchemy.dialects.postgresql import UUID, JSONB
 from sqlalchemy.orm import relationship
 from app.database import Base
@@ -28,3 +28,8 @@ class GeneratedContent(Base):
     
     # Relationships
     user = relationship("User", back_populates="generated_contents")
+    
+    __table_args__ = (
+        Index("ix_generated_contents_user_created_at", "user_id", "created_at"),
+        Index("ix_generated_contents_user_type_created_at", "user_id", "content_type", "created_at"),
+    )
@@ -1,6 +1,6 @@
 import uuid
 from datetime import datetime
-from sqlalchemy import Column, String, DateTime, ForeignKey, Text
+from sqlalchemy import Column, String, DateTime, ForeignKey, Text, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from app.database import Base
@@ -19,3 +19,7 @@ class Note(Base):
     
     # Relationships
     user = relationship("User", back_populates="notes")
+    
+    __table_args__ = (
+        Index("ix_notes_user_created_at", "user_id", "created_at"),
+    )
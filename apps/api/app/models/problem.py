@@ -1,23 +1,38 @@
 import uuid
 from datetime import datetime
-from sqlalchemy import Column, String, DateTime, ForeignKey, Integer, ARRAY
-from sqlalchemy.dialects.postgresql import UUID, JSONB
+from sqlalchemy import Column, DateTime, ForeignKey, Integer, UniqueConstraint, Index
+from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from app.database import Base
 
 
 class Problem(Base):
+    """A solved problem of a user; title, level and tags live in ``problem_catalog``."""
     __tablename__ = "problems"
     
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
-    problem_id = Column(Integer, nullable=False)
-    title = Column(String)
-    level = Column(Integer)
-    tags = Column(ARRAY(String))  # ['graph','dp']
+    problem_id = Column(Integer, ForeignKey("problem_catalog.problem_id"), nullable=False)
     solved_at = Column(DateTime(timezone=True), nullable=False)
-    raw_data = Column(JSONB)
     created_at = Column(DateTime(timezone=True), nullable=False, default=datetime.utcnow)
     
     # Relationships
     user = relationship("User", back_populates="problems")
+    catalog = relationship("ProblemCatalog", lazy="joined")
+    
+    __table_args__ = (
+        UniqueConstraint("user_id", "problem_id", name="uq_problems_user_problem"),
+        Index("ix_problems_user_solved_at", "user_id", "solved_at"),
+    )
+    
+    @property
+    def title(self):
+        return self.catalog.title if self.catalog else None
+    
+    @property
+    def level(self):
+        return self.catalog.level if self.catalog else None
+    
+    @property
+    def tags(self):
+        return self.catalog.tags if self.catalog else None
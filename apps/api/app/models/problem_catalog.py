@@ -0,0 +1,15 @@
+from datetime import datetime
+from sqlalchemy import Column, String, DateTime, Integer, ARRAY
+from app.database import Base
+
+
+class ProblemCatalog(Base):
+    """solved.ac problem metadata shared by every user who solved the problem."""
+    __tablename__ = "problem_catalog"
+    
+    problem_id = Column(Integer, primary_key=True, autoincrement=False)
+    title = Column(String)
+    level = Column(Integer)
+    tags = Column(ARRAY(String))  # ['graph','dp']
+    accepted_user_count = Column(Integer)
+    updated_at = Column(DateTime(timezone=True), nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -21,6 +21,12 @@ class Repo(Base):
     forks = Column(Integer, nullable=False, default=0)
     is_fork = Column(Boolean, nullable=False, default=False)
     last_synced_at = Column(DateTime(timezone=True))
+    # Incremental commit sync cursor (high-water mark + conditional GET validators)
+    last_commit_sha = Column(String)
+    last_commit_at = Column(DateTime(timezone=True))
+    commits_etag = Column(String)
+    commits_last_modified = Column(String)
+    commits_resume_url = Column(String)  # next page of an interrupted commit walk
     created_at = Column(DateTime(timezone=True), nullable=False, default=datetime.utcnow)
     updated_at = Column(DateTime(timezone=True), nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
     
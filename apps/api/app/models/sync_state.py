@@ -0,0 +1,38 @@
+import uuid
+from datetime import datetime
+from sqlalchemy import Column, String, DateTime, ForeignKey, Integer, Text, UniqueConstraint, Index
+from sqlalchemy.dialects.postgresql import UUID, JSONB
+from app.database import Base
+
+
+class SyncState(Base):
+    """Per-user, per-source collector checkpoint, adaptive schedule and latest run."""
+    __tablename__ = "sync_states"
+    
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    source = Column(String, nullable=False)  # 'github', 'solvedac', 'velog'
+    cursor = Column(JSONB, nullable=False, default=dict)
+    
+    # Adaptive schedule (see app.utils.sync_state.record_sync_result)
+    interval_seconds = Column(Integer)
+    next_sync_at = Column(DateTime(timezone=True))
+    last_run_at = Column(DateTime(timezone=True))
+    last_items_found = Column(Integer)
+    
+    # Latest sync run (see app.utils.sync_runs); updated_at doubles as heartbeat
+    status = Column(String)  # 'queued', 'running', 'succeeded', 'failed'
+    task_id = Column(String)
+    queued_at = Column(DateTime(timezone=True))
+    started_at = Column(DateTime(timezone=True))
+    finished_at = Column(DateTime(timezone=True))
+    items_processed = Column(Integer)
+    pages_fetched = Column(Integer)
+    error_message = Column(Text)
+    
+    updated_at = Column(DateTime(timezone=True), nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    __table_args__ = (
+        UniqueConstraint("user_id", "source", name="uq_sync_states_user_source"),
+        Index("ix_sync_states_source_next_sync_at", "source", "next_sync_at"),
+    )
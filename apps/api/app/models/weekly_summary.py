@@ -1,6 +1,6 @@
 import uuid
 from datetime import datetime, date
-from sqlalchemy import Column, String, DateTime, ForeignKey, Integer, Date, Text
+from sqlalchemy import Column, String, DateTime, ForeignKey, Integer, Date, Text, UniqueConstraint
 from sqlalchemy.dialects.postgresql import UUID, JSONB
 from sqlalchemy.orm import relationship
 from app.database import Base
@@ -18,8 +18,13 @@ class WeeklySummary(Base):
     note_count = Column(Integer, nullable=False, default=0)
     summary_json = Column(JSONB, nullable=False, default=dict)  # Graph data
     llm_summary = Column(Text)  # Generated markdown content
+    source_fingerprint = Column(String)  # hash of summary_json; unchanged weeks are not rewritten
     created_at = Column(DateTime(timezone=True), nullable=False, default=datetime.utcnow)
     updated_at = Column(DateTime(timezone=True), nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     # Relationships
     user = relationship("User", back_populates="weekly_summaries")
+    
+    __table_args__ = (
+        UniqueConstraint("user_id", "week_start", name="uq_weekly_summaries_user_week"),
+    )
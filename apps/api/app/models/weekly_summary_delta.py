@@ -0,0 +1,23 @@
+from datetime import datetime
+from sqlalchemy import BigInteger, Column, Date, DateTime, ForeignKey, Index
+from sqlalchemy.dialects.postgresql import UUID, JSONB
+from app.database import Base
+
+
+class WeeklySummaryDelta(Base):
+    """Increments of ingested rows not yet folded into a weekly summary.
+
+    Written in the same transaction as the rows they count (see
+    ``app.utils.weekly_deltas``).
+    """
+    __tablename__ = "weekly_summary_deltas"
+    
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    week_start = Column(Date, nullable=False)  # Monday in WEEK_TIMEZONE
+    fields = Column(JSONB, nullable=False)  # field -> increment, e.g. {"day|commits|2026-10-12": 3}
+    created_at = Column(DateTime(timezone=True), nullable=False, default=datetime.utcnow)
+    
+    __table_args__ = (
+        Index("ix_weekly_summary_deltas_user_week", "user_id", "week_start"),
+    )
@@ -205,3 +205,75 @@ async def admin_top_pages(
         .all()
     )
     return [{"path": row.path, "views": row.views} for row in rows]
+
+
+@router.get("/admin/retry-stats")
+async def admin_retry_stats(
+    current_user: User = Depends(_require_admin),
+):
+    """Cumulative retries and backoff wait per upstream, across all workers."""
+    from app.utils.redis_client import get_redis
+
+    client = get_redis()
+    stats = []
+    for key in client.scan_iter(match="retry_stats:*"):
+        values = client.hgetall(key)
+        stats.append({
+            "upstream": key.decode().split(":", 1)[1],
+            "retries": int(values.get(b"retries", 0)),
+            "wait_seconds": round(float(values.get(b"wait_seconds", 0.0)), 1),
+        })
+    return sorted(stats, key=lambda row: row["upstream"])
+
+
+@router.get("/admin/sync-schedule")
+async def admin_sync_schedule(
+    current_user: User = Depends(_require_admin),
+    db: Session = Depends(get_db),
+):
+    """Distribution of adaptive sync intervals and due syncs per source."""
+    from sqlalchemy import case
+    from app.models.sync_state import SyncState
+    from app.utils.sync_state import SYNC_INTERVALS
+
+    hours = SyncState.interval_seconds / 3600.0
+    bucket = case(
+        (SyncState.interval_seconds.is_(None), "unscheduled"),
+        (hours <= 1, "<=1h"),
+        (hours <= 3, "<=3h"),
+        (hours <= 12, "<=12h"),
+        (hours <= 24, "<=1d"),
+        (hours <= 72, "<=3d"),
+        else_=">3d",
+    )
+    rows = (
+        db.query(SyncState.source, bucket.label("bucket"), func.count(SyncState.id).label("users"))
+        .group_by(SyncState.source, bucket)
+        .all()
+    )
+    totals = (
+        db.query(
+            SyncState.source,
+            func.count(SyncState.id).label("users"),
+            func.avg(SyncState.interval_seconds).label("avg_interval"),
+            func.count(SyncState.id).filter(SyncState.next_sync_at <= func.now()).label("due"),
+        )
+        .group_by(SyncState.source)
+        .all()
+    )
+
+    schedule = {}
+    for row in totals:
+        floor, default, ceiling = SYNC_INTERVALS.get(row.source, (None, None, None))
+        schedule[row.source] = {
+            "users": row.users,
+            "due_now": row.due,
+            "avg_interval_hours": round(float(row.avg_interval) / 3600, 1) if row.avg_interval else None,
+            "floor_hours": floor / 3600 if floor else None,
+            "default_hours": default / 3600 if default else None,
+            "ceiling_hours": ceiling / 3600 if ceiling else None,
+            "distribution": {},
+        }
+    for row in rows:
+        schedule[row.source]["distribution"][row.bucket] = row.users
+    return schedule
@@ -1,5 +1,8 @@
-from fastapi import APIRouter, Depends, BackgroundTasks
+import json
+import uuid
+from fastapi import APIRouter, Depends, BackgroundTasks, Header, HTTPException, Request
 from sqlalchemy.orm import Session
+from app.config import settings
 from app.database import get_db
 from app.deps import get_current_user
 from app.models.user import User
@@ -7,6 +10,7 @@ from app.models.repo import Repo
 from app.models.problem import Problem
 from app.models.blog_post import BlogPost
 from app.models.user_profile import UserProfile
+from app.models.sync_state import SyncState
 from app.schemas.collector import (
     SyncRequest, 
     SyncStatus, 
@@ -16,41 +20,60 @@ from app.schemas.collector import (
 from sqlalchemy import func
 from datetime import datetime
 from typing import Optional
+from app.utils.sync_runs import claim_sync_run, release_sync_run
 
 router = APIRouter()
 
 
-def _is_sync_task_running(source: str, user_id: str) -> bool:
-    """Best-effort check whether a source sync task is queued/running for this user."""
-    task_suffix = {
-        "github": "sync_github_for_user",
-        "solvedac": "sync_solvedac_for_user",
-        "velog": "sync_velog_for_user",
-    }[source]
+SYNC_SOURCES = ("github", "solvedac", "velog")
+# sync_states run status -> SyncStatus.status
+RUN_STATUS_MAP = {
+    "queued": "pending",
+    "running": "running",
+    "succeeded": "completed",
+    "failed": "failed",
+}
 
+
+def _sync_status(source: str, state: Optional[SyncState]) -> SyncStatus:
+    if state is None or state.status is None:
+        return SyncStatus(source=source, status="pending")
+    return SyncStatus(
+        source=source,
+        status=RUN_STATUS_MAP.get(state.status, "pending"),
+        last_synced_at=state.last_run_at,
+        items_synced=state.items_processed or 0,
+        pages_fetched=state.pages_fetched or 0,
+        started_at=state.started_at,
+        error_message=state.error_message,
+    )
+
+
+def _enqueue_claimed(db: Session, user_id: str, sources: list, task_func, task_id: str, args: tuple, kwargs: dict) -> None:
+    """
+    Enqueue the task of runs already claimed under ``task_id``.
+    
+    If the broker refuses the task, the claims are failed so they don't
+    block new syncs until they go stale.
+    """
     try:
-        from worker.celery_app import celery_app
-
-        inspector = celery_app.control.inspect(timeout=0.5)
-        task_sets = [
-            inspector.active() or {},
-            inspector.reserved() or {},
-            inspector.scheduled() or {},
-        ]
-        for tasks_by_worker in task_sets:
-            for tasks in tasks_by_worker.values():
-                for task in tasks:
-                    name = str(task.get("name", ""))
-                    if not name.endswith(task_suffix):
-                        continue
-                    args_repr = str(task.get("args", ""))
-                    kwargs_repr = str(task.get("kwargs", ""))
-                    if user_id in args_repr or user_id in kwargs_repr:
-                        return True
-    except Exception:
-        return False
-
-    return False
+        task_func.apply_async(args, kwargs, task_id=task_id)
+    except Exception as exc:
+        for source in sources:
+            release_sync_run(db, user_id, source, task_id, f"Failed to enqueue sync task: {exc}")
+        db.commit()
+        raise HTTPException(status_code=503, detail="Sync queue is unavailable. Please try again later.")
+
+
+def _trigger_single(db: Session, user_id: str, source: str, task_func, label: str) -> dict:
+    """Claim and enqueue one source's sync for the deprecated ``/trigger/*`` endpoints."""
+    task_id = str(uuid.uuid4())
+    claimed = claim_sync_run(db, user_id, source, task_id)
+    db.commit()
+    if not claimed:
+        return {"message": f"{label} sync already queued or running", "status": "already_queued"}
+    _enqueue_claimed(db, user_id, [source], task_func, task_id, (user_id,), {})
+    return {"message": f"{label} sync triggered", "status": "queued"}
 
 
 @router.post("/sync", response_model=SyncStatus)
@@ -64,66 +87,82 @@ async def trigger_sync(
     task_map = {
         "github": ("worker.tasks.sync_github", "sync_github_for_user"),
         "solvedac": ("worker.tasks.sync_solvedac", "sync_solvedac_for_user"),
-        "velog": ("worker.tasks.sync_velog", "sync_velog_for_user")
+        "velog": ("worker.tasks.sync_velog", "sync_velog_for_user"),
+        "all": ("worker.tasks.sync_user", "sync_user_all_sources"),
     }
     
     module_name, func_name = task_map[request.source]
     module = __import__(module_name, fromlist=[func_name])
     task_func = getattr(module, func_name)
     
-    task = task_func.delay(str(current_user.id))
+    # Claim the run before enqueueing; a claimed row is the dedupe lock
+    user_id = str(current_user.id)
+    task_id = str(uuid.uuid4())
+    if request.source == "all":
+        from merge_collector.base import get_collector
+        
+        linked = [source for source in SYNC_SOURCES if get_collector(source).load_credential(db, user_id)]
+        claimed = [source for source in linked if claim_sync_run(db, user_id, source, task_id)]
+    else:
+        linked = [request.source]
+        claimed = linked if claim_sync_run(db, user_id, request.source, task_id) else []
+    db.commit()
+    
+    if not claimed:
+        # Already queued or running: report the active run, don't enqueue another
+        if request.source == "all":
+            return SyncStatus(source="all", status="running" if linked else "pending")
+        state = db.query(SyncState).filter(
+            SyncState.user_id == current_user.id,
+            SyncState.source == request.source
+        ).first()
+        return _sync_status(request.source, state)
     
-    # Get last sync time
-    last_synced = None
-    if request.source == "github":
-        last_synced = db.query(func.max(Repo.updated_at)).filter(Repo.user_id == current_user.id).scalar()
-    elif request.source == "solvedac":
-        last_synced = db.query(func.max(Problem.created_at)).filter(Problem.user_id == current_user.id).scalar()
-    elif request.source == "velog":
-        last_synced = db.query(func.max(BlogPost.created_at)).filter(BlogPost.user_id == current_user.id).scalar()
+    if request.source == "all":
+        kwargs = {"full_resync": request.force_full_sync, "sources": claimed}
+    elif request.source in ("github", "solvedac"):
+        kwargs = {"full_resync": request.force_full_sync}
+    else:
+        kwargs = {}
+    _enqueue_claimed(db, user_id, claimed, task_func, task_id, (user_id,), kwargs)
     
-    return SyncStatus(
-        source=request.source,
-        status="pending",
-        last_synced_at=last_synced,
-        items_synced=0
-    )
+    return SyncStatus(source=request.source, status="pending")
 
 
 @router.post("/trigger/github", deprecated=True)
 async def trigger_github_sync(
     background_tasks: BackgroundTasks,
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
 ):
     """Trigger manual GitHub sync. (Deprecated: Use /sync endpoint)"""
     from worker.tasks.sync_github import sync_github_for_user
-    sync_github_for_user.delay(str(current_user.id))
     
-    return {"message": "GitHub sync triggered", "status": "queued"}
+    return _trigger_single(db, str(current_user.id), "github", sync_github_for_user, "GitHub")
 
 
 @router.post("/trigger/solvedac", deprecated=True)
 async def trigger_solvedac_sync(
     background_tasks: BackgroundTasks,
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
 ):
     """Trigger manual solved.ac sync. (Deprecated: Use /sync endpoint)"""
     from worker.tasks.sync_solvedac import sync_solvedac_for_user
-    sync_solvedac_for_user.delay(str(current_user.id))
     
-    return {"message": "solved.ac sync triggered", "status": "queued"}
+    return _trigger_single(db, str(current_user.id), "solvedac", sync_solvedac_for_user, "solved.ac")
 
 
 @router.post("/trigger/velog", deprecated=True)
 async def trigger_velog_sync(
     background_tasks: BackgroundTasks,
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
 ):
     """Trigger manual Velog sync. (Deprecated: Use /sync endpoint)"""
     from worker.tasks.sync_velog import sync_velog_for_user
-    sync_velog_for_user.delay(str(current_user.id))
     
-    return {"message": "Velog sync triggered", "status": "queued"}
+    return _trigger_single(db, str(current_user.id), "velog", sync_velog_for_user, "Velog")
 
 
 @router.get("/status", response_model=list[SyncStatus])
@@ -132,48 +171,12 @@ async def get_sync_status(
     db: Session = Depends(get_db)
 ):
     """Get sync status for all sources."""
-    # Get last sync times and counts from database
-    last_repo = db.query(Repo).filter(
-        Repo.user_id == current_user.id
-    ).order_by(Repo.last_synced_at.desc()).first()
-    
-    last_problem = db.query(Problem).filter(
-        Problem.user_id == current_user.id
-    ).order_by(Problem.created_at.desc()).first()
-    
-    last_post = db.query(BlogPost).filter(
-        BlogPost.user_id == current_user.id
-    ).order_by(BlogPost.created_at.desc()).first()
-    
-    github_count = db.query(func.count(Repo.id)).filter(Repo.user_id == current_user.id).scalar() or 0
-    problem_count = db.query(func.count(Problem.id)).filter(Problem.user_id == current_user.id).scalar() or 0
-    post_count = db.query(func.count(BlogPost.id)).filter(BlogPost.user_id == current_user.id).scalar() or 0
-    
-    user_id = str(current_user.id)
-    github_running = _is_sync_task_running("github", user_id)
-    solvedac_running = _is_sync_task_running("solvedac", user_id)
-    velog_running = _is_sync_task_running("velog", user_id)
-
-    return [
-        SyncStatus(
-            source="github",
-            status="running" if github_running else ("completed" if github_count > 0 else "pending"),
-            last_synced_at=last_repo.last_synced_at if last_repo and last_repo.last_synced_at else None,
-            items_synced=github_count
-        ),
-        SyncStatus(
-            source="solvedac",
-            status="running" if solvedac_running else ("completed" if problem_count > 0 else "pending"),
-            last_synced_at=last_problem.created_at if last_problem else None,
-            items_synced=problem_count
-        ),
-        SyncStatus(
-            source="velog",
-            status="running" if velog_running else ("completed" if post_count > 0 else "pending"),
-            last_synced_at=last_post.created_at if last_post else None,
-            items_synced=post_count
-        ),
-    ]
+    # One indexed lookup (uq_sync_states_user_source) instead of asking every worker
+    states = {
+        state.source: state
+        for state in db.query(SyncState).filter(SyncState.user_id == current_user.id)
+    }
+    return [_sync_status(source, states.get(source)) for source in SYNC_SOURCES]
 
 
 @router.get("/config", response_model=CollectorConfigResponse)
@@ -212,3 +215,44 @@ async def get_collector_config(
         last_solvedac_sync=last_solvedac,
         last_velog_sync=last_velog
     )
+
+
+@router.post("/webhooks/github", status_code=202)
+async def github_webhook(
+    request: Request,
+    x_github_event: Optional[str] = Header(None),
+    x_hub_signature_256: Optional[str] = Header(None),
+):
+    """Receive GitHub push webhooks and queue the pushed commits for insertion.
+
+    The signature is checked against the raw body with ``GITHUB_WEBHOOK_SECRET``.
+    Polling still runs as a reconciliation pass.
+    """
+    # The worker task module puts the collector packages on sys.path
+    from worker.tasks.sync_github import ingest_github_push
+    from merge_collector.github_webhook import verify_signature, parse_push_event
+
+    if not settings.GITHUB_WEBHOOK_SECRET:
+        raise HTTPException(503, "GitHub webhook is not configured")
+
+    body = await request.body()
+    if not verify_signature(settings.GITHUB_WEBHOOK_SECRET, body, x_hub_signature_256):
+        raise HTTPException(401, "Invalid webhook signature")
+
+    if x_github_event == "ping":
+        return {"status": "pong"}
+    if x_github_event != "push":
+        return {"status": "ignored", "event": x_github_event}
+
+    try:
+        payload = json.loads(body)
+    except ValueError:
+        raise HTTPException(400, "Invalid JSON payload")
+
+    push = parse_push_event(payload)
+    if push is None:
+        return {"status": "ignored", "event": "push"}
+
+    ingest_github_push.delay(push["provider_repo_id"], push["commits"])
+
+    return {"status": "queued", "repository": push["full_name"], "commits": len(push["commits"])}
@@ -10,6 +10,7 @@ from app.deps import get_current_user
 from app.models.user import User
 from app.models.weekly_summary import WeeklySummary
 from app.schemas.weekly import (
+    WeeklyBackfillRequest,
     WeeklyFilterRequest,
     WeeklySummaryCreate,
     WeeklySummaryListResponse,
@@ -44,8 +45,12 @@ async def generate_weekly_report(
     db: Session = Depends(get_db),
 ):
     """Generate weekly report for current week."""
-    today = datetime.utcnow().date()
-    week_start = today - timedelta(days=today.weekday())
+    # The worker task module puts the timeline packages on sys.path
+    from worker.tasks.build_weekly import build_weekly_summary
+    from merge_timeline.weeks import current_week_start
+
+    # Weeks are bounded in WEEK_TIMEZONE, as in the builder and backfill
+    week_start = current_week_start()
     week_end = week_start + timedelta(days=6)
 
     existing = (
@@ -53,7 +58,6 @@ async def generate_weekly_report(
         .filter(
             WeeklySummary.user_id == current_user.id,
             WeeklySummary.week_start == week_start,
-            WeeklySummary.week_end == week_end,
         )
         .first()
     )
@@ -71,8 +75,6 @@ async def generate_weekly_report(
             "status": "processing",
         }
 
-    from worker.tasks.build_weekly import build_weekly_summary
-
     task = build_weekly_summary.delay(str(current_user.id), week_start.isoformat(), True)
     return {
         "message": "Weekly summary build and report generation queued",
@@ -83,6 +85,28 @@ async def generate_weekly_report(
     }
 
 
+@router.post("/backfill")
+async def backfill_weekly_summaries(
+    request: WeeklyBackfillRequest,
+    current_user: User = Depends(get_current_user),
+):
+    """Build weekly summaries for every week in a date range."""
+    from worker.tasks.build_weekly import backfill_weekly_summaries as backfill_task
+
+    task = backfill_task.delay(
+        str(current_user.id),
+        request.start_date.isoformat() if request.start_date else None,
+        request.end_date.isoformat() if request.end_date else None,
+    )
+    return {
+        "message": "Weekly summary backfill queued",
+        "task_id": task.id,
+        "start_date": request.start_date.isoformat() if request.start_date else None,
+        "end_date": request.end_date.isoformat() if request.end_date else None,
+        "status": "processing",
+    }
+
+
 @router.post("/", response_model=WeeklySummaryResponse)
 async def create_weekly_summary(
     request: WeeklySummaryCreate,
@@ -95,7 +119,6 @@ async def create_weekly_summary(
         .filter(
             WeeklySummary.user_id == current_user.id,
             WeeklySummary.week_start == request.week_start,
-            WeeklySummary.week_end == request.week_end,
         )
         .first()
     )
@@ -8,7 +8,7 @@ from datetime import datetime
 
 class SyncRequest(BaseModel):
     """Data synchronization request"""
-    source: Literal["github", "solvedac", "velog"] = Field(..., description="Data source")
+    source: Literal["github", "solvedac", "velog", "all"] = Field(..., description="Data source ('all' syncs every linked source)")
     force_full_sync: bool = Field(default=False, description="Force full synchronization instead of incremental")
     
     class Config:
@@ -26,6 +26,8 @@ class SyncStatus(BaseModel):
     status: Literal["pending", "running", "completed", "failed"] = Field(..., description="Sync status")
     last_synced_at: Optional[datetime] = Field(None, description="Last successful sync time")
     items_synced: int = Field(default=0, ge=0, description="Number of items synchronized")
+    pages_fetched: int = Field(default=0, ge=0, description="Upstream pages fetched by the latest run")
+    started_at: Optional[datetime] = Field(None, description="Start time of the latest run")
     error_message: Optional[str] = Field(None, description="Error message if failed")
     
     class Config:
@@ -35,6 +37,8 @@ class SyncStatus(BaseModel):
                 "status": "completed",
                 "last_synced_at": "2024-01-01T12:00:00Z",
                 "items_synced": 150,
+                "pages_fetched": 3,
+                "started_at": "2024-01-01T11:59:30Z",
                 "error_message": None
             }
         }
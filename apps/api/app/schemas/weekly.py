@@ -36,6 +36,23 @@ class WeeklySummaryCreate(BaseModel):
         return value
 
 
+class WeeklyBackfillRequest(BaseModel):
+    """Weekly summary backfill request."""
+
+    start_date: Optional[date] = Field(
+        None, description="First day to cover (defaults to the earliest activity)"
+    )
+    end_date: Optional[date] = Field(None, description="Last day to cover (defaults to today)")
+
+    @field_validator("end_date")
+    @classmethod
+    def validate_date_range(cls, value: Optional[date], info) -> Optional[date]:
+        start_date = info.data.get("start_date")
+        if value is not None and start_date is not None and value < start_date:
+            raise ValueError("End date must not be before start date")
+        return value
+
+
 class WeeklySummaryResponse(BaseModel):
     """Weekly summary response."""
 
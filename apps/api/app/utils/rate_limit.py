@@ -0,0 +1,219 @@
+"""Distributed token-bucket rate limiting backed by Redis."""
+import asyncio
+import hashlib
+import logging
+import time
+from typing import Dict, Mapping, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Atomically refill and take up to ARGV[3] tokens.
+# KEYS[1]: bucket hash
+# ARGV: capacity, refill rate (tokens/s), requested tokens, key ttl (s)
+# Returns {granted, seconds_to_wait}; the wait is a string so Lua keeps decimals.
+_ACQUIRE_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local requested = tonumber(ARGV[3])
+local ttl = tonumber(ARGV[4])
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts', 'blocked_until')
+local tokens = tonumber(state[1])
+local ts = tonumber(state[2])
+local blocked_until = tonumber(state[3]) or 0
+
+if now < blocked_until then
+  return {0, tostring(blocked_until - now)}
+end
+if tokens == nil then
+  tokens = capacity
+  ts = now
+end
+
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+local granted = math.min(requested, math.floor(tokens))
+local wait = 0
+if granted < 1 then
+  granted = 0
+  wait = (1 - tokens) / rate
+else
+  tokens = tokens - granted
+end
+
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+redis.call('EXPIRE', KEYS[1], ttl)
+return {granted, tostring(wait)}
+"""
+
+# Clamp the bucket to what the upstream says is left.
+# KEYS[1]: bucket hash
+# ARGV: remaining calls, reset epoch seconds, key ttl (s)
+_OBSERVE_SCRIPT = """
+local remaining = tonumber(ARGV[1])
+local reset_at = tonumber(ARGV[2])
+local ttl = tonumber(ARGV[3])
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+
+if remaining <= 0 then
+  redis.call('HSET', KEYS[1], 'tokens', 0, 'ts', now, 'blocked_until', reset_at)
+else
+  local tokens = tonumber(redis.call('HGET', KEYS[1], 'tokens'))
+  if tokens == nil or tokens > remaining then
+    redis.call('HSET', KEYS[1], 'tokens', remaining, 'ts', now)
+  end
+end
+redis.call('EXPIRE', KEYS[1], math.max(ttl, math.ceil(reset_at - now)))
+return 1
+"""
+
+
+def _bucket_suffix(key: Optional[str]) -> str:
+    """Hash caller keys (e.g. OAuth tokens) so secrets never land in Redis."""
+    if not key:
+        return "global"
+    return hashlib.sha256(key.encode()).hexdigest()[:16]
+
+
+class TokenBucketRateLimiter:
+    """
+    Token bucket shared by every process through Redis.
+
+    Buckets are keyed per upstream and optionally per caller key (an OAuth
+    token is hashed before use). Each Redis round trip reserves a small batch
+    of tokens that are then spent in-process, so most ``acquire`` calls never
+    leave the worker. If Redis is unreachable the limiter degrades to a
+    per-process bucket with the same budget.
+    """
+
+    # Locally reserved tokens are dropped after this many seconds so idle
+    # processes don't hoard budget the others could use.
+    LOCAL_TOKEN_TTL = 1.0
+
+    def __init__(self, upstream: str, capacity: int, refill_rate: float, batch_size: Optional[int] = None):
+        """
+        Args:
+            upstream: Name used in Redis keys (e.g. 'github')
+            capacity: Maximum burst size
+            refill_rate: Tokens added per second
+            batch_size: Tokens reserved per Redis round trip
+        """
+        self.upstream = upstream
+        self.capacity = capacity
+        self.refill_rate = refill_rate
+        self.batch_size = batch_size or max(1, capacity // 20)
+        self.key_ttl = max(60, int(capacity / refill_rate) * 2)
+        self._local: Dict[str, Tuple[int, float]] = {}
+        self._fallback: Dict[str, Tuple[float, float]] = {}
+        # Set while Redis calls fail, so the outage is logged once per process
+        self._redis_down = False
+
+    def _redis_key(self, suffix: str) -> str:
+        return f"ratelimit:{self.upstream}:{suffix}"
+
+    async def acquire(self, key: Optional[str] = None) -> None:
+        """Wait until a call against the upstream is allowed."""
+        suffix = _bucket_suffix(key)
+        while True:
+            if self._take_local(suffix):
+                return
+            granted, wait = await self._reserve(suffix)
+            if granted > 0:
+                # Spend one now, keep the rest for the fast path
+                if granted > 1:
+                    self._local[suffix] = (granted - 1, time.monotonic())
+                return
+            logger.info(f"{self.upstream} rate limit reached. Waiting {wait:.2f}s...")
+            await asyncio.sleep(wait)
+
+    def _take_local(self, suffix: str) -> bool:
+        tokens, reserved_at = self._local.get(suffix, (0, 0.0))
+        if tokens <= 0 or time.monotonic() - reserved_at > self.LOCAL_TOKEN_TTL:
+            self._local.pop(suffix, None)
+            return False
+        self._local[suffix] = (tokens - 1, reserved_at)
+        return True
+
+    async def _reserve(self, suffix: str) -> Tuple[int, float]:
+        try:
+            from app.utils.redis_client import get_async_redis
+
+            client = get_async_redis()
+            granted, wait = await client.eval(
+                _ACQUIRE_SCRIPT,
+                1,
+                self._redis_key(suffix),
+                self.capacity,
+                self.refill_rate,
+                self.batch_size,
+                self.key_ttl,
+            )
+        except Exception as exc:
+            self._redis_failed(
+                f"Redis rate limiter unavailable for {self.upstream}, using local bucket: {exc}"
+            )
+            return self._reserve_fallback(suffix)
+        self._redis_recovered()
+        return int(granted), float(wait)
+
+    def _redis_failed(self, message: str) -> None:
+        if self._redis_down:
+            logger.debug(message)
+            return
+        self._redis_down = True
+        logger.warning(message)
+
+    def _redis_recovered(self) -> None:
+        if self._redis_down:
+            self._redis_down = False
+            logger.info(f"Redis rate limiter for {self.upstream} is reachable again")
+
+    def _reserve_fallback(self, suffix: str) -> Tuple[int, float]:
+        """Per-process token bucket used when Redis is unavailable."""
+        now = time.monotonic()
+        tokens, ts = self._fallback.get(suffix, (float(self.capacity), now))
+        tokens = min(self.capacity, tokens + (now - ts) * self.refill_rate)
+        if tokens >= 1:
+            self._fallback[suffix] = (tokens - 1, now)
+            return 1, 0.0
+        self._fallback[suffix] = (tokens, now)
+        return 0, (1 - tokens) / self.refill_rate
+
+    async def update_from_headers(self, headers: Mapping[str, str], key: Optional[str] = None) -> None:
+        """
+        Shrink the shared budget to the upstream's own accounting.
+
+        Reads ``X-RateLimit-Remaining`` / ``X-RateLimit-Reset`` (GitHub style).
+        When nothing is left, every process waits until the reset time.
+        """
+        remaining = headers.get("x-ratelimit-remaining")
+        reset_at = headers.get("x-ratelimit-reset")
+        if remaining is None or reset_at is None:
+            return
+        try:
+            remaining_calls = int(remaining)
+            reset_epoch = float(reset_at)
+        except (TypeError, ValueError):
+            return
+        if remaining_calls >= self.capacity:
+            return
+
+        suffix = _bucket_suffix(key)
+        if remaining_calls <= 0:
+            self._local.pop(suffix, None)
+        try:
+            from app.utils.redis_client import get_async_redis
+
+            client = get_async_redis()
+            await client.eval(
+                _OBSERVE_SCRIPT,
+                1,
+                self._redis_key(suffix),
+                remaining_calls,
+                reset_epoch,
+                self.key_ttl,
+            )
+        except Exception as exc:
+            self._redis_failed(f"Failed to record {self.upstream} rate limit headers: {exc}")
@@ -0,0 +1,31 @@
+"""Shared Redis clients."""
+import asyncio
+import weakref
+from functools import lru_cache
+
+import redis
+import redis.asyncio as aioredis
+
+from app.config import settings
+
+# redis.asyncio connections are bound to the event loop that opened them, and
+# Celery tasks start a fresh loop per asyncio.run(), so keep one client per loop.
+_async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, aioredis.Redis]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def get_async_redis() -> aioredis.Redis:
+    """Return the asyncio Redis client for the running event loop."""
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None:
+        client = aioredis.Redis.from_url(settings.REDIS_URL, socket_timeout=2.0)
+        _async_clients[loop] = client
+    return client
+
+
+@lru_cache()
+def get_redis() -> redis.Redis:
+    """Return the process-wide synchronous Redis client."""
+    return redis.Redis.from_url(settings.REDIS_URL, socket_timeout=2.0)
@@ -1,55 +1,246 @@
 """Retry logic and error handling utilities."""
 import asyncio
 import logging
-from typing import Callable, TypeVar, Any
+import random
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from email.utils import parsedate_to_datetime
+from typing import Callable, TypeVar, Any, Iterator, Optional
 from functools import wraps
 import httpx
 
+from app.utils.rate_limit import TokenBucketRateLimiter
+
 logger = logging.getLogger(__name__)
 
 T = TypeVar('T')
 
 
+class RetryBudget:
+    """Caps the retries and total backoff one task may spend across all calls."""
+    
+    def __init__(self, max_retries: int = 30, max_wait_seconds: float = 600.0):
+        self.max_retries = max_retries
+        self.max_wait_seconds = max_wait_seconds
+        self.retries = 0
+        self.wait_seconds = 0.0
+    
+    def spend(self, wait: float) -> bool:
+        """Reserve one retry sleeping ``wait`` seconds; False if over budget."""
+        if self.retries + 1 > self.max_retries or self.wait_seconds + wait > self.max_wait_seconds:
+            return False
+        self.retries += 1
+        self.wait_seconds += wait
+        return True
+
+
+_current_budget: ContextVar[Optional[RetryBudget]] = ContextVar("retry_budget", default=None)
+
+
+@contextmanager
+def retry_budget(max_retries: int = 30, max_wait_seconds: float = 600.0) -> Iterator[RetryBudget]:
+    """
+    Share one RetryBudget with every retry_with_backoff call in this context.
+    
+    asyncio.run() and the tasks it spawns inherit the context, so wrapping a
+    Celery task body bounds the retries of all its concurrent requests.
+    """
+    budget = RetryBudget(max_retries, max_wait_seconds)
+    token = _current_budget.set(budget)
+    try:
+        yield budget
+    finally:
+        _current_budget.reset(token)
+
+
+class RetryPolicy:
+    """
+    Decide whether and how long to wait before retrying a failed call.
+    
+    Transient network errors and ``retry_statuses`` (5xx by default) back
+    off with decorrelated jitter. With ``retry_rate_limits``, 429/403
+    responses are retried only when the upstream says when to come back:
+    ``Retry-After``, an exhausted ``X-RateLimit-Remaining`` with its
+    ``X-RateLimit-Reset``, or a GitHub secondary rate limit message.
+    """
+    
+    SERVER_ERRORS = (500, 502, 503, 504)
+    # GitHub asks clients to wait at least a minute after a secondary limit
+    SECONDARY_LIMIT_WAIT = 60.0
+    
+    def __init__(
+        self,
+        upstream: str = "default",
+        max_retries: int = 3,
+        base_delay: float = 1.0,
+        max_delay: float = 60.0,
+        jitter_factor: float = 3.0,
+        max_rate_limit_wait: float = 900.0,
+        transient_exceptions: tuple = (httpx.TimeoutException, httpx.NetworkError),
+        retry_statuses: tuple = SERVER_ERRORS,
+        retry_rate_limits: bool = True,
+    ):
+        """
+        Args:
+            upstream: Name used for retry counters (e.g. 'github')
+            max_retries: Maximum number of retry attempts per call
+            base_delay: Smallest backoff delay in seconds
+            max_delay: Largest backoff delay for transient errors
+            jitter_factor: Upper bound multiplier for decorrelated jitter
+            max_rate_limit_wait: Give up instead of waiting longer than this for a reset
+            transient_exceptions: Exceptions always treated as transient
+            retry_statuses: HTTP statuses retried with backoff
+            retry_rate_limits: Retry 403/429 responses that say when to come back
+        """
+        self.upstream = upstream
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.jitter_factor = jitter_factor
+        self.max_rate_limit_wait = max_rate_limit_wait
+        self.transient_exceptions = transient_exceptions
+        self.retry_statuses = retry_statuses
+        self.retry_rate_limits = retry_rate_limits
+    
+    def next_delay(self, exc: Exception, previous_delay: float) -> Optional[float]:
+        """Seconds to wait before retrying ``exc``, or None if it is not retryable."""
+        if isinstance(exc, httpx.HTTPStatusError):
+            delay = self._status_delay(exc.response, previous_delay)
+            if delay is not None:
+                return delay
+        if isinstance(exc, self.transient_exceptions):
+            return self._jittered(previous_delay)
+        return None
+    
+    def _jittered(self, previous_delay: float) -> float:
+        # Decorrelated jitter: sleep = min(cap, uniform(base, previous * factor))
+        upper = max(self.base_delay, previous_delay * self.jitter_factor)
+        return min(self.max_delay, random.uniform(self.base_delay, upper))
+    
+    def _status_delay(self, response: httpx.Response, previous_delay: float) -> Optional[float]:
+        status_code = response.status_code
+        if status_code in self.retry_statuses:
+            return self._jittered(previous_delay)
+        if not self.retry_rate_limits or status_code not in (403, 429):
+            return None
+        
+        wait = rate_limit_wait(response)
+        if wait is None and _is_secondary_rate_limit(response):
+            wait = max(self.SECONDARY_LIMIT_WAIT, previous_delay * 2)
+        if wait is None and status_code == 429:
+            wait = self._jittered(previous_delay)
+        if wait is None or wait > self.max_rate_limit_wait:
+            return None
+        # Spread the wake-ups of everyone who hit the same reset
+        return wait + random.uniform(0, self.base_delay)
+    
+    async def record(self, wait: float) -> None:
+        """Count one retry and its wait against this upstream (read by the admin retry stats)."""
+        try:
+            from app.utils.redis_client import get_async_redis
+            
+            client = get_async_redis()
+            key = f"retry_stats:{self.upstream}"
+            await client.hincrby(key, "retries", 1)
+            await client.hincrbyfloat(key, "wait_seconds", wait)
+        except Exception as exc:
+            logger.debug(f"Failed to record retry stats for {self.upstream}: {exc}")
+
+
+def rate_limit_wait(response: httpx.Response) -> Optional[float]:
+    """Seconds until the upstream allows another call, from its headers."""
+    retry_after = response.headers.get("retry-after")
+    if retry_after:
+        try:
+            return max(0.0, float(retry_after))
+        except ValueError:
+            try:
+                retry_at = parsedate_to_datetime(retry_after)
+                return max(0.0, retry_at.timestamp() - time.time())
+            except (TypeError, ValueError):
+                pass
+    
+    if response.headers.get("x-ratelimit-remaining") == "0":
+        reset_at = response.headers.get("x-ratelimit-reset")
+        if reset_at:
+            try:
+                return max(0.0, float(reset_at) - time.time())
+            except ValueError:
+                pass
+    return None
+
+
+def _is_secondary_rate_limit(response: httpx.Response) -> bool:
+    try:
+        return "secondary rate limit" in response.text.lower()
+    except Exception:
+        return False
+
+
 async def retry_with_backoff(
     func: Callable[..., T],
     max_retries: int = 3,
     initial_delay: float = 1.0,
     backoff_factor: float = 2.0,
-    exceptions: tuple = (httpx.TimeoutException, httpx.NetworkError)
+    exceptions: tuple = (httpx.TimeoutException, httpx.NetworkError),
+    policy: Optional[RetryPolicy] = None,
 ) -> T:
     """
-    Retry a function with exponential backoff.
+    Retry a function following a RetryPolicy.
+    
+    Without an explicit ``policy`` one is built from the remaining arguments
+    that retries only ``exceptions``; HTTP status retries (5xx, rate limits)
+    need a policy that enables them. Every retry is charged to the active
+    ``retry_budget`` (if any) and counted per upstream.
     
     Args:
         func: Async function to retry
         max_retries: Maximum number of retry attempts
         initial_delay: Initial delay in seconds
-        backoff_factor: Multiplier for delay after each retry
-        exceptions: Tuple of exceptions to catch
+        backoff_factor: Upper bound multiplier for decorrelated jitter
+        exceptions: Tuple of exceptions treated as transient
+        policy: Retry policy (overrides the arguments above)
         
     Returns:
         Result of the function call
         
     Raises:
-        The last exception if all retries fail
+        The last exception if it is not retryable or all retries fail
     """
-    delay = initial_delay
-    last_exception = None
+    if policy is None:
+        policy = RetryPolicy(
+            max_retries=max_retries,
+            base_delay=initial_delay,
+            jitter_factor=backoff_factor,
+            transient_exceptions=exceptions,
+            retry_statuses=(),
+            retry_rate_limits=False,
+        )
     
-    for attempt in range(max_retries + 1):
+    delay = policy.base_delay
+    for attempt in range(policy.max_retries + 1):
         try:
             return await func()
-        except exceptions as e:
-            last_exception = e
-            if attempt == max_retries:
-                logger.error(f"All {max_retries} retries failed: {e}")
+        except Exception as e:
+            wait = policy.next_delay(e, delay)
+            if wait is None:
+                raise
+            if attempt == policy.max_retries:
+                logger.error(f"All {policy.max_retries} retries failed: {e}")
+                raise
+            budget = _current_budget.get()
+            if budget is not None and not budget.spend(wait):
+                logger.error(
+                    f"Retry budget exhausted "
+                    f"({budget.retries} retries, {budget.wait_seconds:.0f}s): {e}"
+                )
                 raise
             
-            logger.warning(f"Attempt {attempt + 1} failed: {e}. Retrying in {delay}s...")
-            await asyncio.sleep(delay)
-            delay *= backoff_factor
-    
-    raise last_exception
+            await policy.record(wait)
+            logger.warning(f"Attempt {attempt + 1} failed: {e}. Retrying in {wait:.2f}s...")
+            await asyncio.sleep(wait)
+            delay = wait
 
 
 def handle_api_errors(service_name: str):
@@ -76,7 +267,7 @@ def handle_api_errors(service_name: str):
                 
                 if status_code == 401:
                     raise AuthenticationError(f"{service_name} 인증에 실패했습니다")
-                elif status_code == 403:
+                elif status_code in (403, 429):
                     raise RateLimitError(f"{service_name} API 호출 한도를 초과했습니다")
                 elif status_code == 404:
                     raise ExternalAPIError(service_name, "요청한 리소스를 찾을 수 없습니다")
@@ -99,42 +290,11 @@ def handle_api_errors(service_name: str):
     return decorator
 
 
-class RateLimiter:
-    """Simple rate limiter for API calls."""
-    
-    def __init__(self, max_calls: int, time_window: float):
-        """
-        Args:
-            max_calls: Maximum number of calls allowed
-            time_window: Time window in seconds
-        """
-        self.max_calls = max_calls
-        self.time_window = time_window
-        self.calls = []
-    
-    async def acquire(self):
-        """Wait if rate limit would be exceeded."""
-        import time
-        
-        now = time.time()
-        
-        # Remove old calls outside the time window
-        self.calls = [call_time for call_time in self.calls if now - call_time < self.time_window]
-        
-        if len(self.calls) >= self.max_calls:
-            # Calculate how long to wait
-            oldest_call = self.calls[0]
-            wait_time = self.time_window - (now - oldest_call)
-            
-            if wait_time > 0:
-                logger.info(f"Rate limit reached. Waiting {wait_time:.2f}s...")
-                await asyncio.sleep(wait_time)
-                # Recursive call to check again
-                return await self.acquire()
-        
-        self.calls.append(now)
-
+# Global rate limiters for different services, shared across processes via Redis
+github_rate_limiter = TokenBucketRateLimiter("github", capacity=60, refill_rate=1.0)  # 60 calls per minute
+solvedac_rate_limiter = TokenBucketRateLimiter("solvedac", capacity=100, refill_rate=100 / 60)  # 100 calls per minute
 
-# Global rate limiters for different services
-github_rate_limiter = RateLimiter(max_calls=60, time_window=60.0)  # 60 calls per minute
-solvedac_rate_limiter = RateLimiter(max_calls=100, time_window=60.0)  # 100 calls per minute
+# Retry policies per upstream
+github_retry_policy = RetryPolicy("github", max_retries=5)
+solvedac_retry_policy = RetryPolicy("solvedac", max_retries=5)
+velog_retry_policy = RetryPolicy("velog")
@@ -0,0 +1,218 @@
+"""Sync run state machine stored on ``sync_states``.
+
+Each (user, source) row records its latest run:
+
+    queued -> running -> succeeded | failed
+
+``claim_sync_run`` is called before a sync is enqueued and
+``tracked_sync_run`` wraps the worker task. Both only take over a row whose
+run is not active, so the same row doubles as a dedupe lock against
+double-triggered syncs. ``updated_at`` is the heartbeat: a running run that
+has not been touched for ``STALE_RUN_AFTER`` (a killed worker) no longer
+blocks new runs. A queued run may wait out a fan-out countdown first, so it
+is kept for ``STALE_QUEUED_AFTER``.
+"""
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timedelta
+from typing import Iterator, Optional
+
+from sqlalchemy import and_, func, or_, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models.sync_state import SyncState
+
+STALE_RUN_AFTER = timedelta(minutes=30)
+# Fanned-out runs are claimed up front with countdowns of up to one window
+STALE_QUEUED_AFTER = STALE_RUN_AFTER + timedelta(seconds=max(
+    settings.GITHUB_FANOUT_WINDOW_SECONDS,
+    settings.SOLVEDAC_FANOUT_WINDOW_SECONDS,
+    settings.VELOG_FANOUT_WINDOW_SECONDS,
+    settings.WEEKLY_FANOUT_WINDOW_SECONDS,
+))
+# Minimum seconds between progress writes while a run is fetching pages
+PROGRESS_FLUSH_SECONDS = 10.0
+
+
+def _run_is_active():
+    return or_(
+        and_(SyncState.status == "running", SyncState.updated_at > func.now() - STALE_RUN_AFTER),
+        and_(SyncState.status == "queued", SyncState.updated_at > func.now() - STALE_QUEUED_AFTER),
+    )
+
+
+def claim_sync_run(db: Session, user_id: str, source: str, task_id: str) -> bool:
+    """
+    Mark a run as queued unless one is already queued or running.
+    
+    Re-claiming a still-queued run with its own ``task_id`` succeeds, so a
+    caller that crashed before enqueueing can retry with the same id.
+    
+    Returns:
+        True if the caller now owns the run and should enqueue ``task_id``
+    """
+    now = datetime.utcnow()
+    stmt = insert(SyncState).values(
+        user_id=user_id,
+        source=source,
+        cursor={},
+        status="queued",
+        task_id=task_id,
+        queued_at=now,
+        updated_at=now,
+    )
+    stmt = stmt.on_conflict_do_update(
+        constraint="uq_sync_states_user_source",
+        set_={
+            "status": "queued",
+            "task_id": task_id,
+            "queued_at": now,
+            "error_message": None,
+            "updated_at": now,
+        },
+        # A claim of the same task that was never started is taken again
+        where=or_(
+            ~_run_is_active(),
+            and_(SyncState.task_id == task_id, SyncState.status == "queued"),
+        ),
+    ).returning(SyncState.id)
+    return db.execute(stmt).first() is not None
+
+
+def release_sync_run(db: Session, user_id: str, source: str, task_id: str, error: str) -> None:
+    """Fail a claimed run whose task could not be enqueued, so it stops blocking new runs."""
+    now = datetime.utcnow()
+    db.execute(
+        update(SyncState)
+        .where(
+            SyncState.user_id == user_id,
+            SyncState.source == source,
+            SyncState.task_id == task_id,
+            SyncState.status == "queued",
+        )
+        .values(status="failed", finished_at=now, error_message=error[:1000], updated_at=now)
+    )
+
+
+def _start_sync_run(db: Session, user_id: str, source: str, task_id: Optional[str]) -> bool:
+    """Move the row to running unless another task's run is active."""
+    now = datetime.utcnow()
+    values = {
+        "status": "running",
+        "task_id": task_id,
+        "started_at": now,
+        "finished_at": None,
+        "items_processed": 0,
+        "pages_fetched": 0,
+        "error_message": None,
+        "updated_at": now,
+    }
+    stmt = insert(SyncState).values(user_id=user_id, source=source, cursor={}, queued_at=now, **values)
+    stmt = stmt.on_conflict_do_update(
+        constraint="uq_sync_states_user_source",
+        set_=values,
+        # Our own queued claim is taken over; someone else's active run is not
+        where=or_(~_run_is_active(), SyncState.task_id == task_id),
+    ).returning(SyncState.id)
+    return db.execute(stmt).first() is not None
+
+
+class SyncProgress:
+    """
+    Counters of the running sync.
+    
+    Pages are counted by the collectors and flushed to ``sync_states`` at
+    most every ``PROGRESS_FLUSH_SECONDS`` (which also refreshes the
+    heartbeat); the task sets ``items`` once it knows what was stored.
+    """
+
+    def __init__(self, user_id: str, source: str):
+        self.user_id = user_id
+        self.source = source
+        self.pages = 0
+        self.items = 0
+        self.error: Optional[str] = None
+        self._flushed_at = time.monotonic()
+
+    def fail(self, message: str) -> None:
+        """Finish the run as failed without raising."""
+        self.error = message
+
+    def page_fetched(self) -> None:
+        self.pages += 1
+        if time.monotonic() - self._flushed_at >= PROGRESS_FLUSH_SECONDS:
+            self._flushed_at = time.monotonic()
+            _write_run(self.user_id, self.source, pages_fetched=self.pages)
+
+
+_current_progress: ContextVar[Optional[SyncProgress]] = ContextVar("sync_progress", default=None)
+
+
+def note_page() -> None:
+    """Count a fetched upstream page toward the current sync run, if any."""
+    progress = _current_progress.get()
+    if progress is not None:
+        progress.page_fetched()
+
+
+def _write_run(user_id: str, source: str, **values) -> None:
+    from app.database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        db.execute(
+            update(SyncState)
+            .where(SyncState.user_id == user_id, SyncState.source == source)
+            .values(updated_at=datetime.utcnow(), **values)
+        )
+        db.commit()
+    finally:
+        db.close()
+
+
+@contextmanager
+def tracked_sync_run(user_id: str, source: str, task_id: Optional[str] = None) -> Iterator[Optional[SyncProgress]]:
+    """
+    Record a worker's sync run from start to finish.
+    
+    Yields None when another run of the same user and source is already
+    active; the caller should return without syncing. Otherwise yields the
+    run's SyncProgress, which the collectors feed through ``note_page``. Like
+    ``retry_budget``, it is inherited by asyncio.run() and its tasks.
+    
+    The run ends as failed if the block raises or calls ``progress.fail``,
+    and as succeeded otherwise.
+    """
+    from app.database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        started = _start_sync_run(db, user_id, source, task_id)
+        db.commit()
+    finally:
+        db.close()
+    if not started:
+        yield None
+        return
+
+    progress = SyncProgress(user_id, source)
+    token = _current_progress.set(progress)
+    try:
+        yield progress
+    except Exception as exc:
+        progress.fail(str(exc) or exc.__class__.__name__)
+        raise
+    finally:
+        _current_progress.reset(token)
+        _write_run(
+            user_id,
+            source,
+            status="failed" if progress.error else "succeeded",
+            finished_at=datetime.utcnow(),
+            pages_fetched=progress.pages,
+            items_processed=progress.items,
+            error_message=progress.error[:1000] if progress.error else None,
+        )
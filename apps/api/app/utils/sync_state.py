@@ -0,0 +1,146 @@
+"""Read and write collector checkpoints and sync schedules stored in ``sync_states``.
+
+Every source has its own adaptive interval per user. A run that found new
+items halves the interval, a run that found nothing doubles it, always within
+the source's floor and ceiling. A run that failed (fully or in part) and found
+nothing keeps its interval, so an upstream outage never backs a user off. Users who were active on the site recently
+(any ``analytics_events`` row) are never scheduled beyond the default
+interval, so their data stays fresh while dormant accounts back off.
+"""
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict
+
+from sqlalchemy import exists, func
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app.models.sync_state import SyncState
+
+HOUR = 3600
+
+# source: (floor, default, ceiling) in seconds
+SYNC_INTERVALS = {
+    "github": (1 * HOUR, 3 * HOUR, 48 * HOUR),
+    "solvedac": (6 * HOUR, 24 * HOUR, 7 * 24 * HOUR),
+    "velog": (6 * HOUR, 24 * HOUR, 7 * 24 * HOUR),
+}
+
+# Activity in this window keeps a user at (or below) the default interval
+RECENT_ACTIVITY_WINDOW = timedelta(days=3)
+
+
+def get_sync_cursor(db: Session, user_id: str, source: str) -> Dict[str, Any]:
+    """Return the stored cursor for ``(user_id, source)``, or an empty dict."""
+    cursor = db.query(SyncState.cursor).filter(
+        SyncState.user_id == user_id,
+        SyncState.source == source,
+    ).scalar()
+    return dict(cursor or {})
+
+
+def save_sync_cursor(db: Session, user_id: str, source: str, cursor: Dict[str, Any]) -> None:
+    """
+    Upsert the cursor for ``(user_id, source)``.
+    
+    The caller commits, so the checkpoint lands in the same transaction as
+    the rows it describes.
+    """
+    stmt = insert(SyncState).values(
+        user_id=user_id,
+        source=source,
+        cursor=cursor,
+        updated_at=datetime.utcnow(),
+    )
+    stmt = stmt.on_conflict_do_update(
+        constraint="uq_sync_states_user_source",
+        set_={"cursor": stmt.excluded.cursor, "updated_at": stmt.excluded.updated_at},
+    )
+    db.execute(stmt)
+
+
+def _last_activity_at(db: Session, user_id: str):
+    from app.models.analytics_event import AnalyticsEvent
+
+    return db.query(func.max(AnalyticsEvent.created_at)).filter(
+        AnalyticsEvent.user_id == user_id,
+    ).scalar()
+
+
+def next_interval(
+    source: str,
+    current: int | None,
+    items_found: int,
+    recently_active: bool,
+    failed: bool = False,
+) -> int:
+    """
+    Compute the next sync interval for one user and source.
+    
+    Args:
+        source: Collector source
+        current: Interval used so far (None for the first run)
+        items_found: New rows found by the run that just finished
+        recently_active: Whether the user used the site recently
+        failed: Whether the run (or part of it) failed upstream
+        
+    Returns:
+        Interval in seconds, clamped to the source's floor and ceiling
+    """
+    floor, default, ceiling = SYNC_INTERVALS[source]
+    interval = current or default
+    if items_found > 0:
+        interval = interval // 2
+    elif not failed:
+        interval = interval * 2
+    if recently_active:
+        interval = min(interval, default)
+    return max(floor, min(ceiling, interval))
+
+
+def record_sync_result(
+    db: Session,
+    user_id: str,
+    source: str,
+    items_found: int,
+    failed: bool = False,
+) -> None:
+    """
+    Reschedule the next sync of ``(user_id, source)`` after a run.
+    
+    ``failed`` marks a run that could not fetch everything (an upstream
+    outage, some repos failing); finding nothing then says nothing about the
+    change rate, so the interval is not widened. The caller commits.
+    """
+    state = db.query(SyncState).filter(
+        SyncState.user_id == user_id,
+        SyncState.source == source,
+    ).first()
+    if state is None:
+        state = SyncState(user_id=user_id, source=source, cursor={})
+        db.add(state)
+    
+    now = datetime.utcnow()
+    last_activity = _last_activity_at(db, user_id)
+    if last_activity is not None and last_activity.tzinfo is not None:
+        last_activity = last_activity.astimezone(timezone.utc).replace(tzinfo=None)
+    recently_active = last_activity is not None and last_activity >= now - RECENT_ACTIVITY_WINDOW
+    
+    state.interval_seconds = next_interval(
+        source, state.interval_seconds, items_found, recently_active, failed
+    )
+    state.last_run_at = now
+    state.last_items_found = items_found
+    state.next_sync_at = now + timedelta(seconds=state.interval_seconds)
+
+
+def due_for_sync(source: str, user_id_column):
+    """
+    SQL condition matching users whose ``source`` sync is due.
+    
+    Users without a schedule yet are always due.
+    """
+    return ~exists().where(
+        SyncState.user_id == user_id_column,
+        SyncState.source == source,
+        SyncState.next_sync_at > func.now(),
+    )
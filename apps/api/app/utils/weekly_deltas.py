@@ -0,0 +1,205 @@
+"""Pending weekly summary deltas produced by ingestion.
+
+Collectors report every batch of newly inserted commits and solved problems
+here, in the same transaction as the rows themselves. Each report adds one
+``weekly_summary_deltas`` row per (user, week) holding a JSON object of field ->
+increment. Fields are ``day|<kind>|<YYYY-MM-DD>``, ``repo|<full_name>`` and
+``tag|<tag>``, mirroring ``summary_json``.
+
+Because rows and their deltas commit together, one database snapshot always
+sees either both or neither. Whoever writes a summary does so inside a
+``run_in_snapshot`` transaction: ``apply_weekly_deltas`` takes a week's
+visible deltas and adds them onto the summary, and a full rebuild deletes
+exactly the deltas its aggregate already covers. Two writers of the same
+week conflict (serialization failure or unique violation); the loser is
+rolled back, deltas included, and retried.
+
+The first report after a quiet period schedules ``apply_weekly_deltas``
+after ``WEEKLY_DELTA_DEBOUNCE_SECONDS`` through Redis, so a sync that writes
+many pages ends up in a single summary update. Scheduling is best effort:
+deltas stay in the table until the next scheduled run or a rebuild.
+"""
+import logging
+from collections import Counter, defaultdict
+from datetime import date, datetime, timedelta, timezone
+from typing import Callable, Dict, Iterable, List, Optional, Tuple, TypeVar
+from zoneinfo import ZoneInfo
+
+from sqlalchemy import delete, select, tuple_
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models.weekly_summary_delta import WeeklySummaryDelta
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+SCHEDULED_KEY = "weekly:delta:scheduled"
+# serialization_failure, deadlock_detected, unique_violation
+RETRYABLE_SQLSTATES = ("40001", "40P01", "23505")
+SNAPSHOT_ATTEMPTS = 5
+
+
+def _local_week_and_day(moment: datetime) -> Tuple[date, str]:
+    """Monday and local day of ``moment`` in ``WEEK_TIMEZONE`` (naive = UTC)."""
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    local = moment.astimezone(ZoneInfo(settings.WEEK_TIMEZONE)).date()
+    return local - timedelta(days=local.weekday()), local.isoformat()
+
+
+def record_commit_deltas(db: Session, user_id: str, repo_name: str, commits: Iterable[Dict]) -> None:
+    """Report newly inserted commits (dicts with ``committed_at``) of one repo; call before commit."""
+    increments: Dict[date, Counter] = defaultdict(Counter)
+    for commit in commits:
+        week, day = _local_week_and_day(commit["committed_at"])
+        increments[week][f"day|commits|{day}"] += 1
+        increments[week][f"repo|{repo_name or 'Unknown'}"] += 1
+    _record(db, user_id, increments)
+
+
+def record_problem_deltas(
+    db: Session,
+    user_id: str,
+    problems: Iterable[Tuple[datetime, Optional[List[str]]]],
+) -> None:
+    """Report newly linked solved problems as ``(solved_at, tags)`` pairs; call before commit."""
+    increments: Dict[date, Counter] = defaultdict(Counter)
+    for solved_at, tags in problems:
+        week, day = _local_week_and_day(solved_at)
+        increments[week][f"day|problems|{day}"] += 1
+        for tag in tags or []:
+            increments[week][f"tag|{tag}"] += 1
+    _record(db, user_id, increments)
+
+
+def _record(db: Session, user_id: str, increments: Dict[date, Counter]) -> None:
+    if not increments:
+        return
+    db.execute(insert(WeeklySummaryDelta).values([
+        {"user_id": user_id, "week_start": week, "fields": dict(fields), "created_at": datetime.utcnow()}
+        for week, fields in increments.items()
+    ]))
+    schedule_apply()
+
+
+def schedule_apply() -> None:
+    """Queue one apply run per debounce window."""
+    try:
+        from app.utils.redis_client import get_redis
+
+        debounce = settings.WEEKLY_DELTA_DEBOUNCE_SECONDS
+        if get_redis().set(SCHEDULED_KEY, "1", nx=True, ex=debounce + 60):
+            from worker.celery_app import celery_app
+
+            celery_app.send_task("worker.tasks.build_weekly.apply_weekly_deltas", countdown=debounce)
+    except Exception as exc:
+        logger.warning(f"Failed to schedule weekly delta apply: {exc}")
+
+
+def pending_weeks(db: Session, after: Optional[Tuple[str, date]] = None, limit: int = 500) -> List[Tuple[str, date]]:
+    """
+    List (user, week) pairs with pending deltas, in key order.
+    
+    Args:
+        db: Database session
+        after: Only pairs after this one (keyset pagination)
+        limit: Maximum number of pairs
+    """
+    stmt = select(WeeklySummaryDelta.user_id, WeeklySummaryDelta.week_start).distinct()
+    if after is not None:
+        stmt = stmt.where(tuple_(WeeklySummaryDelta.user_id, WeeklySummaryDelta.week_start) > after)
+    stmt = stmt.order_by(WeeklySummaryDelta.user_id, WeeklySummaryDelta.week_start).limit(limit)
+    return [(str(user_id), week_start) for user_id, week_start in db.execute(stmt)]
+
+
+def pop_pending_deltas(db: Session, user_id: str, week_start: date) -> Dict[str, int]:
+    """
+    Delete the week's deltas visible to this transaction and return their sum.
+    
+    The deltas are only gone once the caller commits, so a failed apply
+    leaves them pending for the next run.
+    """
+    stmt = delete(WeeklySummaryDelta).where(
+        WeeklySummaryDelta.user_id == user_id,
+        WeeklySummaryDelta.week_start == week_start,
+    ).returning(WeeklySummaryDelta.fields)
+    total = Counter()
+    for (fields,) in db.execute(stmt):
+        total.update(fields)
+    return {field: amount for field, amount in total.items() if amount}
+
+
+def discard_deltas(db: Session, user_id: str, weeks: Iterable[date]) -> None:
+    """
+    Drop the deltas of weeks whose summaries this transaction rebuilt.
+    
+    Call it in the rebuild's ``run_in_snapshot`` transaction, after the
+    aggregate: only deltas of rows the aggregate saw are deleted.
+    """
+    weeks = list(weeks)
+    if weeks:
+        db.execute(delete(WeeklySummaryDelta).where(
+            WeeklySummaryDelta.user_id == user_id,
+            WeeklySummaryDelta.week_start.in_(weeks),
+        ))
+
+
+def run_in_snapshot(work: Callable[[Session], T], session_factory: Optional[Callable[[], Session]] = None) -> T:
+    """
+    Run ``work(db)`` in its own REPEATABLE READ transaction and commit it.
+    
+    Every statement of ``work`` sees the same snapshot, so an aggregate and
+    the deltas taken or discarded with it cover the same rows. A conflict
+    with a concurrent writer of the same summary rolls everything back and
+    runs ``work`` again on a fresh snapshot.
+    """
+    if session_factory is None:
+        from app.database import SessionLocal
+
+        session_factory = SessionLocal
+    for attempt in range(1, SNAPSHOT_ATTEMPTS + 1):
+        db = session_factory()
+        try:
+            db.connection(execution_options={"isolation_level": "REPEATABLE READ"})
+            result = work(db)
+            db.commit()
+            return result
+        except DBAPIError as exc:
+            db.rollback()
+            if attempt == SNAPSHOT_ATTEMPTS or getattr(exc.orig, "sqlstate", None) not in RETRYABLE_SQLSTATES:
+                raise
+            logger.info(f"Weekly summary write conflicted, retrying (attempt {attempt}): {exc.orig}")
+        finally:
+            db.close()
+
+
+def apply_delta(summary_json: Dict, fields: Dict[str, int]) -> Tuple[Dict, Dict[str, int]]:
+    """
+    Add a delta onto a summary JSON.
+    
+    Returns:
+        The updated summary and the commit/problem/note count increments
+    """
+    summary = {
+        "by_day": {day: dict(values) for day, values in (summary_json.get("by_day") or {}).items()},
+        "problems_by_tag": dict(summary_json.get("problems_by_tag") or {}),
+        "commits_by_repo": dict(summary_json.get("commits_by_repo") or {}),
+    }
+    counts = Counter()
+    for field, amount in fields.items():
+        scope, _, rest = field.partition("|")
+        if scope == "day":
+            kind, _, day = rest.partition("|")
+            values = summary["by_day"].setdefault(day, {"commits": 0, "problems": 0, "notes": 0})
+            values[kind] = values.get(kind, 0) + amount
+            counts[kind] += amount
+        elif scope == "repo":
+            summary["commits_by_repo"][rest] = summary["commits_by_repo"].get(rest, 0) + amount
+        elif scope == "tag":
+            summary["problems_by_tag"][rest] = summary["problems_by_tag"].get(rest, 0) + amount
+    summary["by_day"] = dict(sorted(summary["by_day"].items()))
+    return summary, dict(counts)
@@ -10,6 +10,7 @@ celery_app = Celery(
         "worker.tasks.sync_github",
         "worker.tasks.sync_solvedac",
         "worker.tasks.sync_velog",
+        "worker.tasks.sync_user",
         "worker.tasks.build_weekly",
         "worker.tasks.forge_llm",
     ]
@@ -22,21 +23,30 @@ celery_app.conf.update(
     result_serializer="json",
     timezone="UTC",
     enable_utc=True,
+    # Countdown tasks wait in the broker unacknowledged; the Redis default
+    # (3600s) would redeliver fan-out tasks spread over an hour-long window
+    broker_transport_options={"visibility_timeout": settings.CELERY_VISIBILITY_TIMEOUT_SECONDS},
 )
 
 # Celery Beat schedule
 celery_app.conf.beat_schedule = {
-    "sync-github-every-3-hours": {
+    # Sync fan-outs run hourly but only queue users whose adaptive
+    # per-source schedule is due (see app.utils.sync_state)
+    "sync-github-hourly": {
         "task": "worker.tasks.sync_github.sync_all_users_github",
-        "schedule": crontab(minute=0, hour="*/3"),  # Every 3 hours
+        "schedule": crontab(minute=0),
     },
-    "sync-solvedac-daily": {
+    "sync-solvedac-hourly": {
         "task": "worker.tasks.sync_solvedac.sync_all_users_solvedac",
-        "schedule": crontab(minute=0, hour=3),  # 3 AM daily
+        "schedule": crontab(minute=20),
     },
-    "sync-velog-daily": {
+    "refresh-problem-catalog-weekly": {
+        "task": "worker.tasks.sync_solvedac.refresh_problem_catalog",
+        "schedule": crontab(minute=0, hour=5, day_of_week=0),  # Sunday 5 AM
+    },
+    "sync-velog-hourly": {
         "task": "worker.tasks.sync_velog.sync_all_users_velog",
-        "schedule": crontab(minute=30, hour=3),  # 3:30 AM daily
+        "schedule": crontab(minute=40),
     },
     "build-weekly-summaries": {
         "task": "worker.tasks.build_weekly.build_all_weekly_summaries",
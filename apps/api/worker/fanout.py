@@ -0,0 +1,169 @@
+"""Staggered, resumable per-user fan-out for periodic tasks.
+
+Beat tasks used to load every ``User`` and ``.delay()`` one task per user in
+the same second. ``fan_out_users`` instead streams only the ids that qualify
+(filtered in SQL), in keyset-paginated chunks, and gives every task a
+countdown spread evenly across a window plus jitter. Progress (the last id
+queued) is kept in Redis per run, so a beat run that crashed half-way
+continues where it stopped instead of re-queueing everyone.
+
+For sync tasks every user's run is claimed (``claim_sync_run``) right before
+it is queued, exactly like a user-triggered sync, so a fanned-out run never
+overlaps one the user started and a user already queued or running is
+skipped. Task ids are derived from the run id, so a run resumed after a
+crash between a claim and its ``apply_async`` re-queues that claim instead
+of leaving it locked.
+"""
+import json
+import logging
+import random
+import uuid
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+FANOUT_CHUNK_SIZE = 500
+
+
+def _load_progress(key: str) -> Optional[Dict[str, Any]]:
+    try:
+        from app.utils.redis_client import get_redis
+
+        raw = get_redis().get(key)
+        return json.loads(raw) if raw else None
+    except Exception as exc:
+        logger.warning(f"Fan-out progress unavailable ({key}): {exc}")
+        return None
+
+
+def _save_progress(key: str, progress: Dict[str, Any], ttl_seconds: int) -> None:
+    try:
+        from app.utils.redis_client import get_redis
+
+        get_redis().set(key, json.dumps(progress), ex=ttl_seconds)
+    except Exception as exc:
+        logger.warning(f"Failed to record fan-out progress ({key}): {exc}")
+
+
+def fan_out_users(
+    db: Session,
+    run_name: str,
+    run_id: str,
+    id_column,
+    task,
+    window_seconds: int,
+    filters: tuple = (),
+    task_args: tuple = (),
+    chunk_size: int = FANOUT_CHUNK_SIZE,
+    source: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    Queue ``task(user_id, *task_args)`` for every qualifying user, staggered.
+    
+    Args:
+        db: Database session
+        run_name: Name of the periodic job (e.g. 'sync_github')
+        run_id: Identifies one scheduled run (e.g. the week or hour it covers);
+            a run with the same id resumes instead of starting over
+        id_column: User id column to stream (e.g. ``OAuthAccount.user_id``)
+        task: Celery task to queue
+        window_seconds: Tasks are spread over this many seconds (capped at
+            half the broker's visibility timeout)
+        filters: SQL conditions selecting the users that need the task
+        task_args: Extra positional arguments after the user id
+        chunk_size: Ids fetched per keyset page
+        source: Sync source whose run is claimed per user before queueing
+        
+    Returns:
+        Run summary with the number of users queued
+    """
+    from app.config import settings
+
+    max_window = settings.CELERY_VISIBILITY_TIMEOUT_SECONDS // 2
+    if window_seconds > max_window:
+        logger.warning(f"Fan-out {run_name} window {window_seconds}s capped at {max_window}s")
+        window_seconds = max_window
+
+    key = f"fanout:{run_name}"
+    ttl_seconds = max(3600, window_seconds * 2)
+    progress = _load_progress(key)
+    if not progress or progress.get("run_id") != run_id:
+        progress = {
+            "run_id": run_id,
+            "last_id": None,
+            "queued": 0,
+            "skipped": 0,
+            "done": False,
+            "started_at": datetime.utcnow().isoformat(),
+        }
+    if progress["done"]:
+        logger.info(f"Fan-out {run_name} run {run_id} already completed")
+        return {"status": "already_queued", **progress}
+    if progress["last_id"]:
+        logger.info(f"Resuming fan-out {run_name} run {run_id} after {progress['queued']} users")
+
+    total = db.execute(
+        select(func.count(func.distinct(id_column))).where(*filters)
+    ).scalar() or 0
+    slot = window_seconds / max(total, 1)
+
+    from app.utils.sync_runs import claim_sync_run, release_sync_run
+
+    last_id = progress["last_id"]
+    while True:
+        stmt = select(id_column).where(*filters).group_by(id_column).order_by(id_column).limit(chunk_size)
+        if last_id:
+            stmt = stmt.where(id_column > uuid.UUID(last_id))
+        user_ids = [str(user_id) for user_id in db.execute(stmt).scalars()]
+        if not user_ids:
+            break
+
+        # The keyset cursor follows the fetched page, not the claimed subset
+        page_last = user_ids[-1]
+        for user_id in user_ids:
+            # Stable per run, so a resumed run recognises its own claims
+            task_id = str(uuid.uuid5(uuid.NAMESPACE_URL, f"fanout:{run_name}:{run_id}:{user_id}"))
+            if source:
+                claimed = claim_sync_run(db, user_id, source, task_id)
+                db.commit()
+                if not claimed:
+                    progress["skipped"] = progress.get("skipped", 0) + 1
+                    progress["last_id"] = user_id
+                    continue
+
+            # Evenly spaced slots, jittered within the slot
+            countdown = min(window_seconds, (progress["queued"] + random.random()) * slot)
+            try:
+                task.apply_async((user_id, *task_args), countdown=countdown, task_id=task_id)
+            except Exception:
+                if source:
+                    release_sync_run(db, user_id, source, task_id, "Failed to enqueue sync task")
+                    db.commit()
+                _save_progress(key, progress, ttl_seconds)
+                raise
+            progress["queued"] += 1
+            progress["last_id"] = user_id
+            # Saved per user: a crash between claim and queue leaves at most
+            # this user's claim, which the resumed run takes over
+            _save_progress(key, progress, ttl_seconds)
+
+        last_id = page_last
+        progress["last_id"] = last_id
+        _save_progress(key, progress, ttl_seconds)
+
+    progress["done"] = True
+    progress["finished_at"] = datetime.utcnow().isoformat()
+    _save_progress(key, progress, ttl_seconds)
+    logger.info(f"Fan-out {run_name} run {run_id} queued {progress['queued']} users over {window_seconds}s")
+
+    return {
+        "status": "queued",
+        "user_count": progress["queued"],
+        "skipped": progress.get("skipped", 0),
+        "window_seconds": window_seconds,
+        "run_id": run_id,
+    }
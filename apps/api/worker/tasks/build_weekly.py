@@ -2,15 +2,17 @@ import sys
 sys.path.insert(0, '/app/packages/merge_timeline')
 sys.path.insert(0, '/app/packages/merge_core')
 
-from datetime import datetime, timedelta, date
+import logging
+import uuid
+from collections import Counter
+from datetime import datetime, timedelta
 from worker.celery_app import celery_app
+from app.config import settings
 from app.database import SessionLocal
 from app.models.user import User
 from app.models.weekly_summary import WeeklySummary
-from app.models.commit import Commit
-from app.models.problem import Problem
-from app.models.note import Note
-from sqlalchemy import func
+
+logger = logging.getLogger(__name__)
 
 
 @celery_app.task
@@ -21,93 +23,206 @@ def build_weekly_summary(user_id: str, week_start_date: str, generate_report: bo
         user = db.query(User).filter(User.id == user_id).first()
         if not user:
             return {"error": "User not found"}
-        
-        week_start = datetime.fromisoformat(week_start_date).date()
-        week_end = week_start + timedelta(days=6)
-        
-        # Query data for the week
-        # Compare by calendar date to include the full Monday~Sunday window.
-        commits = db.query(Commit).filter(
-            Commit.user_id == user.id,
-            func.date(Commit.committed_at) >= week_start,
-            func.date(Commit.committed_at) <= week_end
-        ).all()
-        
-        problems = db.query(Problem).filter(
-            Problem.user_id == user.id,
-            func.date(Problem.solved_at) >= week_start,
-            func.date(Problem.solved_at) <= week_end
-        ).all()
-        
-        notes = db.query(Note).filter(
-            Note.user_id == user.id,
-            func.date(Note.created_at) >= week_start,
-            func.date(Note.created_at) <= week_end
-        ).all()
-        
-        # Build aggregation
-        from merge_timeline.aggregator import aggregate_week_data
-        
-        summary_json = aggregate_week_data(commits, problems, notes)
-        
-        # Upsert weekly summary
-        existing = db.query(WeeklySummary).filter(
-            WeeklySummary.user_id == user.id,
-            WeeklySummary.week_start == week_start,
-            WeeklySummary.week_end == week_end
-        ).first()
-        
-        if existing:
-            summary = existing
-            summary.commit_count = len(commits)
-            summary.problem_count = len(problems)
-            summary.note_count = len(notes)
-            summary.summary_json = summary_json
-        else:
-            summary = WeeklySummary(
-                user_id=user.id,
-                week_start=week_start,
-                week_end=week_end,
-                commit_count=len(commits),
-                problem_count=len(problems),
-                note_count=len(notes),
-                summary_json=summary_json,
-            )
-            db.add(summary)
+    finally:
+        db.close()
+    
+    from merge_timeline.builder import build_weekly_summary as build
+    from app.utils.weekly_deltas import run_in_snapshot
+    
+    week_start = datetime.fromisoformat(week_start_date).date()
+    # Aggregate, upsert and delta discard share one REPEATABLE READ snapshot
+    weekly_id = run_in_snapshot(lambda db: build(user_id, week_start, db))["id"]
+
+    if generate_report:
+        from worker.tasks.forge_llm import generate_weekly_report_llm
+
+        generate_weekly_report_llm.delay(user_id, weekly_id)
+
+    return {
+        "status": "success",
+        "user_id": user_id,
+        "week_start": week_start_date,
+        "weekly_id": weekly_id,
+        "report_queued": generate_report,
+    }
+
+
+@celery_app.task
+def backfill_weekly_summaries(user_id: str, start_date: str | None = None, end_date: str | None = None):
+    """Build every weekly summary of a user in a date range in one pass.
 
-        db.commit()
-        db.refresh(summary)
+    Defaults to the weeks from the user's earliest commit, solve or note up
+    to the current week, at most ``WEEKLY_BACKFILL_MAX_WEEKS`` weeks back.
+    Weeks whose data hasn't changed since the last build are skipped.
+    """
+    from merge_timeline.builder import backfill_weekly_summaries as backfill
+    from merge_timeline.weeks import current_week_start, week_timezone
+    from app.utils.weekly_deltas import run_in_snapshot
 
-        if generate_report:
-            from worker.tasks.forge_llm import generate_weekly_report_llm
+    db = SessionLocal()
+    try:
+        user = db.query(User).filter(User.id == user_id).first()
+        if not user:
+            return {"error": "User not found"}
 
-            generate_weekly_report_llm.delay(user_id, str(summary.id))
+        last_week = _monday(end_date) if end_date else current_week_start()
+        earliest_week = last_week - timedelta(weeks=settings.WEEKLY_BACKFILL_MAX_WEEKS - 1)
+        if start_date:
+            first_week = _monday(start_date)
+        else:
+            first_activity = _first_activity_at(db, user.id)
+            if first_activity is None:
+                return {"status": "success", "user_id": user_id, "weeks": 0, "active_weeks": 0, "written": 0}
+            first_week = _monday(first_activity.astimezone(week_timezone()).date().isoformat())
+        first_week = max(first_week, earliest_week)
+        if first_week > last_week:
+            return {"error": "Invalid date range"}
 
+        # Pending deltas of the range are discarded in the backfill's snapshot
+        result = run_in_snapshot(lambda snapshot_db: backfill(str(user.id), first_week, last_week, snapshot_db))
         return {
             "status": "success",
             "user_id": user_id,
-            "week_start": week_start_date,
-            "weekly_id": str(summary.id),
-            "report_queued": generate_report,
+            "first_week": first_week.isoformat(),
+            "last_week": last_week.isoformat(),
+            **result,
         }
     finally:
         db.close()
 
 
+def _monday(day: str):
+    value = datetime.fromisoformat(day).date()
+    return value - timedelta(days=value.weekday())
+
+
+def _first_activity_at(db, user_id):
+    """Earliest commit, solve or note timestamp (index-only min lookups)."""
+    from sqlalchemy import func
+    from app.models.commit import Commit
+    from app.models.note import Note
+    from app.models.problem import Problem
+
+    candidates = [
+        db.query(func.min(Commit.committed_at)).filter(Commit.user_id == user_id).scalar(),
+        db.query(func.min(Problem.solved_at)).filter(Problem.user_id == user_id).scalar(),
+        db.query(func.min(Note.created_at)).filter(Note.user_id == user_id).scalar(),
+    ]
+    candidates = [value for value in candidates if value is not None]
+    return min(candidates) if candidates else None
+
+
 @celery_app.task
 def build_all_weekly_summaries():
     """Build weekly summaries for all users for the previous week."""
     db = SessionLocal()
     try:
-        # Get last Monday
-        today = date.today()
-        days_since_monday = (today.weekday() - 0) % 7
-        last_monday = today - timedelta(days=days_since_monday + 7)
+        from merge_timeline.weeks import current_week_start
+        from worker.fanout import fan_out_users
         
-        users = db.query(User).all()
-        for user in users:
-            build_weekly_summary.delay(str(user.id), last_monday.isoformat())
+        # Monday of the week that just ended in WEEK_TIMEZONE
+        last_monday = current_week_start() - timedelta(days=7)
         
-        return {"status": "queued", "user_count": len(users), "week_start": last_monday.isoformat()}
+        result = fan_out_users(
+            db,
+            run_name="build_weekly",
+            run_id=last_monday.isoformat(),
+            id_column=User.id,
+            task=build_weekly_summary,
+            task_args=(last_monday.isoformat(),),
+            window_seconds=settings.WEEKLY_FANOUT_WINDOW_SECONDS,
+        )
+        return {**result, "week_start": last_monday.isoformat()}
     finally:
         db.close()
+
+
+@celery_app.task
+def apply_weekly_deltas():
+    """
+    Fold the commit/problem deltas reported by ingestion into weekly summaries.
+    
+    Queued by ``app.utils.weekly_deltas`` once per debounce window. Each
+    pending (user, week) is handled in its own ``run_in_snapshot``
+    transaction: its deltas are taken and added onto the stored summary
+    under a row lock, or, for a week without a summary yet, the summary is
+    built from the same snapshot, which already covers them. A week that
+    fails keeps its deltas (the transaction is rolled back) and another run
+    is scheduled.
+    """
+    from app.utils.redis_client import get_redis
+    from app.utils.weekly_deltas import SCHEDULED_KEY, pending_weeks, run_in_snapshot, schedule_apply
+    
+    # Reports arriving from now on schedule the next run
+    get_redis().delete(SCHEDULED_KEY)
+    
+    outcomes = Counter()
+    after = None
+    while True:
+        db = SessionLocal()
+        try:
+            weeks = pending_weeks(db, after=after)
+        finally:
+            db.close()
+        if not weeks:
+            break
+        for user_id, week_start in weeks:
+            try:
+                outcomes[run_in_snapshot(lambda db: _apply_week(db, user_id, week_start))] += 1
+            except Exception as exc:
+                outcomes["failed"] += 1
+                logger.warning(f"Failed to apply weekly delta for user {user_id}, week {week_start}: {exc}")
+        after = weeks[-1]
+    
+    if outcomes["failed"]:
+        schedule_apply()
+    return {
+        "status": "success",
+        "applied": outcomes["applied"],
+        "built": outcomes["built"],
+        "failed": outcomes["failed"],
+    }
+
+
+def _apply_week(db, user_id: str, week_start):
+    """Fold one week's pending deltas into its summary; returns 'applied', 'built' or 'empty'."""
+    from sqlalchemy.dialects.postgresql import insert
+    from merge_timeline.sql_aggregator import aggregate_week_sql, summary_fingerprint
+    from app.utils.weekly_deltas import apply_delta, pop_pending_deltas
+    
+    fields = pop_pending_deltas(db, user_id, week_start)
+    if not fields:
+        return "empty"
+    
+    summary = db.query(WeeklySummary).filter(
+        WeeklySummary.user_id == user_id,
+        WeeklySummary.week_start == week_start,
+    ).with_for_update().first()
+    if summary:
+        summary_json, counts = apply_delta(summary.summary_json or {}, fields)
+        summary.commit_count = (summary.commit_count or 0) + counts.get("commits", 0)
+        summary.problem_count = (summary.problem_count or 0) + counts.get("problems", 0)
+        summary.note_count = (summary.note_count or 0) + counts.get("notes", 0)
+        summary.summary_json = summary_json
+        summary.source_fingerprint = summary_fingerprint(summary_json)
+        return "applied"
+    
+    # The snapshot that produced ``fields`` also sees every row they count.
+    # A concurrent build inserting the week first makes this fail with a
+    # unique violation and the week is retried against its summary.
+    summary_json, counts = aggregate_week_sql(db, user_id, week_start)
+    now = datetime.utcnow()
+    db.execute(insert(WeeklySummary).values(
+        id=uuid.uuid4(),
+        user_id=user_id,
+        week_start=week_start,
+        week_end=week_start + timedelta(days=6),
+        commit_count=counts["commits"],
+        problem_count=counts["problems"],
+        note_count=counts["notes"],
+        summary_json=summary_json,
+        source_fingerprint=summary_fingerprint(summary_json),
+        created_at=now,
+        updated_at=now,
+    ))
+    return "built"
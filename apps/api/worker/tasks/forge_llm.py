@@ -248,8 +248,6 @@ def learn_velog_style(user_id: str):
     try:
         from app.models.blog_post import BlogPost
         from app.models.user_profile import UserProfile
-        import httpx
-        import feedparser
 
         # Get user's velog ID
         user_profile = db.query(UserProfile).filter(UserProfile.user_id == user_id).first()
@@ -258,31 +256,19 @@ def learn_velog_style(user_id: str):
 
         clean_id = user_profile.velog_id.lstrip("@")
 
-        # Fetch RSS with full content
-        try:
-            resp = httpx.get(f"https://api.velog.io/rss/@{clean_id}", timeout=30.0)
-            resp.raise_for_status()
-        except Exception as e:
-            return {"error": f"Failed to fetch Velog RSS: {str(e)}"}
-
-        feed = feedparser.parse(resp.text)
-        if not hasattr(feed, "entries") or len(feed.entries) == 0:
-            return {"error": "No blog posts found"}
+        # Post bodies are cleaned and stored by the Velog collector
+        posts = db.query(BlogPost.title, BlogPost.body_excerpt).filter(
+            BlogPost.user_id == user_id,
+            BlogPost.platform == "velog",
+            BlogPost.body_excerpt.isnot(None),
+            BlogPost.body_excerpt != "",
+        ).order_by(BlogPost.published_at.desc()).limit(5).all()
 
         # Collect post samples (up to 5 most recent with content)
-        samples = []
-        for entry in feed.entries[:5]:
-            title = entry.get("title", "")
-            # RSS description/content contains the post body
-            body = entry.get("description", "") or entry.get("content", [{}])[0].get("value", "")
-            # Strip HTML tags for cleaner analysis
-            import re
-            clean_body = re.sub(r"<[^>]+>", "", body)[:2000]
-            if clean_body:
-                samples.append(f"### {title}\n{clean_body}")
+        samples = [f"### {title}\n{body_excerpt}" for title, body_excerpt in posts]
 
         if not samples:
-            return {"error": "No post content available for analysis"}
+            return {"error": "No post content available for analysis. Sync Velog first."}
 
         combined_samples = "\n\n---\n\n".join(samples)
 
@@ -5,55 +5,192 @@ sys.path.insert(0, '/app/packages/merge_forge')
 sys.path.insert(0, '/app/packages/merge_styler')
 sys.path.insert(0, '/app/packages/merge_timeline')
 
+import asyncio
+import logging
+from datetime import datetime
+
 from worker.celery_app import celery_app
+from app.config import settings
 from app.database import SessionLocal
 from app.models.user import User
 from app.models.oauth_account import OAuthAccount
-import httpx
+from app.utils.retry import retry_budget
+from app.utils.sync_runs import tracked_sync_run
+from app.utils.sync_state import due_for_sync, record_sync_result
+
+logger = logging.getLogger(__name__)
 
 
 @celery_app.task
-def sync_github_for_user(user_id: str):
-    """Sync GitHub repos and commits for a single user."""
+def sync_github_for_user(user_id: str, full_resync: bool = False):
+    """Sync GitHub repos and commits for a single user.
+
+    Commits are synced incrementally from each repo's stored cursor unless
+    ``full_resync`` is set, in which case the full history is re-paged.
+    """
+    with tracked_sync_run(user_id, "github", sync_github_for_user.request.id) as run:
+        if run is None:
+            return {"status": "skipped", "reason": "GitHub sync already running"}
+        
+        db = SessionLocal()
+        try:
+            user = db.query(User).filter(User.id == user_id).first()
+            if not user:
+                run.fail("User not found")
+                return {"error": "User not found"}
+            
+            # Get GitHub OAuth account
+            github_account = db.query(OAuthAccount).filter(
+                OAuthAccount.user_id == user.id,
+                OAuthAccount.provider == "github"
+            ).first()
+            
+            if not github_account:
+                run.fail("GitHub account not connected")
+                return {"error": "GitHub account not connected"}
+            
+            # Sync repos and commits in a single event loop, sharing one retry budget
+            with retry_budget() as budget:
+                repos, failures, new_commits = asyncio.run(
+                    _sync_user_github(str(user.id), github_account.access_token, db, full_resync)
+                )
+            
+            record_sync_result(db, user_id, "github", new_commits, failed=bool(failures))
+            db.commit()
+            run.items = new_commits
+            if failures:
+                run.fail(f"Commit sync failed for {len(failures)} of {len(repos)} repos: {', '.join(failures)}")
+            
+            # Stats are not in the commits listing; fill them in off the sync path
+            enrich_commit_stats_for_user.delay(user_id)
+            
+            return {
+                "status": "partial" if failures else "success",
+                "user_id": user_id,
+                "repos_synced": len(repos),
+                "repos_failed": failures,
+                "new_commits": new_commits,
+                "full_resync": full_resync,
+                "retries": budget.retries,
+                "retry_wait_seconds": round(budget.wait_seconds, 1),
+            }
+        finally:
+            db.close()
+
+
+async def _sync_user_github(user_id: str, access_token: str, db, full_resync: bool):
+    """Run the GitHub collector on one pooled client."""
+    from merge_collector.base import build_context
+    from merge_collector.collectors import GitHubCollector
+    from merge_collector.http import create_client
+
+    async with create_client() as client:
+        ctx = build_context(user_id, db, client, access_token, full_resync)
+        repos = await GitHubCollector().sync(ctx)
+
+    return repos, ctx["failures"], ctx["new_items"]
+
+
+@celery_app.task
+def ingest_github_push(provider_repo_id: str, commits: list[dict]):
+    """Insert commits delivered by a push webhook.
+
+    Rows are normalized exactly like polled commits and deduplicated by
+    ``(repo_id, sha)``. The repo's polling cursor is left untouched, so a
+    push payload that was truncated can never make the next poll skip
+    commits; that poll simply finds the pushed ones already stored.
+    """
+    from merge_collector.github import bulk_insert_commits
+    from merge_collector.github_webhook import normalize_push_commits
+    from app.models.repo import Repo
+    from app.utils.weekly_deltas import record_commit_deltas
+
+    db = SessionLocal()
+    try:
+        repos = db.query(Repo).filter(Repo.provider_repo_id == provider_repo_id).all()
+        if not repos:
+            return {"status": "ignored", "reason": "Repository not tracked"}
+
+        inserted = []
+        for repo in repos:
+            rows = normalize_push_commits(commits, str(repo.id), str(repo.user_id))
+            new_commits = bulk_insert_commits(db, rows)
+            if new_commits:
+                record_commit_deltas(db, str(repo.user_id), repo.full_name, new_commits)
+                inserted.append((str(repo.user_id), repo.full_name, new_commits))
+                enrich_commit_stats_for_user.apply_async((str(repo.user_id),), countdown=30)
+        db.commit()
+
+        return {
+            "status": "success",
+            "repos": len(repos),
+            "commits_inserted": sum(len(new_commits) for _, _, new_commits in inserted),
+        }
+    finally:
+        db.close()
+
+
+@celery_app.task
+def enrich_commit_stats_for_user(user_id: str):
+    """Fetch additions/deletions/files_changed for a user's pending commits.
+
+    Handles up to ``GITHUB_STATS_MAX_PER_RUN`` commits per run and re-queues
+    itself while more are pending. Progress is committed per batch, so a
+    killed run loses at most the batches in flight.
+    """
+    from merge_collector.github_graphql import enrich_commit_stats
+
     db = SessionLocal()
     try:
-        user = db.query(User).filter(User.id == user_id).first()
-        if not user:
-            return {"error": "User not found"}
-        
-        # Get GitHub OAuth account
         github_account = db.query(OAuthAccount).filter(
-            OAuthAccount.user_id == user.id,
+            OAuthAccount.user_id == user_id,
             OAuthAccount.provider == "github"
         ).first()
         
         if not github_account:
             return {"error": "GitHub account not connected"}
         
-        # Sync repos and commits
-        import asyncio
-        from merge_collector.github import sync_repos, sync_commits
+        with retry_budget():
+            result = asyncio.run(
+                enrich_commit_stats(
+                    user_id,
+                    github_account.access_token,
+                    db,
+                    batch_size=settings.GITHUB_STATS_BATCH_SIZE,
+                    max_commits=settings.GITHUB_STATS_MAX_PER_RUN,
+                    concurrency=settings.GITHUB_SYNC_CONCURRENCY,
+                )
+            )
         
-        # Sync repositories
-        repos = asyncio.run(sync_repos(str(user.id), github_account.access_token, db))
+        # Keep going only while batches make progress, otherwise wait for the next sync
+        if result["has_more"] and (result["enriched"] or result["unresolved"]):
+            enrich_commit_stats_for_user.apply_async((user_id,), countdown=60)
         
-        # Sync all commits for each repo (no time limit)
-        for repo in repos:
-            asyncio.run(sync_commits(str(user.id), repo["id"], github_account.access_token, db, since_days=None))
-        
-        return {"status": "success", "user_id": user_id, "repos_synced": len(repos)}
+        return {"status": "success", "user_id": user_id, **result}
     finally:
         db.close()
 
 
 @celery_app.task
 def sync_all_users_github():
-    """Sync GitHub for all active users."""
+    """Sync GitHub for every linked user whose adaptive schedule is due, staggered."""
+    from worker.fanout import fan_out_users
+
     db = SessionLocal()
     try:
-        users = db.query(User).all()
-        for user in users:
-            sync_github_for_user.delay(str(user.id))
-        return {"status": "queued", "user_count": len(users)}
+        now = datetime.utcnow()
+        return fan_out_users(
+            db,
+            run_name="sync_github",
+            run_id=f"{now:%Y-%m-%dT%H}",  # one run per hourly beat slot
+            id_column=OAuthAccount.user_id,
+            filters=(
+                OAuthAccount.provider == "github",
+                due_for_sync("github", OAuthAccount.user_id),
+            ),
+            task=sync_github_for_user,
+            window_seconds=settings.GITHUB_FANOUT_WINDOW_SECONDS,
+            source="github",
+        )
     finally:
         db.close()
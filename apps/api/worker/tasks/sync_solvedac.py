@@ -2,45 +2,110 @@ import sys
 sys.path.insert(0, '/app/packages/merge_collector')
 sys.path.insert(0, '/app/packages/merge_core')
 
+from datetime import datetime, timedelta
+
 from worker.celery_app import celery_app
+from app.config import settings
 from app.database import SessionLocal
 from app.models.user import User
 from app.models.user_profile import UserProfile
+from app.models.problem_catalog import ProblemCatalog
+from app.utils.retry import retry_budget
+from app.utils.sync_runs import tracked_sync_run
+from app.utils.sync_state import due_for_sync, record_sync_result
+
+
+@celery_app.task
+def sync_solvedac_for_user(user_id: str, full_resync: bool = False):
+    """Sync solved.ac problems for a single user.
+
+    Only the problems missing from the database are paged for unless
+    ``full_resync`` is set.
+    """
+    with tracked_sync_run(user_id, "solvedac", sync_solvedac_for_user.request.id) as run:
+        if run is None:
+            return {"status": "skipped", "reason": "solved.ac sync already running"}
+        
+        db = SessionLocal()
+        try:
+            user = db.query(User).filter(User.id == user_id).first()
+            if not user:
+                run.fail("User not found")
+                return {"error": "User not found"}
+            
+            # Get solved.ac handle
+            profile = db.query(UserProfile).filter(UserProfile.user_id == user.id).first()
+            if not profile or not profile.solvedac_handle:
+                run.fail("solved.ac handle not configured")
+                return {"error": "solved.ac handle not configured"}
+            
+            # Sync solved problems
+            import asyncio
+            from merge_collector.solvedac import sync_problems
+            
+            with retry_budget():
+                problems = asyncio.run(
+                    sync_problems(str(user.id), profile.solvedac_handle, db, full_resync=full_resync)
+                )
+            
+            record_sync_result(db, user_id, "solvedac", len(problems))
+            db.commit()
+            run.items = len(problems)
+            
+            return {"status": "success", "user_id": user_id, "problems_synced": len(problems), "full_resync": full_resync}
+        finally:
+            db.close()
 
 
 @celery_app.task
-def sync_solvedac_for_user(user_id: str):
-    """Sync solved.ac problems for a single user."""
+def sync_all_users_solvedac():
+    """Sync solved.ac for every user with a handle whose adaptive schedule is due."""
+    from worker.fanout import fan_out_users
+
     db = SessionLocal()
     try:
-        user = db.query(User).filter(User.id == user_id).first()
-        if not user:
-            return {"error": "User not found"}
-        
-        # Get solved.ac handle
-        profile = db.query(UserProfile).filter(UserProfile.user_id == user.id).first()
-        if not profile or not profile.solvedac_handle:
-            return {"error": "solved.ac handle not configured"}
-        
-        # Sync solved problems
-        import asyncio
-        from merge_collector.solvedac import sync_problems
-        
-        problems = asyncio.run(sync_problems(str(user.id), profile.solvedac_handle, db))
-        
-        return {"status": "success", "user_id": user_id, "problems_synced": len(problems)}
+        return fan_out_users(
+            db,
+            run_name="sync_solvedac",
+            run_id=f"{datetime.utcnow():%Y-%m-%dT%H}",  # one run per hourly beat slot
+            id_column=UserProfile.user_id,
+            filters=(
+                UserProfile.solvedac_handle.isnot(None),
+                UserProfile.solvedac_handle != "",
+                due_for_sync("solvedac", UserProfile.user_id),
+            ),
+            task=sync_solvedac_for_user,
+            window_seconds=settings.SOLVEDAC_FANOUT_WINDOW_SECONDS,
+            source="solvedac",
+        )
     finally:
         db.close()
 
 
+# Catalog entries older than this are re-read from problem/lookup
+CATALOG_REFRESH_AFTER = timedelta(days=7)
+CATALOG_REFRESH_LIMIT = 5000
+
+
 @celery_app.task
-def sync_all_users_solvedac():
-    """Sync solved.ac for all active users."""
+def refresh_problem_catalog():
+    """Refresh stale shared problem catalog entries (title, level, tags)."""
     db = SessionLocal()
     try:
-        users = db.query(User).all()
-        for user in users:
-            sync_solvedac_for_user.delay(str(user.id))
-        return {"status": "queued", "user_count": len(users)}
+        import asyncio
+        from merge_collector.solvedac import refresh_problem_catalog as refresh_catalog
+        
+        stale_ids = [
+            problem_id
+            for (problem_id,) in db.query(ProblemCatalog.problem_id)
+            .filter(ProblemCatalog.updated_at < datetime.utcnow() - CATALOG_REFRESH_AFTER)
+            .order_by(ProblemCatalog.updated_at)
+            .limit(CATALOG_REFRESH_LIMIT)
+        ]
+        
+        with retry_budget():
+            refreshed = asyncio.run(refresh_catalog(db, stale_ids))
+        
+        return {"status": "success", "stale": len(stale_ids), "refreshed": refreshed}
     finally:
         db.close()
@@ -0,0 +1,33 @@
+import sys
+sys.path.insert(0, '/app/packages/merge_collector')
+sys.path.insert(0, '/app/packages/merge_core')
+
+import asyncio
+import logging
+
+from worker.celery_app import celery_app
+from app.database import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+
+@celery_app.task
+def sync_user_all_sources(user_id: str, full_resync: bool = False, sources: list[str] | None = None):
+    """Sync every linked source of a user concurrently in one event loop.
+
+    Takes as long as the slowest source instead of the sum of all of them.
+    Sources the user has not linked are reported as skipped. ``sources``
+    limits the run to the sources the caller claimed sync runs for.
+    """
+    from merge_collector.orchestrator import CollectorOrchestrator
+
+    orchestrator = CollectorOrchestrator(SessionLocal, sources=sources, task_id=sync_user_all_sources.request.id)
+    results = asyncio.run(orchestrator.sync_user(user_id, full_resync=full_resync))
+
+    # Same follow-up as the single-source GitHub task
+    if results.get("github", {}).get("status") == "success":
+        from worker.tasks.sync_github import enrich_commit_stats_for_user
+
+        enrich_commit_stats_for_user.delay(user_id)
+
+    return {"status": "success", "user_id": user_id, "full_resync": full_resync, "sources": results}
@@ -2,45 +2,74 @@ import sys
 sys.path.insert(0, '/app/packages/merge_collector')
 sys.path.insert(0, '/app/packages/merge_core')
 
+from datetime import datetime
+
 from worker.celery_app import celery_app
+from app.config import settings
 from app.database import SessionLocal
 from app.models.user import User
 from app.models.user_profile import UserProfile
+from app.utils.retry import retry_budget
+from app.utils.sync_runs import tracked_sync_run
+from app.utils.sync_state import due_for_sync, record_sync_result
 
 
 @celery_app.task
 def sync_velog_for_user(user_id: str):
     """Sync Velog posts for a single user."""
-    db = SessionLocal()
-    try:
-        user = db.query(User).filter(User.id == user_id).first()
-        if not user:
-            return {"error": "User not found"}
-        
-        # Get Velog ID
-        profile = db.query(UserProfile).filter(UserProfile.user_id == user.id).first()
-        if not profile or not profile.velog_id:
-            return {"error": "Velog ID not configured"}
-        
-        # Sync blog posts
-        import asyncio
-        from merge_collector.velog import sync_blog_posts
+    with tracked_sync_run(user_id, "velog", sync_velog_for_user.request.id) as run:
+        if run is None:
+            return {"status": "skipped", "reason": "Velog sync already running"}
         
-        posts = asyncio.run(sync_blog_posts(str(user.id), profile.velog_id, db))
-        
-        return {"status": "success", "user_id": user_id, "posts_synced": len(posts)}
-    finally:
-        db.close()
+        db = SessionLocal()
+        try:
+            user = db.query(User).filter(User.id == user_id).first()
+            if not user:
+                run.fail("User not found")
+                return {"error": "User not found"}
+            
+            # Get Velog ID
+            profile = db.query(UserProfile).filter(UserProfile.user_id == user.id).first()
+            if not profile or not profile.velog_id:
+                run.fail("Velog ID not configured")
+                return {"error": "Velog ID not configured"}
+            
+            # Sync blog posts
+            import asyncio
+            from merge_collector.velog import sync_blog_posts
+            
+            with retry_budget():
+                posts = asyncio.run(sync_blog_posts(str(user.id), profile.velog_id, db))
+            
+            record_sync_result(db, user_id, "velog", len(posts))
+            db.commit()
+            run.items = len(posts)
+            
+            return {"status": "success", "user_id": user_id, "posts_synced": len(posts)}
+        finally:
+            db.close()
 
 
 @celery_app.task
 def sync_all_users_velog():
-    """Sync Velog for all active users."""
+    """Sync Velog for every user with a Velog ID whose adaptive schedule is due."""
+    from worker.fanout import fan_out_users
+
     db = SessionLocal()
     try:
-        users = db.query(User).all()
-        for user in users:
-            sync_velog_for_user.delay(str(user.id))
-        return {"status": "queued", "user_count": len(users)}
+        return fan_out_users(
+            db,
+            run_name="sync_velog",
+            run_id=f"{datetime.utcnow():%Y-%m-%dT%H}",  # one run per hourly beat slot
+            id_column=UserProfile.user_id,
+            filters=(
+                UserProfile.velog_id.isnot(None),
+                UserProfile.velog_id != "",
+                due_for_sync("velog", UserProfile.user_id),
+            ),
+            task=sync_velog_for_user,
+            window_seconds=settings.VELOG_FANOUT_WINDOW_SECONDS,
+            source="velog",
+        )
     finally:
         db.close()
@@ -0,0 +1,45 @@
+"""add incremental commit sync cursor to repos
+
+Revision ID: 006
+Revises: 005
+Create Date: 2026-10-16
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "006"
+down_revision = "005"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("repos", sa.Column("last_commit_sha", sa.String(), nullable=True))
+    op.add_column("repos", sa.Column("last_commit_at", sa.DateTime(timezone=True), nullable=True))
+    op.add_column("repos", sa.Column("commits_etag", sa.String(), nullable=True))
+    op.add_column("repos", sa.Column("commits_last_modified", sa.String(), nullable=True))
+
+    # Seed the high-water mark from already-synced commits so the first
+    # incremental run does not re-page the full history.
+    op.execute(
+        """
+        UPDATE repos r
+        SET last_commit_at = c.max_committed_at
+        FROM (
+            SELECT repo_id, MAX(committed_at) AS max_committed_at
+            FROM commits
+            GROUP BY repo_id
+        ) c
+        WHERE c.repo_id = r.id
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("repos", "commits_last_modified")
+    op.drop_column("repos", "commits_etag")
+    op.drop_column("repos", "last_commit_at")
+    op.drop_column("repos", "last_commit_sha")
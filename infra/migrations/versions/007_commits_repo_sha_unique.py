@@ -0,0 +1,26 @@
+"""name the unique (repo_id, sha) constraint on commits
+
+Revision ID: 007
+Revises: 006
+Create Date: 2026-10-16
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "007"
+down_revision = "006"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # 001 already enforces UNIQUE (repo_id, sha) under PostgreSQL's generated
+    # name; give it the name the model declares instead of adding a duplicate.
+    op.execute("ALTER TABLE commits RENAME CONSTRAINT commits_repo_id_sha_key TO uq_commits_repo_sha")
+
+
+def downgrade() -> None:
+    op.execute("ALTER TABLE commits RENAME CONSTRAINT uq_commits_repo_sha TO commits_repo_id_sha_key")
@@ -0,0 +1,24 @@
+"""add resumable commit walk checkpoint to repos
+
+Revision ID: 008
+Revises: 007
+Create Date: 2026-10-16
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "008"
+down_revision = "007"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("repos", sa.Column("commits_resume_url", sa.String(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("repos", "commits_resume_url")
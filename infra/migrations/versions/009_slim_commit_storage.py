@@ -0,0 +1,122 @@
+"""slim commit storage: typed columns + compressed payload archive
+
+- commits: add author_login, parents_count (backfilled from raw_data)
+- new table: commit_payloads (zlib-compressed raw GitHub payloads)
+- commits: move raw_data into commit_payloads and drop the column
+
+Run VACUUM FULL commits afterwards to return the freed TOAST space to the OS.
+
+Revision ID: 009
+Revises: 008
+Create Date: 2026-10-16
+
+"""
+import json
+import zlib
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = "009"
+down_revision = "008"
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 1000
+
+
+def upgrade() -> None:
+    op.add_column("commits", sa.Column("author_login", sa.String(), nullable=True))
+    op.add_column("commits", sa.Column("parents_count", sa.Integer(), nullable=True))
+    op.execute(
+        """
+        UPDATE commits
+        SET author_login = raw_data->'author'->>'login',
+            parents_count = CASE
+                WHEN jsonb_typeof(raw_data->'parents') = 'array'
+                THEN jsonb_array_length(raw_data->'parents')
+            END
+        WHERE raw_data IS NOT NULL
+        """
+    )
+
+    op.create_table(
+        "commit_payloads",
+        sa.Column(
+            "commit_id",
+            postgresql.UUID(as_uuid=True),
+            sa.ForeignKey("commits.id", ondelete="CASCADE"),
+            nullable=False,
+        ),
+        sa.Column("payload", sa.LargeBinary(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+        sa.PrimaryKeyConstraint("commit_id"),
+    )
+
+    # Archive existing payloads in keyset-paginated batches, compressing in Python
+    conn = op.get_bind()
+    last_id = None
+    while True:
+        rows = conn.execute(
+            sa.text(
+                """
+                SELECT id, raw_data FROM commits
+                WHERE raw_data IS NOT NULL
+                  AND (CAST(:last_id AS uuid) IS NULL OR id > CAST(:last_id AS uuid))
+                ORDER BY id
+                LIMIT :limit
+                """
+            ),
+            {"last_id": last_id, "limit": BATCH_SIZE},
+        ).fetchall()
+        if not rows:
+            break
+        conn.execute(
+            sa.text(
+                "INSERT INTO commit_payloads (commit_id, payload) VALUES (:commit_id, :payload) "
+                "ON CONFLICT DO NOTHING"
+            ),
+            [
+                {"commit_id": row.id, "payload": zlib.compress(json.dumps(row.raw_data).encode())}
+                for row in rows
+            ],
+        )
+        last_id = str(rows[-1].id)
+
+    op.drop_column("commits", "raw_data")
+
+
+def downgrade() -> None:
+    op.add_column("commits", sa.Column("raw_data", postgresql.JSONB(), nullable=True))
+
+    conn = op.get_bind()
+    last_id = None
+    while True:
+        rows = conn.execute(
+            sa.text(
+                """
+                SELECT commit_id, payload FROM commit_payloads
+                WHERE CAST(:last_id AS uuid) IS NULL OR commit_id > CAST(:last_id AS uuid)
+                ORDER BY commit_id
+                LIMIT :limit
+                """
+            ),
+            {"last_id": last_id, "limit": BATCH_SIZE},
+        ).fetchall()
+        if not rows:
+            break
+        conn.execute(
+            sa.text("UPDATE commits SET raw_data = CAST(:raw_data AS jsonb) WHERE id = :commit_id"),
+            [
+                {"commit_id": row.commit_id, "raw_data": zlib.decompress(row.payload).decode()}
+                for row in rows
+            ],
+        )
+        last_id = str(rows[-1].commit_id)
+
+    op.drop_table("commit_payloads")
+    op.drop_column("commits", "parents_count")
+    op.drop_column("commits", "author_login")
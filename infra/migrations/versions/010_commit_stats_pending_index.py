@@ -0,0 +1,30 @@
+"""index commits still waiting for stats enrichment
+
+Revision ID: 010
+Revises: 009
+Create Date: 2026-10-16
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "010"
+down_revision = "009"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Partial index: only un-enriched commits are indexed, so it stays small
+    op.create_index(
+        "ix_commits_stats_pending",
+        "commits",
+        ["user_id", "committed_at"],
+        postgresql_where=sa.text("additions IS NULL"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_commits_stats_pending", table_name="commits")
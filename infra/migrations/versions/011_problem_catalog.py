@@ -0,0 +1,102 @@
+"""shared solved.ac problem catalog
+
+- new table: problem_catalog (one row per solved.ac problem)
+- problems: deduplicate (user_id, problem_id) and add a unique constraint,
+  replacing the now redundant (user_id, problem_id, solved_at) one from 001
+- problems: drop the per-user title/level/tags/raw_data copies
+
+Revision ID: 011
+Revises: 010
+Create Date: 2026-10-16
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "011"
+down_revision = "010"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "problem_catalog",
+        sa.Column("problem_id", sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column("title", sa.String(), nullable=True),
+        sa.Column("level", sa.Integer(), nullable=True),
+        sa.Column("tags", sa.ARRAY(sa.String()), nullable=True),
+        sa.Column("accepted_user_count", sa.Integer(), nullable=True),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+        sa.PrimaryKeyConstraint("problem_id"),
+    )
+
+    # Seed the catalog from the most recently stored copy of each problem
+    op.execute(
+        """
+        INSERT INTO problem_catalog (problem_id, title, level, tags, accepted_user_count, updated_at)
+        SELECT DISTINCT ON (problem_id)
+               problem_id,
+               title,
+               level,
+               tags,
+               (raw_data->>'acceptedUserCount')::int,
+               created_at
+        FROM problems
+        ORDER BY problem_id, created_at DESC
+        """
+    )
+
+    # Keep the earliest solve of each problem per user
+    op.execute(
+        """
+        DELETE FROM problems p
+        USING problems d
+        WHERE p.user_id = d.user_id
+          AND p.problem_id = d.problem_id
+          AND (p.created_at, p.id::text) > (d.created_at, d.id::text)
+        """
+    )
+    op.create_unique_constraint("uq_problems_user_problem", "problems", ["user_id", "problem_id"])
+    # Implied by the new constraint; keeping it only costs index writes
+    op.drop_constraint("problems_user_id_problem_id_solved_at_key", "problems", type_="unique")
+    op.create_foreign_key(
+        "fk_problems_problem_catalog",
+        "problems",
+        "problem_catalog",
+        ["problem_id"],
+        ["problem_id"],
+    )
+
+    op.drop_column("problems", "raw_data")
+    op.drop_column("problems", "tags")
+    op.drop_column("problems", "level")
+    op.drop_column("problems", "title")
+
+
+def downgrade() -> None:
+    from sqlalchemy.dialects import postgresql
+
+    op.add_column("problems", sa.Column("title", sa.String(), nullable=True))
+    op.add_column("problems", sa.Column("level", sa.Integer(), nullable=True))
+    op.add_column("problems", sa.Column("tags", sa.ARRAY(sa.String()), nullable=True))
+    op.add_column("problems", sa.Column("raw_data", postgresql.JSONB(), nullable=True))
+    op.execute(
+        """
+        UPDATE problems p
+        SET title = c.title, level = c.level, tags = c.tags
+        FROM problem_catalog c
+        WHERE c.problem_id = p.problem_id
+        """
+    )
+
+    op.drop_constraint("fk_problems_problem_catalog", "problems", type_="foreignkey")
+    op.create_unique_constraint(
+        "problems_user_id_problem_id_solved_at_key",
+        "problems",
+        ["user_id", "problem_id", "solved_at"],
+    )
+    op.drop_constraint("uq_problems_user_problem", "problems", type_="unique")
+    op.drop_table("problem_catalog")
@@ -0,0 +1,24 @@
+"""store cleaned post body excerpts on blog_posts
+
+Revision ID: 013
+Revises: 012
+Create Date: 2026-10-16
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "013"
+down_revision = "012"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("blog_posts", sa.Column("body_excerpt", sa.Text(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("blog_posts", "body_excerpt")
@@ -0,0 +1,32 @@
+"""adaptive per-user sync schedule on sync_states
+
+Revision ID: 014
+Revises: 013
+Create Date: 2026-10-16
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "014"
+down_revision = "013"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("sync_states", sa.Column("interval_seconds", sa.Integer(), nullable=True))
+    op.add_column("sync_states", sa.Column("next_sync_at", sa.DateTime(timezone=True), nullable=True))
+    op.add_column("sync_states", sa.Column("last_run_at", sa.DateTime(timezone=True), nullable=True))
+    op.add_column("sync_states", sa.Column("last_items_found", sa.Integer(), nullable=True))
+    op.create_index("ix_sync_states_source_next_sync_at", "sync_states", ["source", "next_sync_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_sync_states_source_next_sync_at", table_name="sync_states")
+    op.drop_column("sync_states", "last_items_found")
+    op.drop_column("sync_states", "last_run_at")
+    op.drop_column("sync_states", "next_sync_at")
+    op.drop_column("sync_states", "interval_seconds")
@@ -0,0 +1,38 @@
+"""persist the latest sync run per user and source
+
+Revision ID: 015
+Revises: 014
+Create Date: 2026-10-16
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "015"
+down_revision = "014"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("sync_states", sa.Column("status", sa.String(), nullable=True))
+    op.add_column("sync_states", sa.Column("task_id", sa.String(), nullable=True))
+    op.add_column("sync_states", sa.Column("queued_at", sa.DateTime(timezone=True), nullable=True))
+    op.add_column("sync_states", sa.Column("started_at", sa.DateTime(timezone=True), nullable=True))
+    op.add_column("sync_states", sa.Column("finished_at", sa.DateTime(timezone=True), nullable=True))
+    op.add_column("sync_states", sa.Column("items_processed", sa.Integer(), nullable=True))
+    op.add_column("sync_states", sa.Column("pages_fetched", sa.Integer(), nullable=True))
+    op.add_column("sync_states", sa.Column("error_message", sa.Text(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("sync_states", "error_message")
+    op.drop_column("sync_states", "pages_fetched")
+    op.drop_column("sync_states", "items_processed")
+    op.drop_column("sync_states", "finished_at")
+    op.drop_column("sync_states", "started_at")
+    op.drop_column("sync_states", "queued_at")
+    op.drop_column("sync_states", "task_id")
+    op.drop_column("sync_states", "status")
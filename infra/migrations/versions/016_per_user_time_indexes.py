@@ -0,0 +1,72 @@
+"""composite indexes for per-user time-range queries
+
+- commits: (user_id, committed_at)
+- problems: (user_id, solved_at)
+- blog_posts: (user_id, published_at)
+- notes: (user_id, created_at)
+- generated_contents: (user_id, created_at), (user_id, content_type, created_at)
+- weekly_summaries: unique (user_id, week_start), replacing the
+  (user_id, week_start, week_end) constraint after removing duplicate weeks
+
+(repo_id, sha) and (user_id, problem_id) are already unique (007, 011).
+
+Revision ID: 016
+Revises: 015
+Create Date: 2026-10-16
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "016"
+down_revision = "015"
+branch_labels = None
+depends_on = None
+
+TIME_INDEXES = [
+    ("ix_commits_user_committed_at", "commits", ["user_id", "committed_at"]),
+    ("ix_problems_user_solved_at", "problems", ["user_id", "solved_at"]),
+    ("ix_blog_posts_user_published_at", "blog_posts", ["user_id", "published_at"]),
+    ("ix_notes_user_created_at", "notes", ["user_id", "created_at"]),
+    ("ix_generated_contents_user_created_at", "generated_contents", ["user_id", "created_at"]),
+    (
+        "ix_generated_contents_user_type_created_at",
+        "generated_contents",
+        ["user_id", "content_type", "created_at"],
+    ),
+]
+
+
+def upgrade() -> None:
+    for name, table, columns in TIME_INDEXES:
+        op.create_index(name, table, columns)
+
+    # Keep the most recently updated summary of each user week
+    op.execute(
+        """
+        DELETE FROM weekly_summaries w
+        USING weekly_summaries d
+        WHERE w.user_id = d.user_id
+          AND w.week_start = d.week_start
+          AND (w.updated_at, w.id::text) < (d.updated_at, d.id::text)
+        """
+    )
+    op.execute(
+        "ALTER TABLE weekly_summaries "
+        "DROP CONSTRAINT IF EXISTS weekly_summaries_user_id_week_start_week_end_key"
+    )
+    op.create_unique_constraint("uq_weekly_summaries_user_week", "weekly_summaries", ["user_id", "week_start"])
+
+
+def downgrade() -> None:
+    op.drop_constraint("uq_weekly_summaries_user_week", "weekly_summaries", type_="unique")
+    op.create_unique_constraint(
+        "weekly_summaries_user_id_week_start_week_end_key",
+        "weekly_summaries",
+        ["user_id", "week_start", "week_end"],
+    )
+
+    for name, table, _ in reversed(TIME_INDEXES):
+        op.drop_index(name, table_name=table)
@@ -0,0 +1,24 @@
+"""fingerprint the source data each weekly summary was built from
+
+Revision ID: 017
+Revises: 016
+Create Date: 2026-10-16
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "017"
+down_revision = "016"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("weekly_summaries", sa.Column("source_fingerprint", sa.String(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("weekly_summaries", "source_fingerprint")
@@ -0,0 +1,55 @@
+"""mark commits whose stats were looked up, separately from the stats themselves
+
+Revision ID: 018
+Revises: 017
+Create Date: 2026-10-16
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "018"
+down_revision = "017"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("commits", sa.Column("stats_checked_at", sa.DateTime(timezone=True), nullable=True))
+    # All-zero stats were also written for commits GitHub could not resolve;
+    # look those up once more so real empty commits and unknown ones separate
+    op.execute(
+        """
+        UPDATE commits SET additions = NULL, deletions = NULL, files_changed = NULL
+        WHERE additions = 0 AND deletions = 0 AND files_changed = 0
+        """
+    )
+    op.execute("UPDATE commits SET stats_checked_at = now() WHERE additions IS NOT NULL")
+
+    op.drop_index("ix_commits_stats_pending", table_name="commits")
+    op.create_index(
+        "ix_commits_stats_pending",
+        "commits",
+        ["user_id", "committed_at"],
+        postgresql_where=sa.text("stats_checked_at IS NULL"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_commits_stats_pending", table_name="commits")
+    op.create_index(
+        "ix_commits_stats_pending",
+        "commits",
+        ["user_id", "committed_at"],
+        postgresql_where=sa.text("additions IS NULL"),
+    )
+    # Without the flag, unresolvable commits must look enriched again
+    op.execute(
+        """
+        UPDATE commits SET additions = 0, deletions = 0, files_changed = 0
+        WHERE additions IS NULL AND stats_checked_at IS NOT NULL
+        """
+    )
+    op.drop_column("commits", "stats_checked_at")
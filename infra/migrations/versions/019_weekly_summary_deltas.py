@@ -0,0 +1,36 @@
+"""weekly summary deltas stored with the rows they count
+
+Revision ID: 019
+Revises: 018
+Create Date: 2026-10-16
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = "019"
+down_revision = "018"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "weekly_summary_deltas",
+        sa.Column("id", sa.BigInteger(), autoincrement=True, nullable=False),
+        sa.Column("user_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("week_start", sa.Date(), nullable=False),
+        sa.Column("fields", postgresql.JSONB(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_weekly_summary_deltas_user_week", "weekly_summary_deltas", ["user_id", "week_start"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_weekly_summary_deltas_user_week", table_name="weekly_summary_deltas")
+    op.drop_table("weekly_summary_deltas")
@@ -1,6 +1,32 @@
 """merge_collector - Data collection from external sources."""
 from merge_collector.github import sync_repos, sync_commits
+from merge_collector.github_graphql import sync_repos_graphql, enrich_commit_stats
 from merge_collector.solvedac import sync_problems
 from merge_collector.velog import sync_blog_posts
+from merge_collector.base import (
+    Collector,
+    PipelineCollector,
+    register_collector,
+    get_collector,
+    registered_sources,
+)
+from merge_collector.collectors import GitHubCollector, SolvedacCollector, VelogCollector
+from merge_collector.orchestrator import CollectorOrchestrator
 
-__all__ = ["sync_repos", "sync_commits", "sync_problems", "sync_blog_posts"]
+__all__ = [
+    "sync_repos",
+    "sync_repos_graphql",
+    "sync_commits",
+    "enrich_commit_stats",
+    "sync_problems",
+    "sync_blog_posts",
+    "Collector",
+    "PipelineCollector",
+    "register_collector",
+    "get_collector",
+    "registered_sources",
+    "GitHubCollector",
+    "SolvedacCollector",
+    "VelogCollector",
+    "CollectorOrchestrator",
+]
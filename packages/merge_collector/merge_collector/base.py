@@ -0,0 +1,138 @@
+"""Common collector interface and source registry.
+
+A collector turns one external source into rows for one user.
+``PipelineCollector.sync`` drives the staged pipeline most sources follow:
+
+    fetch_pages -> normalize -> store (bulk upsert) -> checkpoint -> commit
+
+so a new source (Notion, Tistory, Programmers, ...) only implements the
+stages and registers itself; solved.ac and Velog are built this way. GitHub
+implements ``sync`` on ``Collector`` directly because it runs the pipeline
+once per repository (repos first, then commits of every repo concurrently).
+"""
+from abc import ABC, abstractmethod
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Type
+
+import httpx
+from sqlalchemy.orm import Session
+
+
+class Collector(ABC):
+    """Base class for a per-user data source."""
+
+    # Key used in sync requests, sync_states and results (e.g. 'github')
+    source: str = ""
+    # How many users the orchestrator syncs against this source at once
+    max_concurrent_users: int = 4
+
+    @abstractmethod
+    def load_credential(self, db: Session, user_id: str) -> Optional[str]:
+        """
+        Return what the source needs to identify the user (token, handle).
+        
+        Returns:
+            The credential, or None if the user has not linked this source
+        """
+
+    @abstractmethod
+    async def sync(self, ctx: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """
+        Sync the user's data from the source.
+        
+        Args:
+            ctx: Sync context with ``user_id``, ``db``, ``client``,
+                ``credential`` and ``full_resync``; a collector may set
+                ``new_items`` when its return value is not the new rows
+            
+        Returns:
+            Newly stored rows
+        """
+
+
+class PipelineCollector(Collector):
+    """Collector synced page by page through the staged pipeline."""
+
+    @abstractmethod
+    def fetch_pages(self, ctx: Dict[str, Any]) -> AsyncIterator[Any]:
+        """Yield raw pages from the upstream, starting at the stored checkpoint."""
+
+    @abstractmethod
+    def normalize(self, ctx: Dict[str, Any], page: Any) -> List[Dict[str, Any]]:
+        """Validate a raw page and map it onto row dicts."""
+
+    @abstractmethod
+    def store(self, ctx: Dict[str, Any], rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Bulk upsert rows and return the ones that were new."""
+
+    def checkpoint(self, ctx: Dict[str, Any], page: Any) -> None:
+        """Record progress after a page; committed together with its rows."""
+
+    async def sync(self, ctx: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """
+        Run the staged pipeline, committing once per page.
+        
+        ``fetch_pages`` is resumed only after its previous page was stored
+        and committed, so it may stop based on what the other stages
+        recorded in ``ctx``.
+        """
+        db = ctx["db"]
+        stored = []
+        async for page in self.fetch_pages(ctx):
+            rows = self.normalize(ctx, page)
+            new_rows = self.store(ctx, rows)
+            self.checkpoint(ctx, page)
+            db.commit()
+            stored.extend(new_rows)
+        return stored
+
+
+def build_context(
+    user_id: str,
+    db: Session,
+    client: httpx.AsyncClient,
+    credential: str,
+    full_resync: bool = False,
+    session_factory: Optional[Callable[[], Session]] = None,
+) -> Dict[str, Any]:
+    """
+    Build the context dict passed to every collector stage.
+    
+    ``session_factory`` opens the extra sessions a collector needs for work
+    it runs concurrently (``SessionLocal`` if omitted); ``db`` must only be
+    used by one task at a time.
+    """
+    if session_factory is None:
+        from app.database import SessionLocal
+
+        session_factory = SessionLocal
+    return {
+        "user_id": user_id,
+        "db": db,
+        "session_factory": session_factory,
+        "client": client,
+        "credential": credential,
+        "full_resync": full_resync,
+    }
+
+
+_registry: Dict[str, Type[Collector]] = {}
+
+
+def register_collector(collector_cls: Type[Collector]) -> Type[Collector]:
+    """Class decorator adding a collector to the registry under its ``source``."""
+    if not collector_cls.source:
+        raise ValueError(f"{collector_cls.__name__} must define a source")
+    _registry[collector_cls.source] = collector_cls
+    return collector_cls
+
+
+def get_collector(source: str) -> Collector:
+    """Instantiate the registered collector for ``source``."""
+    if source not in _registry:
+        raise KeyError(f"Unknown collector source: {source}")
+    return _registry[source]()
+
+
+def registered_sources() -> List[str]:
+    """Sources with a registered collector, in registration order."""
+    return list(_registry)
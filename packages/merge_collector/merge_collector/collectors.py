@@ -0,0 +1,286 @@
+"""Collector implementations for the built-in sources."""
+import asyncio
+import hashlib
+import logging
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy.orm import Session
+
+from merge_collector.base import Collector, PipelineCollector, register_collector
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+@register_collector
+class GitHubCollector(Collector):
+    """Repositories, then commits of every repository."""
+
+    source = "github"
+
+    def load_credential(self, db: Session, user_id: str) -> Optional[str]:
+        from app.models.oauth_account import OAuthAccount
+
+        return db.query(OAuthAccount.access_token).filter(
+            OAuthAccount.user_id == user_id,
+            OAuthAccount.provider == "github"
+        ).scalar()
+
+    async def sync(self, ctx: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Sync repos, then fan out commit syncs across repos with bounded concurrency.
+
+        Every request shares the context's pooled client; ``github_rate_limiter``
+        is still acquired per request inside the collector. Each repo writes
+        through its own session, so one repo's rollback can never discard
+        another's pending rows.
+
+        Repos whose commit sync failed are reported in ``ctx["failures"]`` and
+        the number of new commits in ``ctx["new_items"]``.
+        """
+        from merge_collector.github import sync_commits
+
+        user_id = ctx["user_id"]
+        repos = await self._sync_repos(ctx)
+
+        semaphore = asyncio.Semaphore(max(1, settings.GITHUB_SYNC_CONCURRENCY))
+
+        async def sync_repo(repo: dict):
+            async with semaphore:
+                repo_db = ctx["session_factory"]()
+                try:
+                    inserted = await sync_commits(
+                        user_id,
+                        repo["id"],
+                        ctx["credential"],
+                        repo_db,
+                        full_resync=ctx["full_resync"],
+                        client=ctx["client"],
+                    )
+                    return None, len(inserted)
+                except Exception as exc:
+                    repo_db.rollback()
+                    logger.warning("Commit sync failed for repo %s: %s", repo["full_name"], exc)
+                    return repo["full_name"], 0
+                finally:
+                    repo_db.close()
+
+        results = await asyncio.gather(*(sync_repo(repo) for repo in repos))
+        ctx["failures"] = [name for name, _ in results if name]
+        ctx["new_items"] = sum(count for _, count in results)
+        return repos
+
+    async def _sync_repos(self, ctx: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Sync repos with the configured backend, falling back to REST."""
+        from merge_collector.github import sync_repos
+
+        user_id, db = ctx["user_id"], ctx["db"]
+        if settings.GITHUB_COLLECTOR_BACKEND.lower() == "graphql":
+            from merge_collector.github_graphql import sync_repos_graphql
+
+            try:
+                return await sync_repos_graphql(user_id, ctx["credential"], db, client=ctx["client"])
+            except Exception as exc:
+                db.rollback()
+                logger.warning("GraphQL repo sync failed for user %s, falling back to REST: %s", user_id, exc)
+
+        return await sync_repos(user_id, ctx["credential"], db, client=ctx["client"])
+
+
+@register_collector
+class SolvedacCollector(PipelineCollector):
+    """
+    Solved problems of the user's solved.ac handle.
+    
+    The user's ``solvedCount`` is read from the profile first; when it does
+    not exceed the number of problems already stored, nothing is paged at
+    all. Otherwise the solved list is paged only until the missing number of
+    problems has been found, checking ids against a set loaded in one query.
+    Each page is committed with a per-handle checkpoint, so an interrupted run
+    continues from the next page.
+    """
+
+    source = "solvedac"
+
+    def load_credential(self, db: Session, user_id: str) -> Optional[str]:
+        from app.models.user_profile import UserProfile
+
+        return db.query(UserProfile.solvedac_handle).filter(UserProfile.user_id == user_id).scalar()
+
+    async def fetch_pages(self, ctx: Dict[str, Any]):
+        from app.exceptions import DataValidationError
+        from app.models.problem import Problem
+        from app.utils.sync_state import get_sync_cursor
+        from merge_collector.solvedac import SYNC_SOURCE, _fetch_solved_page, fetch_solved_count
+
+        user_id, db, handle = ctx["user_id"], ctx["db"], ctx["credential"]
+        # problem_id only; avoids the catalog join
+        ctx["known_ids"] = {
+            problem_id
+            for (problem_id,) in db.query(Problem.problem_id).filter(Problem.user_id == user_id)
+        }
+        ctx["missing"] = None
+        ctx["synced"] = 0
+        # Note: actual solve time not available from API
+        ctx["solved_at"] = datetime.utcnow()
+
+        if not ctx["full_resync"]:
+            solved_count = await fetch_solved_count(ctx["client"], handle)
+            if solved_count is not None:
+                ctx["missing"] = solved_count - len(ctx["known_ids"])
+                if ctx["missing"] <= 0:
+                    logger.info(f"No new solved.ac problems for user {handle} ({solved_count} solved)")
+                    return
+
+        # Continue an interrupted walk of the same handle
+        page_number = 1
+        seen = 0
+        checkpoint = get_sync_cursor(db, user_id, SYNC_SOURCE)
+        if not ctx["full_resync"] and checkpoint.get("handle") == handle and checkpoint.get("next_page"):
+            page_number = int(checkpoint["next_page"])
+            seen = int(checkpoint.get("seen") or 0)
+            logger.info(f"Resuming solved.ac sync for user {handle} at page {page_number}")
+
+        while True:
+            search_result = await _fetch_solved_page(ctx["client"], handle, page_number)
+            items = search_result.get("items")
+            if not isinstance(items, list):
+                raise DataValidationError("solved.ac API returned invalid data format")
+            if not items:
+                return
+
+            # Count the items actually received; the page size is solved.ac's
+            seen += len(items)
+            page = {
+                "number": page_number,
+                "items": items,
+                "count": search_result.get("count", 0),
+                "seen": seen,
+            }
+            yield page
+            if self._is_last_page(ctx, page):
+                return
+            page_number += 1
+
+    def normalize(self, ctx: Dict[str, Any], page: Dict[str, Any]) -> List[Dict[str, Any]]:
+        from merge_collector.solvedac import _catalog_row
+
+        catalog_rows = {}
+        for problem_data in page["items"]:
+            # Validate required fields
+            if "problemId" not in problem_data:
+                logger.warning("Skipping problem with missing problemId")
+                continue
+            if problem_data["problemId"] not in ctx["known_ids"]:
+                catalog_rows[problem_data["problemId"]] = _catalog_row(problem_data)
+        return list(catalog_rows.values())
+
+    def store(self, ctx: Dict[str, Any], rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Refresh the shared catalog first, then link the user's solves to it."""
+        from app.utils.weekly_deltas import record_problem_deltas
+        from merge_collector.solvedac import insert_user_problems, upsert_problem_catalog
+
+        upsert_problem_catalog(ctx["db"], rows)
+        by_id = {row["problem_id"]: row for row in rows}
+        inserted_ids = insert_user_problems(ctx["db"], ctx["user_id"], list(by_id), ctx["solved_at"])
+        ctx["known_ids"].update(inserted_ids)
+        ctx["synced"] += len(inserted_ids)
+        new_rows = [by_id[problem_id] for problem_id in inserted_ids]
+        # Committed with the rows, see app.utils.weekly_deltas
+        record_problem_deltas(ctx["db"], ctx["user_id"], [(ctx["solved_at"], row["tags"]) for row in new_rows])
+        return new_rows
+
+    def checkpoint(self, ctx: Dict[str, Any], page: Dict[str, Any]) -> None:
+        from app.utils.sync_state import save_sync_cursor
+        from merge_collector.solvedac import SYNC_SOURCE
+
+        is_last = self._is_last_page(ctx, page)
+        save_sync_cursor(ctx["db"], ctx["user_id"], SYNC_SOURCE, {
+            "handle": ctx["credential"],
+            "next_page": None if is_last else page["number"] + 1,
+            "seen": None if is_last else page["seen"],
+        })
+
+    @staticmethod
+    def _is_last_page(ctx: Dict[str, Any], page: Dict[str, Any]) -> bool:
+        # The listing is not ordered by solve time, so stop by count
+        return page["seen"] >= page["count"] or (
+            ctx["missing"] is not None and ctx["synced"] >= ctx["missing"]
+        )
+
+
+@register_collector
+class VelogCollector(PipelineCollector):
+    """
+    Posts from the user's Velog RSS feed.
+    
+    The feed is one page, requested with the ``ETag``/``Last-Modified``
+    validators of the previous run and fingerprinted with SHA-256. On
+    ``304 Not Modified`` nothing is yielded; on an unchanged fingerprint the
+    feed is not parsed and only the validators are stored. Both shortcuts are
+    skipped on ``full_resync`` and while a stored post has no excerpt.
+    """
+
+    source = "velog"
+    max_concurrent_users = 8
+
+    def load_credential(self, db: Session, user_id: str) -> Optional[str]:
+        from app.models.user_profile import UserProfile
+
+        return db.query(UserProfile.velog_id).filter(UserProfile.user_id == user_id).scalar()
+
+    async def fetch_pages(self, ctx: Dict[str, Any]):
+        from app.utils.sync_state import get_sync_cursor
+        from merge_collector.velog import SYNC_SOURCE, fetch_feed, has_missing_excerpts
+
+        # Clean velog_id (remove @ if present)
+        velog_id = ctx["credential"].lstrip("@")
+        ctx["velog_id"] = velog_id
+
+        # Validators only apply to the feed they were recorded for. A forced
+        # resync, or posts stored before excerpts were kept, need the feed
+        # parsed again, so neither the validators nor the hash may stop it.
+        cursor = get_sync_cursor(ctx["db"], ctx["user_id"], SYNC_SOURCE)
+        if (
+            cursor.get("velog_id") != velog_id
+            or ctx["full_resync"]
+            or has_missing_excerpts(ctx["db"], ctx["user_id"])
+        ):
+            cursor = {}
+
+        response = await fetch_feed(ctx["client"], velog_id, cursor)
+        if response.status_code == 304:
+            logger.info(f"Velog feed unchanged for user {velog_id} (304 Not Modified)")
+            return
+
+        content_hash = hashlib.sha256(response.content).hexdigest()
+        yield {
+            "content": response.content,
+            "unchanged": content_hash == cursor.get("content_hash"),
+            "cursor": {
+                "velog_id": velog_id,
+                "etag": response.headers.get("etag"),
+                "last_modified": response.headers.get("last-modified"),
+                "content_hash": content_hash,
+            },
+        }
+
+    def normalize(self, ctx: Dict[str, Any], page: Dict[str, Any]) -> List[Dict[str, Any]]:
+        from merge_collector.velog import parse_feed
+
+        if page["unchanged"]:
+            logger.info(f"Velog feed unchanged for user {ctx['velog_id']} (same content hash)")
+            return []
+        return parse_feed(page["content"])
+
+    def store(self, ctx: Dict[str, Any], rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        from merge_collector.velog import store_posts
+
+        return store_posts(ctx["db"], ctx["user_id"], rows)
+
+    def checkpoint(self, ctx: Dict[str, Any], page: Dict[str, Any]) -> None:
+        # Validators are stored with the posts, so a failed insert refetches the feed
+        from app.utils.sync_state import save_sync_cursor
+        from merge_collector.velog import SYNC_SOURCE
+
+        save_sync_cursor(ctx["db"], ctx["user_id"], SYNC_SOURCE, page["cursor"])
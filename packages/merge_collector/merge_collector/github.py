@@ -1,17 +1,37 @@
 """GitHub data collection."""
+import asyncio
 import httpx
+import json
 import logging
-from datetime import datetime, timedelta
+import uuid
+import zlib
+from datetime import datetime, timedelta, timezone
 from sqlalchemy.orm import Session
-from typing import List, Dict, Any
-from app.utils.retry import retry_with_backoff, handle_api_errors, github_rate_limiter
+from typing import List, Dict, Any, Optional, AsyncIterator
+from merge_collector.http import client_scope
+from app.utils.retry import (
+    retry_with_backoff,
+    handle_api_errors,
+    github_rate_limiter,
+    github_retry_policy,
+)
+from app.utils.sync_runs import note_page
+from app.config import settings
 from app.exceptions import DataValidationError
 
 logger = logging.getLogger(__name__)
 
+# Rows per INSERT ... ON CONFLICT statement when storing commits
+COMMIT_INSERT_CHUNK_SIZE = 500
+
 
 @handle_api_errors("GitHub")
-async def sync_repos(user_id: str, access_token: str, db: Session) -> List[Dict[str, Any]]:
+async def sync_repos(
+    user_id: str,
+    access_token: str,
+    db: Session,
+    client: Optional[httpx.AsyncClient] = None,
+) -> List[Dict[str, Any]]:
     """
     Sync user's GitHub repositories.
     
@@ -19,43 +39,31 @@ async def sync_repos(user_id: str, access_token: str, db: Session) -> List[Dict[
         user_id: User UUID
         access_token: GitHub OAuth access token
         db: Database session
+        client: Shared pooled client (a temporary one is created if omitted)
         
     Returns:
         List of synced repo data
     """
-    # Apply rate limiting
-    await github_rate_limiter.acquire()
-    
-    async def fetch_repos():
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            response = await client.get(
-                "https://api.github.com/user/repos",
-                headers={
-                    "Authorization": f"Bearer {access_token}",
-                    "Accept": "application/vnd.github.v3+json",
-                },
-                params={
-                    "affiliation": "owner",  # Only repos owned by the user
-                    "sort": "updated",
-                    "per_page": 100,
-                }
-            )
-            response.raise_for_status()
-            return response.json()
-    
-    repos = await retry_with_backoff(fetch_repos)
+    async with client_scope(client) as http:
+        return await _sync_repos(user_id, access_token, db, http)
 
-    async def fetch_repo_watchers(client: httpx.AsyncClient, full_name: str, fallback: int = 0) -> int:
+
+async def _sync_repos(
+    user_id: str,
+    access_token: str,
+    db: Session,
+    client: httpx.AsyncClient,
+) -> List[Dict[str, Any]]:
+    async def fetch_repo_watchers(full_name: str, fallback: int = 0) -> int:
         """Fetch true watcher count(subscribers) for a repo."""
-        await github_rate_limiter.acquire()
+        await github_rate_limiter.acquire(access_token)
         try:
             response = await client.get(
                 f"https://api.github.com/repos/{full_name}",
-                headers={
-                    "Authorization": f"Bearer {access_token}",
-                    "Accept": "application/vnd.github.v3+json",
-                },
+                headers=_github_headers(access_token),
+                timeout=15.0,
             )
+            await github_rate_limiter.update_from_headers(response.headers, access_token)
             response.raise_for_status()
             detail = response.json()
             subscribers = detail.get("subscribers_count")
@@ -70,98 +78,171 @@ async def sync_repos(user_id: str, access_token: str, db: Session) -> List[Dict[
             )
             return int(fallback or 0)
     
-    # Validate and upsert repos into database
-    from app.models.repo import Repo
-    
-    if not isinstance(repos, list):
-        raise DataValidationError("GitHub API returned invalid data format")
-    
+    # Validate and upsert repos page by page while the next page is fetched
     synced_repos = []
-    async with httpx.AsyncClient(timeout=15.0) as detail_client:
+    pages = iter_github_pages(
+        client,
+        "https://api.github.com/user/repos",
+        access_token,
+        params={
+            "affiliation": "owner",  # Only repos owned by the user
+            "sort": "updated",
+            "per_page": 100,
+        },
+    )
+    async for response in pages:
+        repos = response.json()
+        if not isinstance(repos, list):
+            raise DataValidationError("GitHub API returned invalid data format")
+        
+        page_repos = []
         for repo_data in repos:
             # Validate required fields
             if not all(key in repo_data for key in ["id", "full_name", "html_url"]):
                 logger.warning(f"Skipping repo with missing fields: {repo_data.get('id', 'unknown')}")
                 continue
-            # Check if repo exists
-            existing_repo = db.query(Repo).filter(
-                Repo.user_id == user_id,
-                Repo.provider_repo_id == str(repo_data["id"])
-            ).first()
-
+            
             fallback_watchers = repo_data.get("watchers_count", 0)
             watchers = repo_data.get("subscribers_count")
             if watchers is None:
-                watchers = await fetch_repo_watchers(detail_client, repo_data["full_name"], fallback=fallback_watchers)
+                watchers = await fetch_repo_watchers(repo_data["full_name"], fallback=fallback_watchers)
             
-            if existing_repo:
-                # Update existing repo
-                existing_repo.full_name = repo_data["full_name"]
-                existing_repo.html_url = repo_data["html_url"]
-                existing_repo.description = repo_data.get("description")
-                existing_repo.language = repo_data.get("language")
-                existing_repo.stars = repo_data.get("stargazers_count", 0)
-                existing_repo.watchers = int(watchers or 0)
-                existing_repo.forks = repo_data.get("forks_count", 0)
-                existing_repo.is_fork = repo_data.get("fork", False)
-                existing_repo.last_synced_at = datetime.utcnow()
-                # Update created_at from GitHub if available
-                if repo_data.get("created_at"):
-                    try:
-                        existing_repo.created_at = datetime.fromisoformat(repo_data["created_at"].replace("Z", "+00:00"))
-                    except (ValueError, AttributeError):
-                        pass
-                # Use GitHub's updated_at if available, otherwise use current time
-                if repo_data.get("updated_at"):
-                    try:
-                        existing_repo.updated_at = datetime.fromisoformat(repo_data["updated_at"].replace("Z", "+00:00"))
-                    except (ValueError, AttributeError):
-                        existing_repo.updated_at = datetime.utcnow()
-                synced_repos.append(existing_repo)
-            else:
-                # Create new repo - use GitHub's created_at and updated_at
-                created_at = datetime.utcnow()
-                updated_at = datetime.utcnow()
-                
-                if repo_data.get("created_at"):
-                    try:
-                        created_at = datetime.fromisoformat(repo_data["created_at"].replace("Z", "+00:00"))
-                    except (ValueError, AttributeError):
-                        pass
-                
-                if repo_data.get("updated_at"):
-                    try:
-                        updated_at = datetime.fromisoformat(repo_data["updated_at"].replace("Z", "+00:00"))
-                    except (ValueError, AttributeError):
-                        pass
-                
-                new_repo = Repo(
-                    user_id=user_id,
-                    provider_repo_id=str(repo_data["id"]),
-                    full_name=repo_data["full_name"],
-                    html_url=repo_data["html_url"],
-                    description=repo_data.get("description"),
-                    language=repo_data.get("language"),
-                    stars=repo_data.get("stargazers_count", 0),
-                    watchers=int(watchers or 0),
-                    forks=repo_data.get("forks_count", 0),
-                    is_fork=repo_data.get("fork", False),
-                    last_synced_at=datetime.utcnow(),
-                    created_at=created_at,
-                    updated_at=updated_at
-                )
-                db.add(new_repo)
-                synced_repos.append(new_repo)
-    
-    db.commit()
+            page_repos.append(_upsert_repo(db, user_id, repo_data, watchers))
+        
+        # Flush assigns ids to new repos; persist each page before the next one
+        db.flush()
+        synced_repos.extend({
+            "id": str(repo.id),
+            "full_name": repo.full_name,
+            "html_url": repo.html_url,
+            "language": repo.language
+        } for repo in page_repos)
+        db.commit()
+
     logger.info(f"Successfully synced {len(synced_repos)} repos for user {user_id}")
     
-    return [{
-        "id": str(repo.id),
-        "full_name": repo.full_name,
-        "html_url": repo.html_url,
-        "language": repo.language
-    } for repo in synced_repos]
+    return synced_repos
+
+
+async def iter_github_pages(
+    client: httpx.AsyncClient,
+    url: str,
+    access_token: str,
+    params: Optional[Dict[str, Any]] = None,
+    first_page_headers: Optional[Dict[str, str]] = None,
+) -> AsyncIterator[httpx.Response]:
+    """
+    Stream a paginated GitHub listing by following ``Link: rel="next"``.
+    
+    The request for the next page is started before the current response is
+    yielded, so the caller's processing overlaps the next round trip. Each
+    request goes through ``github_rate_limiter`` and ``retry_with_backoff``.
+    ``first_page_headers`` (e.g. conditional GET validators) are sent with the
+    first request only; a ``304 Not Modified`` response is yielded as-is and
+    ends the stream.
+    """
+    async def fetch_page(page_url: str, page_params: Optional[Dict[str, Any]], extra_headers: Dict[str, str]):
+        await github_rate_limiter.acquire(access_token)
+        
+        async def get_page():
+            response = await client.get(
+                page_url,
+                headers={**_github_headers(access_token), **extra_headers},
+                params=page_params,
+            )
+            await github_rate_limiter.update_from_headers(response.headers, access_token)
+            if response.status_code == 304:
+                return response
+            response.raise_for_status()
+            return response
+        
+        response = await retry_with_backoff(get_page, policy=github_retry_policy)
+        note_page()
+        return response
+    
+    pending = asyncio.ensure_future(fetch_page(url, params, first_page_headers or {}))
+    try:
+        while pending is not None:
+            response = await pending
+            pending = None
+            next_url = response.links.get("next", {}).get("url")
+            if next_url and response.status_code != 304:
+                # The next link already carries every query parameter
+                pending = asyncio.ensure_future(fetch_page(next_url, None, {}))
+            yield response
+    finally:
+        if pending is not None:
+            pending.cancel()
+
+
+def _upsert_repo(db: Session, user_id: str, repo_data: Dict[str, Any], watchers: int) -> Any:
+    """Create or update a ``Repo`` from a REST-shaped repository payload."""
+    from app.models.repo import Repo
+    
+    # Check if repo exists
+    existing_repo = db.query(Repo).filter(
+        Repo.user_id == user_id,
+        Repo.provider_repo_id == str(repo_data["id"])
+    ).first()
+    
+    if existing_repo:
+        # Update existing repo
+        existing_repo.full_name = repo_data["full_name"]
+        existing_repo.html_url = repo_data["html_url"]
+        existing_repo.description = repo_data.get("description")
+        existing_repo.language = repo_data.get("language")
+        existing_repo.stars = repo_data.get("stargazers_count", 0)
+        existing_repo.watchers = int(watchers or 0)
+        existing_repo.forks = repo_data.get("forks_count", 0)
+        existing_repo.is_fork = repo_data.get("fork", False)
+        existing_repo.last_synced_at = datetime.utcnow()
+        # Update created_at from GitHub if available
+        if repo_data.get("created_at"):
+            try:
+                existing_repo.created_at = datetime.fromisoformat(repo_data["created_at"].replace("Z", "+00:00"))
+            except (ValueError, AttributeError):
+                pass
+        # Use GitHub's updated_at if available, otherwise use current time
+        if repo_data.get("updated_at"):
+            try:
+                existing_repo.updated_at = datetime.fromisoformat(repo_data["updated_at"].replace("Z", "+00:00"))
+            except (ValueError, AttributeError):
+                existing_repo.updated_at = datetime.utcnow()
+        return existing_repo
+    else:
+        # Create new repo - use GitHub's created_at and updated_at
+        created_at = datetime.utcnow()
+        updated_at = datetime.utcnow()
+        
+        if repo_data.get("created_at"):
+            try:
+                created_at = datetime.fromisoformat(repo_data["created_at"].replace("Z", "+00:00"))
+            except (ValueError, AttributeError):
+                pass
+        
+        if repo_data.get("updated_at"):
+            try:
+                updated_at = datetime.fromisoformat(repo_data["updated_at"].replace("Z", "+00:00"))
+            except (ValueError, AttributeError):
+                pass
+        
+        new_repo = Repo(
+            user_id=user_id,
+            provider_repo_id=str(repo_data["id"]),
+            full_name=repo_data["full_name"],
+            html_url=repo_data["html_url"],
+            description=repo_data.get("description"),
+            language=repo_data.get("language"),
+            stars=repo_data.get("stargazers_count", 0),
+            watchers=int(watchers or 0),
+            forks=repo_data.get("forks_count", 0),
+            is_fork=repo_data.get("fork", False),
+            last_synced_at=datetime.utcnow(),
+            created_at=created_at,
+            updated_at=updated_at
+        )
+        db.add(new_repo)
+        return new_repo
 
 
 @handle_api_errors("GitHub")
@@ -170,116 +251,299 @@ async def sync_commits(
     repo_id: str,
     access_token: str,
     db: Session,
-    since_days: int | None = None
+    since_days: int | None = None,
+    full_resync: bool = False,
+    client: Optional[httpx.AsyncClient] = None,
 ) -> List[Dict[str, Any]]:
     """
     Sync commits for a specific repository.
     
+    By default only commits newer than the repo's high-water mark
+    (``Repo.last_commit_at``) are requested, and the first page is sent as a
+    conditional GET so an unchanged repo answers ``304 Not Modified`` without
+    spending rate limit. Pages are written as they arrive, and a walk that was
+    interrupted is finished first on the next run.
+    
     Args:
         user_id: User UUID
         repo_id: Repository UUID
         access_token: GitHub OAuth access token
         db: Database session
-        since_days: Number of days to look back (None = all commits)
+        since_days: Number of days to look back (overrides the stored cursor)
+        full_resync: Ignore the stored cursor and re-page the full history
+        client: Shared pooled client (a temporary one is created if omitted)
         
     Returns:
         List of synced commit data
     """
-    # Build params
-    params = {"per_page": 100}
-    if since_days is not None:
-        since = datetime.utcnow() - timedelta(days=since_days)
-        params["since"] = since.isoformat() + "Z"
-    
+    async with client_scope(client) as http:
+        return await _sync_commits(user_id, repo_id, access_token, db, since_days, full_resync, http)
+
+
+async def _sync_commits(
+    user_id: str,
+    repo_id: str,
+    access_token: str,
+    db: Session,
+    since_days: int | None,
+    full_resync: bool,
+    client: httpx.AsyncClient,
+) -> List[Dict[str, Any]]:
     # Get repo from database
     from app.models.repo import Repo
-    from app.models.commit import Commit
     from app.exceptions import ResourceNotFoundError
     
     repo = db.query(Repo).filter(Repo.id == repo_id).first()
     if not repo:
         raise ResourceNotFoundError("Repository", repo_id)
     
-    # Fetch all commits with pagination
-    all_commits = []
-    page = 1
+    # Build params
+    params = {"per_page": 100}
+    conditional_headers = {}
+    if since_days is not None:
+        since = datetime.utcnow() - timedelta(days=since_days)
+        params["since"] = since.isoformat() + "Z"
+    elif not full_resync and repo.last_commit_at:
+        params["since"] = _to_github_timestamp(repo.last_commit_at)
+        if repo.commits_etag:
+            conditional_headers["If-None-Match"] = repo.commits_etag
+        if repo.commits_last_modified:
+            conditional_headers["If-Modified-Since"] = repo.commits_last_modified
+    
+    synced_commits = []
+    
+    # Finish a walk that was interrupted before its last page
+    if repo.commits_resume_url and not full_resync:
+        logger.info(f"Resuming interrupted commit sync for repo {repo.full_name}")
+        resumed = await _stream_commit_pages(
+            db, repo, user_id, access_token, client, repo.commits_resume_url
+        )
+        synced_commits.extend(resumed or [])
+    
+    # Stream new commits page by page straight into the database
+    inserted = await _stream_commit_pages(
+        db,
+        repo,
+        user_id,
+        access_token,
+        client,
+        f"https://api.github.com/repos/{repo.full_name}/commits",
+        params=params,
+        first_page_headers=conditional_headers,
+        record_validators=since_days is None,
+    )
+    if inserted is None:
+        logger.info(f"No new commits for repo {repo.full_name} (304 Not Modified)")
+        repo.last_synced_at = datetime.utcnow()
+        db.commit()
+    else:
+        synced_commits.extend(inserted)
+    
+    logger.info(f"Successfully synced {len(synced_commits)} commits for repo {repo.full_name}")
+    
+    return synced_commits
+
+
+async def _stream_commit_pages(
+    db: Session,
+    repo: Any,
+    user_id: str,
+    access_token: str,
+    client: httpx.AsyncClient,
+    url: str,
+    params: Optional[Dict[str, Any]] = None,
+    first_page_headers: Optional[Dict[str, str]] = None,
+    record_validators: bool = False,
+) -> Optional[List[Dict[str, Any]]]:
+    """
+    Parse, dedupe and commit each commits listing page as it arrives.
+    
+    Memory stays bounded by one page plus the insert buffer. After every page
+    the next-page URL is committed together with the rows, so a killed task
+    resumes from ``Repo.commits_resume_url`` instead of starting over.
+    
+    Returns:
+        Light-weight data of inserted commits, or None on ``304 Not Modified``
+    """
+    from app.utils.weekly_deltas import record_commit_deltas
     
-    while True:
-        # Apply rate limiting
-        await github_rate_limiter.acquire()
+    inserted = []
+    is_first_page = True
+    repo_name = repo.full_name
+    pages = iter_github_pages(
+        client,
+        url,
+        access_token,
+        params=params,
+        first_page_headers=first_page_headers,
+    )
+    async for response in pages:
+        if response.status_code == 304:
+            return None
         
-        # Call GitHub API for commits
-        async def fetch_commits():
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                page_params = {**params, "page": page}
-                response = await client.get(
-                    f"https://api.github.com/repos/{repo.full_name}/commits",
-                    headers={
-                        "Authorization": f"Bearer {access_token}",
-                        "Accept": "application/vnd.github.v3+json",
-                    },
-                    params=page_params
-                )
-                response.raise_for_status()
-                return response.json()
+        commits_data = response.json()
+        if not isinstance(commits_data, list):
+            raise DataValidationError("GitHub API returned invalid data format")
         
-        commits_data = await retry_with_backoff(fetch_commits)
+        rows = []
+        for commit_data in commits_data:
+            row = _normalize_commit(commit_data, str(repo.id), user_id)
+            if row is not None:
+                rows.append(row)
         
-        if not commits_data:
-            break
-            
-        all_commits.extend(commits_data)
+        page_inserted = bulk_insert_commits(db, rows)
+        if settings.ARCHIVE_RAW_COMMIT_PAYLOADS:
+            archive_commit_payloads(
+                db,
+                page_inserted,
+                {commit_data.get("sha"): commit_data for commit_data in commits_data},
+            )
+        inserted.extend({
+            "sha": commit["sha"],
+            "message": commit["message"],
+            "committed_at": commit["committed_at"].isoformat()
+        } for commit in page_inserted)
         
-        # If we got less than per_page, we've reached the end
-        if len(commits_data) < 100:
-            break
-            
-        page += 1
+        # Advance the high-water mark and remember where to continue
+        _advance_commit_cursor(
+            repo,
+            commits_data,
+            response if (is_first_page and record_validators) else None,
+        )
+        repo.commits_resume_url = response.links.get("next", {}).get("url")
+        record_commit_deltas(db, user_id, repo_name, page_inserted)
+        db.commit()
+        is_first_page = False
     
-    commits_data = all_commits
+    return inserted
+
+
+def _github_headers(access_token: str) -> Dict[str, str]:
+    return {
+        "Authorization": f"Bearer {access_token}",
+        "Accept": "application/vnd.github.v3+json",
+    }
+
+
+def _to_github_timestamp(value: datetime) -> str:
+    """Format a datetime as the ISO 8601 UTC timestamp GitHub expects."""
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value.strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def _parse_commit_date(commit_data: Dict[str, Any]) -> datetime | None:
+    """Return the committer date of a commit listing item, if parseable."""
+    committed_at_str = commit_data.get("commit", {}).get("committer", {}).get("date")
+    if not committed_at_str:
+        return None
+    try:
+        return datetime.fromisoformat(committed_at_str.replace("Z", "+00:00"))
+    except (ValueError, AttributeError):
+        return None
+
+
+def _normalize_commit(commit_data: Dict[str, Any], repo_id: str, user_id: str) -> Dict[str, Any] | None:
+    """Turn a commits listing item into a ``commits`` row, or None if invalid."""
+    # Validate required fields
+    if not all(key in commit_data for key in ["sha", "commit"]):
+        logger.warning("Skipping commit with missing fields")
+        return None
     
-    # Upsert commits into database
-    synced_commits = []
+    commit_info = commit_data.get("commit", {})
+    committed_at = _parse_commit_date(commit_data)
+    if committed_at is None:
+        logger.warning(f"Invalid commit date format for {commit_data['sha']}")
+        committed_at = datetime.utcnow()
+    
+    return {
+        "id": uuid.uuid4(),
+        "repo_id": repo_id,
+        "user_id": user_id,
+        "sha": commit_data["sha"],
+        "message": commit_info.get("message", ""),
+        "committed_at": committed_at,
+        "author_login": (commit_data.get("author") or {}).get("login"),
+        "parents_count": len(commit_data["parents"]) if "parents" in commit_data else None,
+        "created_at": datetime.utcnow(),
+    }
+
+
+def bulk_insert_commits(
+    db: Session,
+    rows: List[Dict[str, Any]],
+    chunk_size: int = COMMIT_INSERT_CHUNK_SIZE,
+) -> List[Dict[str, Any]]:
+    """
+    Insert commit rows with ``ON CONFLICT (repo_id, sha) DO NOTHING``.
+    
+    Rows are written in chunks of ``chunk_size`` so one statement never carries
+    an unbounded parameter list. The caller owns the transaction.
+    
+    Returns:
+        The rows that were actually inserted (id, sha, message, committed_at)
+    """
+    from sqlalchemy.dialects.postgresql import insert
+    from app.models.commit import Commit
+    
+    inserted = []
+    for offset in range(0, len(rows), chunk_size):
+        chunk = rows[offset:offset + chunk_size]
+        stmt = (
+            insert(Commit)
+            .values(chunk)
+            .on_conflict_do_nothing(index_elements=["repo_id", "sha"])
+            .returning(Commit.id, Commit.sha, Commit.message, Commit.committed_at)
+        )
+        result = db.execute(stmt)
+        inserted.extend(
+            {"id": commit_id, "sha": sha, "message": message, "committed_at": committed_at}
+            for commit_id, sha, message, committed_at in result
+        )
+    return inserted
+
+
+def archive_commit_payloads(
+    db: Session,
+    inserted: List[Dict[str, Any]],
+    payloads_by_sha: Dict[str, Dict[str, Any]],
+) -> None:
+    """Store zlib-compressed raw payloads of newly inserted commits."""
+    from sqlalchemy.dialects.postgresql import insert
+    from app.models.commit_payload import CommitPayload
+    
+    rows = [
+        {
+            "commit_id": commit["id"],
+            "payload": zlib.compress(json.dumps(payloads_by_sha[commit["sha"]]).encode()),
+            "created_at": datetime.utcnow(),
+        }
+        for commit in inserted
+        if commit["sha"] in payloads_by_sha
+    ]
+    if rows:
+        db.execute(insert(CommitPayload).values(rows).on_conflict_do_nothing())
+
+
+def _advance_commit_cursor(repo, commits_data: List[Dict[str, Any]], response: httpx.Response | None) -> None:
+    """Move the repo's sync cursor forward to the newest commit seen."""
+    newest_sha = None
+    newest_at = None
     for commit_data in commits_data:
-        # Validate required fields
-        if not all(key in commit_data for key in ["sha", "commit"]):
-            logger.warning(f"Skipping commit with missing fields")
+        committed_at = _parse_commit_date(commit_data)
+        if committed_at is None:
             continue
-        
-        commit_info = commit_data.get("commit", {})
-        
-        # Check if commit exists
-        existing_commit = db.query(Commit).filter(
-            Commit.repo_id == repo_id,
-            Commit.sha == commit_data["sha"]
-        ).first()
-        
-        if not existing_commit:
-            # Parse commit date with error handling
-            committed_at_str = commit_info.get("committer", {}).get("date")
-            try:
-                committed_at = datetime.fromisoformat(committed_at_str.replace("Z", "+00:00")) if committed_at_str else datetime.utcnow()
-            except (ValueError, AttributeError):
-                logger.warning(f"Invalid commit date format: {committed_at_str}")
-                committed_at = datetime.utcnow()
-            
-            # Create new commit
-            new_commit = Commit(
-                repo_id=repo_id,
-                user_id=user_id,
-                sha=commit_data["sha"],
-                message=commit_info.get("message", ""),
-                committed_at=committed_at,
-                raw_data=commit_data
-            )
-            db.add(new_commit)
-            synced_commits.append(new_commit)
+        if newest_at is None or committed_at > newest_at:
+            newest_at = committed_at
+            newest_sha = commit_data.get("sha")
     
-    db.commit()
-    logger.info(f"Successfully synced {len(synced_commits)} commits for repo {repo.full_name}")
+    if newest_at is not None and (repo.last_commit_at is None or newest_at >= repo.last_commit_at):
+        repo.last_commit_at = newest_at
+        repo.last_commit_sha = newest_sha
     
-    return [{
-        "sha": commit.sha,
-        "message": commit.message,
-        "committed_at": commit.committed_at.isoformat()
-    } for commit in synced_commits]
+    # Keep the validators of the listing we just read so an unchanged repo
+    # answers 304 next time.
+    if response is not None:
+        repo.commits_etag = response.headers.get("ETag")
+        repo.commits_last_modified = response.headers.get("Last-Modified")
+    repo.last_synced_at = datetime.utcnow()
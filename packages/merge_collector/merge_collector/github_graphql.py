@@ -0,0 +1,321 @@
+"""GitHub data collection through the GraphQL API.
+
+One paged ``viewer.repositories`` query returns repository metadata and
+watcher counts for up to 100 repos per request, replacing the REST listing
+plus one ``GET /repos/{full_name}`` per repo. Only fields that ``Repo``
+stores are requested, since every extra connection costs query points.
+
+Commit stats (additions, deletions, changed files) are not part of the REST
+commits listing; ``enrich_commit_stats`` fills them in afterwards by looking up
+a batch of commits per query. Every looked-up commit gets ``stats_checked_at``;
+commits GitHub can no longer resolve keep NULL stats (unknown, not zero).
+"""
+import asyncio
+import httpx
+import logging
+from collections import defaultdict
+from sqlalchemy.orm import Session
+from typing import List, Dict, Any, Optional
+from merge_collector.http import client_scope
+from merge_collector.github import _github_headers, _upsert_repo
+from app.utils.retry import (
+    retry_with_backoff,
+    handle_api_errors,
+    github_rate_limiter,
+    github_retry_policy,
+)
+from app.exceptions import DataValidationError, ExternalAPIError
+
+logger = logging.getLogger(__name__)
+
+GRAPHQL_URL = "https://api.github.com/graphql"
+
+REPOSITORIES_QUERY = """
+query($cursor: String, $pageSize: Int!) {
+  viewer {
+    repositories(
+      first: $pageSize
+      after: $cursor
+      ownerAffiliations: OWNER
+      orderBy: {field: UPDATED_AT, direction: DESC}
+    ) {
+      pageInfo { hasNextPage endCursor }
+      nodes {
+        databaseId
+        nameWithOwner
+        url
+        description
+        isFork
+        stargazerCount
+        forkCount
+        createdAt
+        updatedAt
+        primaryLanguage { name }
+        watchers { totalCount }
+      }
+    }
+  }
+}
+"""
+
+
+async def graphql_query(
+    client: httpx.AsyncClient,
+    access_token: str,
+    query: str,
+    variables: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    """
+    Run a GraphQL query with rate limiting and retries.
+
+    Returns:
+        The ``data`` object of the response
+
+    Raises:
+        ExternalAPIError: If GitHub reports GraphQL errors and no data
+    """
+    await github_rate_limiter.acquire(access_token)
+
+    async def post_query():
+        response = await client.post(
+            GRAPHQL_URL,
+            headers=_github_headers(access_token),
+            json={"query": query, "variables": variables or {}},
+        )
+        await github_rate_limiter.update_from_headers(response.headers, access_token)
+        response.raise_for_status()
+        return response.json()
+
+    payload = await retry_with_backoff(post_query, policy=github_retry_policy)
+    errors = payload.get("errors")
+    if errors:
+        messages = "; ".join(str(error.get("message", error)) for error in errors)
+        if not payload.get("data"):
+            raise ExternalAPIError("GitHub", f"GraphQL 오류: {messages}")
+        logger.warning(f"GitHub GraphQL returned partial data: {messages}")
+    return payload.get("data") or {}
+
+
+def _commit_stats_query(count: int) -> str:
+    """Build a query resolving ``count`` commit oids of one repository."""
+    oid_vars = "".join(f", $oid{i}: GitObjectID!" for i in range(count))
+    lookups = "\n".join(
+        f"    c{i}: object(oid: $oid{i}) {{ ... on Commit {{ additions deletions changedFilesIfAvailable }} }}"
+        for i in range(count)
+    )
+    return (
+        f"query($owner: String!, $name: String!{oid_vars}) {{\n"
+        f"  repository(owner: $owner, name: $name) {{\n{lookups}\n  }}\n"
+        f"}}"
+    )
+
+
+def _node_to_repo_data(node: Dict[str, Any]) -> Dict[str, Any]:
+    """Map a GraphQL repository node onto the REST payload shape."""
+    primary_language = node.get("primaryLanguage") or {}
+    return {
+        "id": node.get("databaseId"),
+        "full_name": node.get("nameWithOwner"),
+        "html_url": node.get("url"),
+        "description": node.get("description"),
+        "language": primary_language.get("name"),
+        "stargazers_count": node.get("stargazerCount", 0),
+        "subscribers_count": (node.get("watchers") or {}).get("totalCount", 0),
+        "forks_count": node.get("forkCount", 0),
+        "fork": node.get("isFork", False),
+        "created_at": node.get("createdAt"),
+        "updated_at": node.get("updatedAt"),
+    }
+
+
+@handle_api_errors("GitHub")
+async def sync_repos_graphql(
+    user_id: str,
+    access_token: str,
+    db: Session,
+    client: Optional[httpx.AsyncClient] = None,
+    page_size: int = 100,
+) -> List[Dict[str, Any]]:
+    """
+    Sync user's GitHub repositories through GraphQL.
+
+    Args:
+        user_id: User UUID
+        access_token: GitHub OAuth access token
+        db: Database session
+        client: Shared pooled client (a temporary one is created if omitted)
+        page_size: Repositories per GraphQL page (max 100)
+
+    Returns:
+        List of synced repo data, shaped like ``sync_repos``
+    """
+    synced = []
+    cursor = None
+
+    async with client_scope(client) as http:
+        while True:
+            data = await graphql_query(
+                http,
+                access_token,
+                REPOSITORIES_QUERY,
+                {"cursor": cursor, "pageSize": page_size},
+            )
+            connection = ((data.get("viewer") or {}).get("repositories")) or {}
+            nodes = connection.get("nodes")
+            if nodes is None:
+                raise DataValidationError("GitHub GraphQL returned invalid data format")
+
+            for node in nodes:
+                if not node:
+                    continue
+                repo_data = _node_to_repo_data(node)
+                if not all(repo_data.get(key) for key in ["id", "full_name", "html_url"]):
+                    logger.warning(f"Skipping repo with missing fields: {repo_data.get('id', 'unknown')}")
+                    continue
+                repo = _upsert_repo(db, user_id, repo_data, repo_data["subscribers_count"])
+                synced.append(repo)
+
+            page_info = connection.get("pageInfo") or {}
+            if not page_info.get("hasNextPage"):
+                break
+            cursor = page_info.get("endCursor")
+
+    # Flush assigns ids to new repos before the commit expires attributes
+    db.flush()
+    result = [{
+        "id": str(repo.id),
+        "full_name": repo.full_name,
+        "html_url": repo.html_url,
+        "language": repo.language,
+    } for repo in synced]
+    db.commit()
+    logger.info(f"Successfully synced {len(result)} repos for user {user_id} via GraphQL")
+
+    return result
+
+
+@handle_api_errors("GitHub")
+async def enrich_commit_stats(
+    user_id: str,
+    access_token: str,
+    db: Session,
+    client: Optional[httpx.AsyncClient] = None,
+    batch_size: int = 50,
+    max_commits: int = 2000,
+    concurrency: int = 4,
+) -> Dict[str, Any]:
+    """
+    Fill in additions/deletions/files_changed for commits that lack them.
+    
+    Pending commits (``stats_checked_at IS NULL``) are looked up newest first,
+    grouped by repository and resolved ``batch_size`` at a time with one
+    GraphQL query per batch, at most ``concurrency`` queries in flight. Each
+    batch is committed on its own, so an interrupted run simply continues with
+    the commits that are still pending. Commits that can't be resolved (force
+    pushed away, repository renamed or deleted) are marked checked with NULL
+    stats, so they never hold the pending window against other repos.
+    
+    Args:
+        user_id: User UUID
+        access_token: GitHub OAuth access token
+        db: Database session
+        client: Shared pooled client (a temporary one is created if omitted)
+        batch_size: Commits per GraphQL query
+        max_commits: Upper bound of commits handled in this call
+        concurrency: Maximum number of queries in flight
+        
+    Returns:
+        Counts of enriched commits, commits marked unresolvable and failed
+        batches, and whether more commits are still pending
+    """
+    from datetime import datetime
+    from sqlalchemy import update
+    from app.models.commit import Commit
+    from app.models.repo import Repo
+    
+    pending = (
+        db.query(Commit.id, Commit.sha, Repo.full_name)
+        .join(Repo, Commit.repo_id == Repo.id)
+        .filter(Commit.user_id == user_id, Commit.stats_checked_at.is_(None))
+        .order_by(Commit.committed_at.desc())
+        .limit(max_commits + 1)
+        .all()
+    )
+    has_more = len(pending) > max_commits
+    pending = pending[:max_commits]
+    
+    by_repo = defaultdict(list)
+    for commit_id, sha, full_name in pending:
+        by_repo[full_name].append((commit_id, sha))
+    batches = [
+        (full_name, commits[i:i + batch_size])
+        for full_name, commits in by_repo.items()
+        for i in range(0, len(commits), batch_size)
+    ]
+    
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    
+    def store(full_name: str, rows: List[Dict[str, Any]]) -> bool:
+        try:
+            db.execute(update(Commit), rows)
+            db.commit()
+        except Exception as exc:
+            db.rollback()
+            logger.warning(f"Failed to store commit stats for repo {full_name}: {exc}")
+            return False
+        return True
+    
+    async def enrich_batch(http: httpx.AsyncClient, full_name: str, batch: List[Any]) -> tuple | None:
+        owner, _, name = full_name.partition("/")
+        variables = {"owner": owner, "name": name}
+        variables.update({f"oid{i}": sha for i, (_, sha) in enumerate(batch)})
+        async with semaphore:
+            try:
+                data = await graphql_query(http, access_token, _commit_stats_query(len(batch)), variables)
+            except Exception as exc:
+                logger.warning(f"Commit stats lookup failed for repo {full_name}: {exc}")
+                return None
+        
+        checked_at = datetime.utcnow()
+        repository = data.get("repository")
+        if repository is None:
+            # Renamed or deleted: nothing in this batch can be resolved
+            logger.warning(f"Repository {full_name} not visible to GraphQL, marking {len(batch)} commits unresolvable")
+            rows = [{"id": commit_id, "stats_checked_at": checked_at} for commit_id, _ in batch]
+            return (0, len(rows)) if store(full_name, rows) else None
+        
+        rows = []
+        for i, (commit_id, _) in enumerate(batch):
+            # Commits GitHub no longer has (force-pushed away) keep NULL stats
+            stats = repository.get(f"c{i}") or {}
+            rows.append({
+                "id": commit_id,
+                "additions": stats.get("additions"),
+                "deletions": stats.get("deletions"),
+                "files_changed": stats.get("changedFilesIfAvailable"),
+                "stats_checked_at": checked_at,
+            })
+        if not store(full_name, rows):
+            return None
+        enriched = sum(1 for row in rows if row["additions"] is not None)
+        return enriched, len(rows) - enriched
+    
+    async with client_scope(client) as http:
+        results = await asyncio.gather(*(
+            enrich_batch(http, full_name, batch) for full_name, batch in batches
+        ))
+    
+    enriched = sum(result[0] for result in results if result)
+    unresolved = sum(result[1] for result in results if result)
+    failed_batches = sum(1 for result in results if result is None)
+    logger.info(
+        f"Enriched stats for {enriched} commits of user {user_id} "
+        f"({unresolved} unresolvable, {failed_batches} failed batches, more pending: {has_more})"
+    )
+    
+    return {
+        "enriched": enriched,
+        "unresolved": unresolved,
+        "failed_batches": failed_batches,
+        "has_more": has_more,
+    }
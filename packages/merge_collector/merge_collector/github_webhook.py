@@ -0,0 +1,95 @@
+"""GitHub webhook parsing for low-latency commit ingestion.
+
+Push events carry the pushed commits, so new commits can be stored seconds
+after a push instead of waiting for the next poll. Polling stays in place as a
+reconciliation pass and backs off on its own once it keeps finding nothing new.
+"""
+import hashlib
+import hmac
+import logging
+from typing import Any, Dict, List, Optional
+
+from merge_collector.github import _normalize_commit
+
+logger = logging.getLogger(__name__)
+
+
+def verify_signature(secret: str, body: bytes, signature_header: Optional[str]) -> bool:
+    """
+    Check the ``X-Hub-Signature-256`` header against the raw request body.
+    
+    Args:
+        secret: Webhook secret configured on GitHub
+        body: Raw request body, exactly as received
+        signature_header: Header value (``sha256=<hexdigest>``)
+        
+    Returns:
+        True if the signature matches
+    """
+    if not secret or not signature_header or not signature_header.startswith("sha256="):
+        return False
+    expected = hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+    return hmac.compare_digest(expected, signature_header[len("sha256="):])
+
+
+def parse_push_event(payload: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    Extract what commit ingestion needs from a ``push`` payload.
+    
+    Only pushes to the default branch are kept, matching what the commits
+    listing poll collects. Branch deletions and tag pushes are ignored.
+    
+    Returns:
+        ``{"provider_repo_id", "full_name", "commits"}`` or None if the push
+        carries nothing to ingest
+    """
+    repository = payload.get("repository") or {}
+    default_branch = repository.get("default_branch") or repository.get("master_branch")
+    if repository.get("id") is None or not default_branch:
+        return None
+    if payload.get("deleted") or payload.get("ref") != f"refs/heads/{default_branch}":
+        return None
+    
+    commits = [
+        {
+            "id": commit["id"],
+            "message": commit.get("message", ""),
+            "timestamp": commit.get("timestamp"),
+            "author_login": (commit.get("author") or {}).get("username"),
+        }
+        for commit in payload.get("commits") or []
+        if commit.get("id")
+    ]
+    if not commits:
+        return None
+    
+    return {
+        "provider_repo_id": str(repository["id"]),
+        "full_name": repository.get("full_name"),
+        "commits": commits,
+    }
+
+
+def normalize_push_commits(commits: List[Dict[str, Any]], repo_id: str, user_id: str) -> List[Dict[str, Any]]:
+    """
+    Turn commits from ``parse_push_event`` into ``commits`` rows.
+    
+    Each push commit is reshaped into the commits-listing form and passed
+    through the collector's own ``_normalize_commit``, so both paths store
+    identical rows. Push payloads carry no parent list, so ``parents_count``
+    stays NULL.
+    """
+    rows = []
+    for commit in commits:
+        listing_item = {
+            "sha": commit["id"],
+            "commit": {
+                "message": commit.get("message", ""),
+                "committer": {"date": commit.get("timestamp")},
+            },
+            "author": {"login": commit.get("author_login")},
+        }
+        row = _normalize_commit(listing_item, repo_id, user_id)
+        if row is not None:
+            rows.append(row)
+    return rows
@@ -0,0 +1,49 @@
+"""Shared HTTP client construction for collectors."""
+import httpx
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional
+
+DEFAULT_TIMEOUT = httpx.Timeout(30.0, connect=10.0)
+DEFAULT_LIMITS = httpx.Limits(
+    max_connections=20,
+    max_keepalive_connections=10,
+    keepalive_expiry=30.0,
+)
+
+
+def _http2_available() -> bool:
+    """HTTP/2 needs the optional ``h2`` package (``httpx[http2]``)."""
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def create_client(
+    timeout: httpx.Timeout = DEFAULT_TIMEOUT,
+    limits: httpx.Limits = DEFAULT_LIMITS,
+    **kwargs,
+) -> httpx.AsyncClient:
+    """
+    Create a pooled AsyncClient with keep-alive (and HTTP/2 when available).
+
+    One client is meant to be shared by every request of a sync run so
+    connections are reused instead of re-handshaking per page.
+    """
+    return httpx.AsyncClient(
+        timeout=timeout,
+        limits=limits,
+        http2=_http2_available(),
+        **kwargs,
+    )
+
+
+@asynccontextmanager
+async def client_scope(client: Optional[httpx.AsyncClient] = None) -> AsyncIterator[httpx.AsyncClient]:
+    """Yield ``client`` as-is, or a temporary pooled client closed on exit."""
+    if client is not None:
+        yield client
+        return
+    async with create_client() as owned_client:
+        yield owned_client
@@ -0,0 +1,144 @@
+"""Run every registered collector for a user in one event loop."""
+import asyncio
+import logging
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+import httpx
+from sqlalchemy.orm import Session
+
+from merge_collector.base import build_context, get_collector, registered_sources
+from merge_collector.http import client_scope
+from app.utils.retry import retry_budget
+from app.utils.sync_runs import tracked_sync_run
+
+logger = logging.getLogger(__name__)
+
+
+class CollectorOrchestrator:
+    """
+    Sync several sources concurrently with per-source limits.
+    
+    Sources of one user run side by side, so a user sync takes as long as
+    its slowest source. Each source gets its own DB session (a failing
+    source's rollback can't discard another's rows) and its own retry
+    budget, and is recorded as its own sync run; one source raising never
+    cancels the others. ``max_concurrent_users`` of each collector bounds
+    how many users are synced against that source at once when
+    ``sync_users`` is used.
+    Request rate is still governed by the shared per-upstream token buckets.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        sources: Optional[Iterable[str]] = None,
+        client: Optional[httpx.AsyncClient] = None,
+        task_id: Optional[str] = None,
+    ):
+        """
+        Args:
+            session_factory: Creates a new DB session (e.g. ``SessionLocal``)
+            sources: Sources to run (all registered ones if omitted)
+            client: Shared pooled client (a temporary one is created per run if omitted)
+            task_id: Celery task the sync runs were claimed for, if any
+        """
+        self.session_factory = session_factory
+        self.task_id = task_id
+        self.collectors = [get_collector(source) for source in (sources or registered_sources())]
+        self.client = client
+        self._limits = {
+            collector.source: asyncio.Semaphore(max(1, collector.max_concurrent_users))
+            for collector in self.collectors
+        }
+
+    async def sync_user(self, user_id: str, full_resync: bool = False) -> Dict[str, Dict[str, Any]]:
+        """
+        Sync every configured source of one user.
+        
+        Returns:
+            Result per source: ``status`` ('success', 'partial', 'skipped' or
+            'failed'),
+            ``items_synced``, retry counters and ``error``/``failures``
+        """
+        async with client_scope(self.client) as http:
+            return await self._sync_user(user_id, http, full_resync)
+
+    async def sync_users(self, user_ids: List[str], full_resync: bool = False) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        """Sync many users, sharing one client and the per-source limits."""
+        async with client_scope(self.client) as http:
+            results = await asyncio.gather(*(
+                self._sync_user(user_id, http, full_resync) for user_id in user_ids
+            ), return_exceptions=True)
+        return {
+            user_id: (
+                {collector.source: _failed_result(result) for collector in self.collectors}
+                if isinstance(result, BaseException) else result
+            )
+            for user_id, result in zip(user_ids, results)
+        }
+
+    async def _sync_user(self, user_id: str, client: httpx.AsyncClient, full_resync: bool) -> Dict[str, Dict[str, Any]]:
+        results = await asyncio.gather(*(
+            self._run_source(collector, user_id, client, full_resync)
+            for collector in self.collectors
+        ), return_exceptions=True)
+        return {
+            collector.source: _failed_result(result) if isinstance(result, BaseException) else result
+            for collector, result in zip(self.collectors, results)
+        }
+
+    async def _run_source(self, collector, user_id: str, client: httpx.AsyncClient, full_resync: bool) -> Dict[str, Any]:
+        db = self.session_factory()
+        try:
+            credential = collector.load_credential(db, user_id)
+            if not credential:
+                return {"status": "skipped", "items_synced": 0, "error": f"{collector.source} not configured"}
+
+            ctx = build_context(user_id, db, client, credential, full_resync)
+            async with self._limits[collector.source]:
+                with tracked_sync_run(user_id, collector.source, self.task_id) as run:
+                    if run is None:
+                        return {"status": "skipped", "items_synced": 0, "error": f"{collector.source} sync already running"}
+
+                    # Entered inside this task, so each source gets its own budget
+                    with retry_budget() as budget:
+                        try:
+                            items = await collector.sync(ctx)
+                        except Exception as exc:
+                            db.rollback()
+                            logger.warning(f"{collector.source} sync failed for user {user_id}: {exc}")
+                            run.fail(str(exc))
+                            return {
+                                "status": "failed",
+                                "items_synced": 0,
+                                "error": str(exc),
+                                "retries": budget.retries,
+                            }
+
+                    # Feed the adaptive schedule with what this run found
+                    from app.utils.sync_state import record_sync_result
+
+                    new_items = ctx.get("new_items", len(items))
+                    failures = ctx.get("failures", [])
+                    record_sync_result(db, user_id, collector.source, new_items, failed=bool(failures))
+                    db.commit()
+                    run.items = new_items
+                    if failures:
+                        run.fail(f"{collector.source} sync failed for {len(failures)} items: {', '.join(failures)}")
+
+            return {
+                "status": "partial" if failures else "success",
+                "items_synced": len(items),
+                "new_items": new_items,
+                "failures": failures,
+                "retries": budget.retries,
+                "retry_wait_seconds": round(budget.wait_seconds, 1),
+            }
+        finally:
+            db.close()
+
+
+def _failed_result(exc: BaseException) -> Dict[str, Any]:
+    """Result of a source whose run raised instead of returning."""
+    logger.error(f"Collector run raised: {exc!r}")
+    return {"status": "failed", "items_synced": 0, "error": str(exc) or type(exc).__name__}
@@ -1,108 +1,219 @@
 """solved.ac data collection."""
 import httpx
 import logging
+import uuid
 from sqlalchemy.orm import Session
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from datetime import datetime
-from app.utils.retry import retry_with_backoff, handle_api_errors, solvedac_rate_limiter
+from merge_collector.http import client_scope
+from app.utils.retry import (
+    retry_with_backoff,
+    handle_api_errors,
+    solvedac_rate_limiter,
+    solvedac_retry_policy,
+)
+from app.utils.sync_runs import note_page
 from app.exceptions import DataValidationError
 
 logger = logging.getLogger(__name__)
 
+SYNC_SOURCE = "solvedac"
+SEARCH_PAGE_SIZE = 100
+# problem/lookup accepts at most 100 comma-separated ids
+CATALOG_LOOKUP_BATCH_SIZE = 100
+CATALOG_UPSERT_CHUNK_SIZE = 500
+
 
 @handle_api_errors("solved.ac")
-async def sync_problems(user_id: str, handle: str, db: Session) -> List[Dict[str, Any]]:
+async def sync_problems(
+    user_id: str,
+    handle: str,
+    db: Session,
+    full_resync: bool = False,
+    client: Optional[httpx.AsyncClient] = None,
+) -> List[Dict[str, Any]]:
     """
-    Sync solved.ac problems for a user.
+    Sync solved.ac problems for a user with ``SolvedacCollector``.
+    
+    The user's ``solvedCount`` is read from the profile first. When it does not
+    exceed the number of problems already stored, nothing is paged at all.
+    Otherwise the solved list is paged only until the missing number of
+    problems has been found, checking ids against a set loaded in one query.
+    Every page is committed together with a per-handle checkpoint, so an
+    interrupted run continues from the next page.
     
     Args:
         user_id: User UUID
         handle: solved.ac handle
         db: Database session
+        full_resync: Page the full solved history regardless of the counts
+        client: Shared pooled client (a temporary one is created if omitted)
         
     Returns:
         List of synced problem data
     """
-    # Get solved problems from solved.ac API
-    # Note: solved.ac API documentation: https://solvedac.github.io/unofficial-documentation
+    from merge_collector.base import build_context
+    from merge_collector.collectors import SolvedacCollector
     
-    from app.models.problem import Problem
+    async with client_scope(client) as http:
+        synced = await SolvedacCollector().sync(build_context(user_id, db, http, handle, full_resync))
+    logger.info(f"Successfully synced {len(synced)} problems for user {handle}")
+    
+    return [{
+        "problem_id": row["problem_id"],
+        "title": row["title"],
+        "level": row["level"],
+        "tags": row["tags"],
+    } for row in synced]
+
+
+async def _fetch_solved_page(client: httpx.AsyncClient, handle: str, page: int) -> Dict[str, Any]:
+    """Fetch one page of the user's solved problems (search API)."""
+    await solvedac_rate_limiter.acquire()
     
-    # Fetch all problems with pagination
-    all_problems = []
-    page = 1
+    async def get_page():
+        response = await client.get(
+            "https://solved.ac/api/v3/search/problem",
+            params={
+                "query": f"solved_by:{handle}",
+                "sort": "solved",
+                "direction": "desc",
+                "page": page,
+                "limit": SEARCH_PAGE_SIZE,
+            },
+        )
+        await solvedac_rate_limiter.update_from_headers(response.headers)
+        response.raise_for_status()
+        return response.json()
     
-    async with httpx.AsyncClient() as client:
-        while True:
-            # Get user's solved problems (using search API)
-            try:
-                response = await client.get(
-                    f"https://solved.ac/api/v3/search/problem",
-                    params={
-                        "query": f"solved_by:{handle}",
-                        "sort": "solved",
-                        "direction": "desc",
-                        "page": page,
-                        "limit": 100
-                    }
-                )
-                search_result = response.json()
-                items = search_result.get("items", [])
-                
-                if not items:
-                    break
-                
-                all_problems.extend(items)
-                
-                # Check if we've reached the end
-                total = search_result.get("count", 0)
-                if len(all_problems) >= total:
-                    break
-                    
-                page += 1
-                
-            except Exception as e:
-                print(f"Error fetching solved.ac data: {e}")
-                break
+    data = await retry_with_backoff(get_page, policy=solvedac_retry_policy)
+    note_page()
+    return data
+
+
+def _catalog_row(problem_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Map a solved.ac problem object onto a ``problem_catalog`` row."""
+    return {
+        "problem_id": problem_data["problemId"],
+        "title": problem_data.get("titleKo") or problem_data.get("title"),
+        "level": problem_data.get("level"),
+        "tags": [tag["key"] for tag in problem_data.get("tags", []) if tag.get("key")],
+        "accepted_user_count": problem_data.get("acceptedUserCount"),
+        "updated_at": datetime.utcnow(),
+    }
+
+
+def upsert_problem_catalog(db: Session, rows: List[Dict[str, Any]]) -> None:
+    """Insert or refresh ``problem_catalog`` rows in one statement per chunk."""
+    from sqlalchemy.dialects.postgresql import insert
+    from app.models.problem_catalog import ProblemCatalog
+    
+    for start in range(0, len(rows), CATALOG_UPSERT_CHUNK_SIZE):
+        stmt = insert(ProblemCatalog).values(rows[start:start + CATALOG_UPSERT_CHUNK_SIZE])
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[ProblemCatalog.problem_id],
+            set_={
+                "title": stmt.excluded.title,
+                "level": stmt.excluded.level,
+                "tags": stmt.excluded.tags,
+                "accepted_user_count": stmt.excluded.accepted_user_count,
+                "updated_at": stmt.excluded.updated_at,
+            },
+        )
+        db.execute(stmt)
+
+
+def insert_user_problems(db: Session, user_id: str, problem_ids: List[int], solved_at: datetime) -> List[int]:
+    """
+    Link solved problems to a user, skipping ones already stored.
     
-    problems_data = all_problems
+    Returns:
+        problem_ids that were actually inserted
+    """
+    from sqlalchemy.dialects.postgresql import insert
+    from app.models.problem import Problem
     
-    # Upsert problems into database
-    synced_problems = []
-    for problem_data in problems_data:
-        # Validate required fields
-        if "problemId" not in problem_data:
-            logger.warning("Skipping problem with missing problemId")
-            continue
-        
-        # Check if problem exists
-        existing_problem = db.query(Problem).filter(
-            Problem.user_id == user_id,
-            Problem.problem_id == problem_data["problemId"]
-        ).first()
+    if not problem_ids:
+        return []
+    now = datetime.utcnow()
+    stmt = insert(Problem).values([
+        {
+            "id": uuid.uuid4(),
+            "user_id": user_id,
+            "problem_id": problem_id,
+            "solved_at": solved_at,
+            "created_at": now,
+        }
+        for problem_id in problem_ids
+    ])
+    stmt = stmt.on_conflict_do_nothing(constraint="uq_problems_user_problem").returning(Problem.problem_id)
+    return [problem_id for (problem_id,) in db.execute(stmt)]
+
+
+async def refresh_problem_catalog(
+    db: Session,
+    problem_ids: List[int],
+    client: Optional[httpx.AsyncClient] = None,
+) -> int:
+    """
+    Re-read catalog entries from solved.ac's batch lookup endpoint.
+    
+    Tag and level changes on solved.ac reach every user through the shared
+    catalog, with one request per ``CATALOG_LOOKUP_BATCH_SIZE`` problems.
+    
+    Args:
+        db: Database session
+        problem_ids: Catalog entries to refresh
+        client: Shared pooled client (a temporary one is created if omitted)
         
-        if not existing_problem:
-            # Create new problem
-            tags = [tag["key"] for tag in problem_data.get("tags", [])]
+    Returns:
+        Number of refreshed entries
+    """
+    refreshed = 0
+    async with client_scope(client) as http:
+        for start in range(0, len(problem_ids), CATALOG_LOOKUP_BATCH_SIZE):
+            batch = problem_ids[start:start + CATALOG_LOOKUP_BATCH_SIZE]
+            await solvedac_rate_limiter.acquire()
             
-            new_problem = Problem(
-                user_id=user_id,
-                problem_id=problem_data["problemId"],
-                title=problem_data.get("titleKo") or problem_data.get("title"),
-                level=problem_data.get("level"),
-                tags=tags,
-                solved_at=datetime.utcnow(),  # Note: actual solve time not available from API
-                raw_data=problem_data
-            )
-            db.add(new_problem)
-            synced_problems.append(new_problem)
+            async def lookup():
+                response = await http.get(
+                    "https://solved.ac/api/v3/problem/lookup",
+                    params={"problemIds": ",".join(str(problem_id) for problem_id in batch)},
+                )
+                await solvedac_rate_limiter.update_from_headers(response.headers)
+                response.raise_for_status()
+                return response.json()
+            
+            items = await retry_with_backoff(lookup, policy=solvedac_retry_policy)
+            if not isinstance(items, list):
+                raise DataValidationError("solved.ac API returned invalid data format")
+            rows = [_catalog_row(item) for item in items if "problemId" in item]
+            upsert_problem_catalog(db, rows)
+            db.commit()
+            refreshed += len(rows)
     
-    db.commit()
-    logger.info(f"Successfully synced {len(synced_problems)} problems for user {handle}")
+    logger.info(f"Refreshed {refreshed} problem catalog entries")
+    return refreshed
+
+
+async def fetch_solved_count(client: httpx.AsyncClient, handle: str) -> Optional[int]:
+    """
+    Read ``solvedCount`` from the user's solved.ac profile.
     
-    return [{
-        "problem_id": problem.problem_id,
-        "title": problem.title,
-        "level": problem.level,
-        "tags": problem.tags
-    } for problem in synced_problems]
+    Returns:
+        Number of solved problems, or None if the profile has no count
+    """
+    await solvedac_rate_limiter.acquire()
+    
+    async def get_profile():
+        response = await client.get(
+            "https://solved.ac/api/v3/user/show",
+            params={"handle": handle},
+        )
+        await solvedac_rate_limiter.update_from_headers(response.headers)
+        response.raise_for_status()
+        return response.json()
+    
+    profile = await retry_with_backoff(get_profile, policy=solvedac_retry_policy)
+    solved_count = profile.get("solvedCount")
+    return int(solved_count) if solved_count is not None else None
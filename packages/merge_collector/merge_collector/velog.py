@@ -1,47 +1,105 @@
 """Velog data collection via RSS."""
+import html
+import re
 import httpx
 import feedparser
 import logging
 from datetime import datetime
 from dateutil import parser
+from sqlalchemy import update
 from sqlalchemy.orm import Session
-from typing import List, Dict, Any
-from app.utils.retry import retry_with_backoff, handle_api_errors
+from typing import List, Dict, Any, Optional
+from merge_collector.http import client_scope
+from app.utils.retry import retry_with_backoff, handle_api_errors, velog_retry_policy
+from app.utils.sync_runs import note_page
 from app.exceptions import DataValidationError
 
 logger = logging.getLogger(__name__)
 
+SYNC_SOURCE = "velog"
+# Characters of cleaned post body kept per BlogPost
+BODY_EXCERPT_MAX_CHARS = 2000
+
+_TAG_RE = re.compile(r"<[^>]+>")
+_BLANK_LINES_RE = re.compile(r"\n\s*\n+")
+
 
 @handle_api_errors("Velog")
-async def sync_blog_posts(user_id: str, velog_id: str, db: Session) -> List[Dict[str, Any]]:
+async def sync_blog_posts(
+    user_id: str,
+    velog_id: str,
+    db: Session,
+    client: Optional[httpx.AsyncClient] = None,
+) -> List[Dict[str, Any]]:
     """
     Sync Velog blog posts via RSS feed.
     
+    Runs ``VelogCollector``: the feed is requested with the
+    ``ETag``/``Last-Modified`` validators of the previous run, and the body is
+    fingerprinted with SHA-256. On ``304 Not Modified`` or an unchanged
+    fingerprint the feed is not parsed. A feed that cannot be fetched raises,
+    so the run fails instead of counting as a sync that found nothing (which
+    would back off the user's schedule).
+    
     Args:
         user_id: User UUID
         velog_id: Velog user ID (e.g., '@username')
         db: Database session
+        client: Shared pooled client (a temporary one is created if omitted)
         
     Returns:
         List of synced blog post data
     """
-    # Clean velog_id (remove @ if present)
-    clean_id = velog_id.lstrip("@")
+    from merge_collector.base import build_context
+    from merge_collector.collectors import VelogCollector
+    
+    async with client_scope(client) as http:
+        synced_posts = await VelogCollector().sync(build_context(user_id, db, http, velog_id))
+    logger.info(f"Successfully synced {len(synced_posts)} blog posts for user {velog_id.lstrip('@')}")
+    return synced_posts
+
+
+async def fetch_feed(
+    client: httpx.AsyncClient,
+    velog_id: str,
+    cursor: Dict[str, Any],
+) -> httpx.Response:
+    """
+    Request the user's RSS feed, conditional on the cursor's validators.
+    
+    Returns:
+        The response (possibly ``304 Not Modified``)
+    
+    Raises:
+        httpx.HTTPError: The feed could not be fetched after retries
+    """
+    conditional_headers = {}
+    if cursor.get("etag"):
+        conditional_headers["If-None-Match"] = cursor["etag"]
+    if cursor.get("last_modified"):
+        conditional_headers["If-Modified-Since"] = cursor["last_modified"]
     
     # Fetch RSS feed - Velog uses api.velog.io domain
     async def fetch_rss():
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            response = await client.get(f"https://api.velog.io/rss/@{clean_id}")
+        response = await client.get(
+            f"https://api.velog.io/rss/@{velog_id}",
+            headers=conditional_headers,
+        )
+        if response.status_code != 304:
             response.raise_for_status()
-            return response.text
+        return response
     
     try:
-        rss_content = await retry_with_backoff(fetch_rss)
+        response = await retry_with_backoff(fetch_rss, policy=velog_retry_policy)
     except Exception as e:
-        logger.error(f"Error fetching Velog RSS for {clean_id}: {e}")
-        return []
-    
-    # Parse RSS
+        logger.error(f"Error fetching Velog RSS for {velog_id}: {e}")
+        raise
+    note_page()
+    return response
+
+
+def parse_feed(rss_content: bytes) -> List[Dict[str, Any]]:
+    """Parse an RSS body into post dicts, skipping entries missing required fields."""
     feed = feedparser.parse(rss_content)
     
     if not hasattr(feed, 'entries'):
@@ -59,21 +117,64 @@ async def sync_blog_posts(user_id: str, velog_id: str, db: Session) -> List[Dict
             "url": entry.get("link", ""),
             "title": entry.get("title", ""),
             "published_at": entry.get("published", ""),
+            "body_excerpt": extract_body_excerpt(entry),
         }
         posts.append(post_data)
+    return posts
+
+
+def has_missing_excerpts(db: Session, user_id: str) -> bool:
+    """Whether any of the user's stored posts still lacks ``body_excerpt``."""
+    from app.models.blog_post import BlogPost
+    
+    return db.query(
+        db.query(BlogPost.id).filter(
+            BlogPost.user_id == user_id,
+            BlogPost.platform == "velog",
+            BlogPost.body_excerpt.is_(None),
+        ).exists()
+    ).scalar()
+
+
+def store_posts(db: Session, user_id: str, posts: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Add posts the user does not have yet and fill missing excerpts of known ones.
     
-    # Upsert blog posts into database
+    Returns:
+        Data of the newly added posts (flushed, not committed)
+    """
     from app.models.blog_post import BlogPost
     
+    if not posts:
+        return []
+    
+    known = {
+        external_id: (post_id, has_excerpt)
+        for external_id, post_id, has_excerpt in db.query(
+            BlogPost.external_id,
+            BlogPost.id,
+            BlogPost.body_excerpt.isnot(None),
+        ).filter(
+            BlogPost.user_id == user_id,
+            BlogPost.external_id.in_([post_data["external_id"] for post_data in posts]),
+        )
+    }
+    
+    # Fill excerpts of posts stored before excerpts were kept. An empty body
+    # is stored as "" so the post no longer counts as missing its excerpt.
+    backfill = [
+        {"id": known[post_data["external_id"]][0], "body_excerpt": post_data["body_excerpt"] or ""}
+        for post_data in posts
+        if post_data["external_id"] in known
+        and not known[post_data["external_id"]][1]
+    ]
+    if backfill:
+        db.execute(update(BlogPost), backfill)
+    
     synced_posts = []
     for post_data in posts:
-        # Check if post exists
-        existing_post = db.query(BlogPost).filter(
-            BlogPost.user_id == user_id,
-            BlogPost.external_id == post_data["external_id"]
-        ).first()
-        
-        if not existing_post:
+        if post_data["external_id"] not in known:
+            known[post_data["external_id"]] = (None, True)
             # Parse published date with error handling
             try:
                 published_at = parser.parse(post_data["published_at"])
@@ -88,13 +189,12 @@ async def sync_blog_posts(user_id: str, velog_id: str, db: Session) -> List[Dict
                 external_id=post_data["external_id"],
                 url=post_data["url"],
                 title=post_data["title"],
-                published_at=published_at
+                published_at=published_at,
+                body_excerpt=post_data["body_excerpt"] or "",
             )
             db.add(new_post)
             synced_posts.append(new_post)
-    
-    db.commit()
-    logger.info(f"Successfully synced {len(synced_posts)} blog posts for user {clean_id}")
+    db.flush()
     
     return [{
         "id": str(post.id),
@@ -102,3 +202,17 @@ async def sync_blog_posts(user_id: str, velog_id: str, db: Session) -> List[Dict
         "url": post.url,
         "published_at": post.published_at.isoformat()
     } for post in synced_posts]
+
+
+def extract_body_excerpt(entry: Dict[str, Any]) -> Optional[str]:
+    """
+    Return the entry's post body as plain text, capped at ``BODY_EXCERPT_MAX_CHARS``.
+    
+    Velog puts the rendered post into the RSS description (or content). Tags
+    are stripped and entities unescaped here, once, so readers of
+    ``BlogPost.body_excerpt`` never touch HTML.
+    """
+    body = entry.get("description", "") or (entry.get("content") or [{}])[0].get("value", "")
+    text = html.unescape(_TAG_RE.sub("", body or ""))
+    text = _BLANK_LINES_RE.sub("\n\n", text).strip()
+    return text[:BODY_EXCERPT_MAX_CHARS] or None
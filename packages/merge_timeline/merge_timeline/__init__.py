@@ -1,5 +1,12 @@
 """merge_timeline - Timeline aggregation and weekly summary generation."""
 from merge_timeline.aggregator import aggregate_week_data
-from merge_timeline.builder import build_weekly_summary
+from merge_timeline.builder import backfill_weekly_summaries, build_weekly_summary
+from merge_timeline.sql_aggregator import aggregate_week_sql, aggregate_weeks_sql
 
-__all__ = ["aggregate_week_data", "build_weekly_summary"]
+__all__ = [
+    "aggregate_week_data",
+    "aggregate_week_sql",
+    "aggregate_weeks_sql",
+    "backfill_weekly_summaries",
+    "build_weekly_summary",
+]
@@ -1,16 +1,31 @@
 """Data aggregation for timeline."""
-from typing import Dict, Any, List
-from datetime import datetime
+from typing import Dict, Any, List, Optional
+from datetime import datetime, tzinfo
 
 
-def aggregate_week_data(commits: List[Any], problems: List[Any], notes: List[Any]) -> Dict[str, Any]:
+def _day(moment: datetime, tz: Optional[tzinfo]) -> str:
+    if tz is not None and moment.tzinfo is not None:
+        moment = moment.astimezone(tz)
+    return moment.strftime("%Y-%m-%d")
+
+
+def aggregate_week_data(
+    commits: List[Any],
+    problems: List[Any],
+    notes: List[Any],
+    tz: Optional[tzinfo] = None,
+) -> Dict[str, Any]:
     """
     Aggregate weekly data into summary JSON.
     
+    Pure-Python reference for ``sql_aggregator.aggregate_week_sql``, which
+    the weekly builders use; both produce the same summary for the same rows.
+    
     Args:
         commits: List of commit objects
         problems: List of problem objects
         notes: List of note objects
+        tz: Zone the ``by_day`` buckets are taken in (timestamps as loaded if omitted)
         
     Returns:
         Aggregated summary dictionary
@@ -23,13 +38,13 @@ def aggregate_week_data(commits: List[Any], problems: List[Any], notes: List[Any
     
     # Aggregate by day
     for commit in commits:
-        day_str = commit.committed_at.strftime("%Y-%m-%d")
+        day_str = _day(commit.committed_at, tz)
         if day_str not in summary["by_day"]:
             summary["by_day"][day_str] = {"commits": 0, "problems": 0, "notes": 0}
         summary["by_day"][day_str]["commits"] += 1
     
     for problem in problems:
-        day_str = problem.solved_at.strftime("%Y-%m-%d")
+        day_str = _day(problem.solved_at, tz)
         if day_str not in summary["by_day"]:
             summary["by_day"][day_str] = {"commits": 0, "problems": 0, "notes": 0}
         summary["by_day"][day_str]["problems"] += 1
@@ -39,7 +54,7 @@ def aggregate_week_data(commits: List[Any], problems: List[Any], notes: List[Any
             summary["problems_by_tag"][tag] = summary["problems_by_tag"].get(tag, 0) + 1
     
     for note in notes:
-        day_str = note.created_at.strftime("%Y-%m-%d")
+        day_str = _day(note.created_at, tz)
         if day_str not in summary["by_day"]:
             summary["by_day"][day_str] = {"commits": 0, "problems": 0, "notes": 0}
         summary["by_day"][day_str]["notes"] += 1
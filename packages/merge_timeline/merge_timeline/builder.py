@@ -1,82 +1,160 @@
 """Weekly summary builder."""
-from datetime import date, timedelta
+import uuid
+from datetime import date, datetime, timedelta
 from sqlalchemy.orm import Session
-from typing import Optional
-from app.models.commit import Commit
-from app.models.problem import Problem
-from app.models.note import Note
+from typing import Any, Dict
 from app.models.weekly_summary import WeeklySummary
-from merge_timeline.aggregator import aggregate_week_data
+from app.utils.weekly_deltas import discard_deltas
+from merge_timeline.sql_aggregator import (
+    aggregate_week_sql,
+    aggregate_weeks_sql,
+    empty_summary,
+    summary_fingerprint,
+)
 
+# Rows per INSERT ... ON CONFLICT statement when backfilling summaries
+SUMMARY_UPSERT_CHUNK_SIZE = 500
 
-def build_weekly_summary(user_id: str, week_start: date, db: Session) -> Optional[dict]:
+
+def build_weekly_summary(user_id: str, week_start: date, db: Session) -> dict:
     """
     Build weekly summary for a user.
     
+    The week is the half-open range from Monday 00:00 to the next Monday
+    00:00 in ``WEEK_TIMEZONE``, so late-Sunday activity is included.
+    Pending ingestion deltas of the week are discarded with the write; run
+    it in ``run_in_snapshot`` so they are exactly the ones the aggregate saw.
+    The write is flushed, not committed; the snapshot commits it.
+    
     Args:
         user_id: User UUID
         week_start: Start date of the week (Monday)
         db: Database session
         
     Returns:
-        Weekly summary data or None if failed
+        Weekly summary data, including the summary ``id``
     """
     week_end = week_start + timedelta(days=6)
     
-    # Query commits, problems, notes for the week
-    commits = db.query(Commit).filter(
-        Commit.user_id == user_id,
-        Commit.committed_at >= week_start,
-        Commit.committed_at <= week_end
-    ).all()
-    
-    problems = db.query(Problem).filter(
-        Problem.user_id == user_id,
-        Problem.solved_at >= week_start,
-        Problem.solved_at <= week_end
-    ).all()
-    
-    notes = db.query(Note).filter(
-        Note.user_id == user_id,
-        Note.created_at >= week_start,
-        Note.created_at <= week_end
-    ).all()
-    
-    # Aggregate data
-    summary_json = aggregate_week_data(commits, problems, notes)
+    # Counts only; no commit/problem/note rows are loaded
+    summary_json, counts = aggregate_week_sql(db, user_id, week_start)
     
     # Create/update WeeklySummary in database
     existing = db.query(WeeklySummary).filter(
         WeeklySummary.user_id == user_id,
-        WeeklySummary.week_start == week_start,
-        WeeklySummary.week_end == week_end
+        WeeklySummary.week_start == week_start
     ).first()
     
     if existing:
-        existing.commit_count = len(commits)
-        existing.problem_count = len(problems)
-        existing.note_count = len(notes)
+        existing.commit_count = counts["commits"]
+        existing.problem_count = counts["problems"]
+        existing.note_count = counts["notes"]
         existing.summary_json = summary_json
+        existing.source_fingerprint = summary_fingerprint(summary_json)
         weekly = existing
     else:
         weekly = WeeklySummary(
             user_id=user_id,
             week_start=week_start,
             week_end=week_end,
-            commit_count=len(commits),
-            problem_count=len(problems),
-            note_count=len(notes),
-            summary_json=summary_json
+            commit_count=counts["commits"],
+            problem_count=counts["problems"],
+            note_count=counts["notes"],
+            summary_json=summary_json,
+            source_fingerprint=summary_fingerprint(summary_json)
         )
         db.add(weekly)
     
-    db.commit()
+    discard_deltas(db, user_id, [week_start])
+    db.flush()
     
     return {
+        "id": str(weekly.id),
         "week_start": week_start.isoformat(),
         "week_end": week_end.isoformat(),
-        "commit_count": len(commits),
-        "problem_count": len(problems),
-        "note_count": len(notes),
+        "commit_count": counts["commits"],
+        "problem_count": counts["problems"],
+        "note_count": counts["notes"],
         "summary_json": summary_json,
     }
+
+
+def backfill_weekly_summaries(user_id: str, first_week: date, last_week: date, db: Session) -> Dict[str, Any]:
+    """
+    Build every weekly summary of a user from ``first_week`` through ``last_week``.
+    
+    All weeks are aggregated with one set of GROUP BY queries and written
+    with batched ``INSERT ... ON CONFLICT (user_id, week_start) DO UPDATE``.
+    Weeks whose summary fingerprint matches the stored one are not rewritten,
+    and weeks without activity are only written if a summary already exists
+    (it is reset to zero). Generated LLM reports are left untouched.
+    Pending ingestion deltas of the range are discarded with the write; run
+    it in ``run_in_snapshot`` so they are exactly the ones the aggregate saw.
+    The writes are flushed, not committed; the snapshot commits them.
+    
+    Args:
+        user_id: User UUID
+        first_week: Monday of the first week
+        last_week: Monday of the last week (inclusive)
+        db: Database session
+        
+    Returns:
+        Counts of weeks in range, weeks with activity and summaries written
+    """
+    from sqlalchemy.dialects.postgresql import insert
+    
+    weeks = aggregate_weeks_sql(db, user_id, first_week, last_week)
+    stored = dict(
+        db.query(WeeklySummary.week_start, WeeklySummary.source_fingerprint).filter(
+            WeeklySummary.user_id == user_id,
+            WeeklySummary.week_start >= first_week,
+            WeeklySummary.week_start <= last_week
+        ).all()
+    )
+    
+    now = datetime.utcnow()
+    rows = []
+    for week_start in sorted(set(weeks) | set(stored)):
+        summary_json, counts = weeks.get(week_start) or (empty_summary(), {})
+        fingerprint = summary_fingerprint(summary_json)
+        if week_start in stored and stored[week_start] == fingerprint:
+            continue
+        rows.append({
+            "id": uuid.uuid4(),
+            "user_id": user_id,
+            "week_start": week_start,
+            "week_end": week_start + timedelta(days=6),
+            "commit_count": counts.get("commits", 0),
+            "problem_count": counts.get("problems", 0),
+            "note_count": counts.get("notes", 0),
+            "summary_json": summary_json,
+            "source_fingerprint": fingerprint,
+            "created_at": now,
+            "updated_at": now,
+        })
+    
+    for start in range(0, len(rows), SUMMARY_UPSERT_CHUNK_SIZE):
+        stmt = insert(WeeklySummary).values(rows[start:start + SUMMARY_UPSERT_CHUNK_SIZE])
+        stmt = stmt.on_conflict_do_update(
+            constraint="uq_weekly_summaries_user_week",
+            set_={
+                "commit_count": stmt.excluded.commit_count,
+                "problem_count": stmt.excluded.problem_count,
+                "note_count": stmt.excluded.note_count,
+                "summary_json": stmt.excluded.summary_json,
+                "source_fingerprint": stmt.excluded.source_fingerprint,
+                "updated_at": stmt.excluded.updated_at,
+            },
+            # A concurrent single-week build may have caught up already
+            where=WeeklySummary.source_fingerprint.is_distinct_from(stmt.excluded.source_fingerprint),
+        )
+        db.execute(stmt)
+    week_count = (last_week - first_week).days // 7 + 1
+    discard_deltas(db, user_id, [first_week + timedelta(weeks=i) for i in range(week_count)])
+    db.flush()
+    
+    return {
+        "weeks": week_count,
+        "active_weeks": len(weeks),
+        "written": len(rows),
+    }
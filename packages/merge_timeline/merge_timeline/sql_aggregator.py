@@ -0,0 +1,139 @@
+"""Weekly aggregation computed in PostgreSQL.
+
+Produces the same ``summary_json`` shape as ``aggregate_week_data`` with
+GROUP BY queries that return scalars only, so no ORM rows (commit messages,
+note contents) are loaded and ``commits_by_repo`` needs no per-commit repo
+load. A range of weeks is aggregated with the same three queries as a single
+week, bucketed by ISO week (Monday start) in the configured timezone.
+"""
+import hashlib
+import json
+from datetime import date
+from typing import Any, Dict, Optional, Tuple
+
+from sqlalchemy import func, literal, select, union_all
+from sqlalchemy.orm import Session
+
+from app.models.commit import Commit
+from app.models.note import Note
+from app.models.problem import Problem
+from app.models.problem_catalog import ProblemCatalog
+from app.models.repo import Repo
+from merge_timeline.weeks import week_bounds, week_timezone
+
+DAY_KINDS = ("commits", "problems", "notes")
+
+
+def empty_summary() -> Dict[str, Any]:
+    return {"by_day": {}, "problems_by_tag": {}, "commits_by_repo": {}}
+
+
+def summary_fingerprint(summary: Dict[str, Any]) -> str:
+    """Stable hash of a summary; equal fingerprints mean nothing to rebuild."""
+    return hashlib.sha256(json.dumps(summary, sort_keys=True).encode()).hexdigest()
+
+
+def aggregate_weeks_sql(
+    db: Session,
+    user_id: str,
+    first_week: date,
+    last_week: date,
+    tz_name: Optional[str] = None,
+) -> Dict[date, Tuple[Dict[str, Any], Dict[str, int]]]:
+    """
+    Aggregate every week from ``first_week`` through ``last_week`` in the database.
+    
+    Args:
+        db: Database session
+        user_id: User UUID
+        first_week: Monday of the first week
+        last_week: Monday of the last week (inclusive)
+        tz_name: Zone weeks and days are cut in (``WEEK_TIMEZONE`` if omitted)
+        
+    Returns:
+        Summary JSON (``by_day``, ``problems_by_tag``, ``commits_by_repo``)
+        and commit/problem/note counts keyed like ``DAY_KINDS``, per Monday.
+        Weeks without any activity are omitted.
+    """
+    tz = week_timezone(tz_name).key
+    range_start = week_bounds(first_week, tz)[0]
+    range_end = week_bounds(last_week, tz)[1]
+
+    def in_range(user_column, time_column):
+        return (user_column == user_id, time_column >= range_start, time_column < range_end)
+
+    def local_week(time_column):
+        return func.to_char(func.date_trunc("week", func.timezone(tz, time_column)), "YYYY-MM-DD").label("week")
+
+    def day_rows(kind: str, user_column, time_column):
+        local_day = func.to_char(func.timezone(tz, time_column), "YYYY-MM-DD")
+        return select(
+            literal(kind).label("kind"),
+            local_week(time_column),
+            local_day.label("day"),
+        ).where(*in_range(user_column, time_column))
+
+    weeks: Dict[date, Tuple[Dict[str, Any], Dict[str, int]]] = {}
+
+    def week_entry(week: str) -> Tuple[Dict[str, Any], Dict[str, int]]:
+        key = date.fromisoformat(week)
+        if key not in weeks:
+            weeks[key] = (empty_summary(), dict.fromkeys(DAY_KINDS, 0))
+        return weeks[key]
+
+    # Counts per local day and kind, one round trip for all three tables
+    days = union_all(
+        day_rows("commits", Commit.user_id, Commit.committed_at),
+        day_rows("problems", Problem.user_id, Problem.solved_at),
+        day_rows("notes", Note.user_id, Note.created_at),
+    ).subquery()
+    for kind, week, day, count in db.execute(
+        select(days.c.kind, days.c.week, days.c.day, func.count())
+        .group_by(days.c.kind, days.c.week, days.c.day)
+        .order_by(days.c.week, days.c.day)
+    ):
+        summary, counts = week_entry(week)
+        summary["by_day"].setdefault(day, dict.fromkeys(DAY_KINDS, 0))[kind] = count
+        counts[kind] += count
+
+    tags = (
+        select(local_week(Problem.solved_at), func.unnest(ProblemCatalog.tags).label("tag"))
+        .select_from(Problem)
+        .join(ProblemCatalog, Problem.problem_id == ProblemCatalog.problem_id)
+        .where(*in_range(Problem.user_id, Problem.solved_at))
+        .subquery()
+    )
+    for week, tag, count in db.execute(
+        select(tags.c.week, tags.c.tag, func.count()).group_by(tags.c.week, tags.c.tag)
+    ):
+        week_entry(week)[0]["problems_by_tag"][tag] = count
+
+    repos = (
+        select(local_week(Commit.committed_at), func.coalesce(Repo.full_name, "Unknown").label("repo"))
+        .select_from(Commit)
+        .outerjoin(Repo, Commit.repo_id == Repo.id)
+        .where(*in_range(Commit.user_id, Commit.committed_at))
+        .subquery()
+    )
+    for week, repo, count in db.execute(
+        select(repos.c.week, repos.c.repo, func.count()).group_by(repos.c.week, repos.c.repo)
+    ):
+        week_entry(week)[0]["commits_by_repo"][repo] = count
+
+    return weeks
+
+
+def aggregate_week_sql(
+    db: Session,
+    user_id: str,
+    week_start: date,
+    tz_name: Optional[str] = None,
+) -> Tuple[Dict[str, Any], Dict[str, int]]:
+    """
+    Aggregate one user week in the database.
+    
+    Returns:
+        Summary JSON and commit/problem/note counts (zeros for an empty week)
+    """
+    weeks = aggregate_weeks_sql(db, user_id, week_start, week_start, tz_name)
+    return weeks.get(week_start) or (empty_summary(), dict.fromkeys(DAY_KINDS, 0))
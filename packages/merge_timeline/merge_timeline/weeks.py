@@ -0,0 +1,39 @@
+"""Week boundaries in the configured timezone."""
+from datetime import date, datetime, time, timedelta
+from typing import Optional, Tuple
+from zoneinfo import ZoneInfo
+
+from app.config import settings
+
+
+def week_timezone(tz_name: Optional[str] = None) -> ZoneInfo:
+    """Zone weeks are cut in (``WEEK_TIMEZONE`` unless given)."""
+    return ZoneInfo(tz_name or settings.WEEK_TIMEZONE)
+
+
+def week_bounds(week_start: date, tz_name: Optional[str] = None) -> Tuple[datetime, datetime]:
+    """
+    Half-open timestamp range ``[start, end)`` of the week starting on ``week_start``.
+    
+    Both ends are local midnights, so a week spanning a DST change is still
+    exactly Monday 00:00 to the next Monday 00:00. Compare columns with
+    ``column >= start`` and ``column < end`` so the per-user time indexes
+    can be used.
+    
+    Args:
+        week_start: Monday of the week
+        tz_name: IANA zone name (``WEEK_TIMEZONE`` if omitted)
+        
+    Returns:
+        Timezone-aware start and end datetimes
+    """
+    tz = week_timezone(tz_name)
+    start = datetime.combine(week_start, time.min, tzinfo=tz)
+    end = datetime.combine(week_start + timedelta(days=7), time.min, tzinfo=tz)
+    return start, end
+
+
+def current_week_start(tz_name: Optional[str] = None) -> date:
+    """Monday of the current week in the configured timezone."""
+    today = datetime.now(week_timezone(tz_name)).date()
+    return today - timedelta(days=today.weekday())